@@ -4,6 +4,8 @@ import numpy as np
 import soundfile as sf
 import sounddevice as sd
 
+from audio_feed import AudioFeed
+
 
 class AudioEngine:
     def __init__(self, file_path):
@@ -41,6 +43,9 @@ class AudioEngine:
         self.echo_buffer = np.zeros((self.max_delay_samples, 2), dtype='float32')
         self.echo_head = 0
 
+        # Levels and spectrum of the output, read by the UI without locking
+        self.feed = AudioFeed(samplerate=self.samplerate)
+
     def callback(self, outdata, frames, time, status):
         """
         Real-time audio processing loop.
@@ -50,10 +55,12 @@ class AudioEngine:
 
         if not self.is_playing:
             outdata.fill(0)
+            self.feed.publish_silence()
             return
 
         if self.is_paused:
             outdata.fill(0)
+            self.feed.publish_silence()
             return
 
         self.current_volume += (self.target_volume - self.current_volume) * self.smooth_vol
@@ -145,6 +152,7 @@ class AudioEngine:
             self.echo_head = (self.echo_head + n_frames) % buffer_len
 
         outdata[:] = chunk
+        self.feed.publish(outdata)
 
     def toggle_playback(self):
         if self.is_paused:
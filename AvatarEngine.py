@@ -1,45 +1,118 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import cv2
-import mediapipe as mp
 import numpy as np
 from OpenGL.GL import *
 from OpenGL.GLU import *
 import pygame
 from pygame.locals import *
 
+from audio_feed import PulseFollower
+from frame_sources import open_frame_source
+from frame_timing import FrameTimer, timing_export_path
+from avatar_mesh import GPUMesh, load_mesh
+from avatar_skinning import AvatarSkin
+from model_pool import ModelPool
+from pose_tracker import PoseTimeline, PoseTracker
+from skeleton_renderer import SkeletonRenderer, hand_scene_points, landmark_visibility, pose_scene_points
+
+
+# MediaPipe pose landmark indices
+LEFT_SHOULDER = 11
+RIGHT_SHOULDER = 12
+LEFT_ELBOW = 13
+RIGHT_ELBOW = 14
+LEFT_WRIST = 15
+RIGHT_WRIST = 16
+LEFT_HIP = 23
+RIGHT_HIP = 24
+
 
 class AvatarEngine:
-    def __init__(self, audio_engine_left=None, audio_engine_right=None):
+    def __init__(self, audio_engine_left=None, audio_engine_right=None, pose_processor=None, hands_processor=None,
+                 source_spec=0, source_fps=None, source_size=None, cap=None, model_pool=None,
+                 parallel_inference=True, refresh_rate=60.0, interpolation_frames=1.0, shake=0.15,
+                 timing_hud=False, timing_export=None):
         self.audio_engine_left = audio_engine_left
         self.audio_engine_right = audio_engine_right
+        self.source_spec = source_spec
+        self.source_fps = source_fps
+        self.source_size = source_size
 
         self.running = True
         self.exit_gesture_counter = 0
 
-        self.cap = None
-        self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5,
-            model_complexity=1
-        )
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5,
-            max_num_hands=2
-        )
+        # A source shared with DJ mode stays open across switches; one opened here is ours to release
+        self.cap = cap
+        self.owns_cap = cap is None
+        if pose_processor is None or hands_processor is None:
+            if model_pool is None:
+                model_pool = ModelPool()
+        if pose_processor is None:
+            pose_processor = model_pool.get('pose')
+        if hands_processor is None:
+            hands_processor = model_pool.get('hands')
+        self.pose = pose_processor
+        self.hands = hands_processor
         self.hand_landmarks = []
-        self.mp_drawing = mp.solutions.drawing_utils
+        self.recorder = None
 
         self.landmarks = None
+        self.pose_results = None
+        # Landmarks in scene coordinates, (33, 3) for the pose and (21, 3) per hand
+        self.pose_points = None
+        self.pose_visibility = None
+        self.hand_points = []
+        self.skeleton = SkeletonRenderer()
+
+        # What render() draws: the latest tracked pose, or one interpolated to display time by run()
+        self.refresh_rate = refresh_rate
+        self.interpolation_frames = interpolation_frames
+        self.shown_pose = None
+        self.shown_visibility = None
+        self.shown_hands = []
+        self.tracker = None
+        # Audio reaction: pulses read from the decks' feeds each render, and a camera shake that falls with the beat
+        self.audio_pulses = PulseFollower()
+        self.last_render_time = None
+        self.shake = shake
+        self.shake_direction = np.zeros(2)
+        self.shake_random = np.random.default_rng()
+        self.frames_processed = 0
+        self.results_timestamp = None
+
+        # Pose and hands run side by side on the same RGB frame and are joined before the next one;
+        # MediaPipe releases the GIL while a graph runs
+        self.inference_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="avatar-inference") \
+            if parallel_inference else None
+        self.inference_times = dict.fromkeys(('pose', 'hands', 'frame'), 0.0)
+        self.inference_frames = 0
+
+        # Frame timing of the render loop and of tracking, which run on different threads in run()
+        self.render_timing = FrameTimer(
+            'avatar', ('events', 'sample', 'audio', 'model', 'skeleton', 'hud', 'flip', 'wait'),
+            export_path=timing_export_path(timing_export, 'avatar') if timing_export else None)
+        self.tracking_timing = FrameTimer(
+            'tracking', ('capture', 'convert', 'inference', 'landmarks', 'push'),
+            export_path=timing_export_path(timing_export, 'tracking') if timing_export else None)
+        self.timing_hud = timing_hud
+        self.hud_text = None
+        self.hud_font = None
+        self.hud_pixels = None
 
         self.screen_width = 1920
         self.screen_height = 1080
 
         self.display = None
         self.model_data = None
+        self.model_mesh = None
+        self.model_skin = None
 
     def setup_window(self):
+        if self.display is not None:
+            self.set_window_visible(True)
+            return
         pygame.init()
         self.display = pygame.display.set_mode(
             (self.screen_width, self.screen_height),
@@ -48,6 +121,20 @@ class AvatarEngine:
         pygame.display.set_caption("Avatar Mode - Press ESC to exit")
         self.setup_opengl()
 
+    def set_window_visible(self, visible):
+        """Show or hide the window, keeping it and its GL context alive for the next switch."""
+        try:
+            from pygame._sdl2.video import Window
+        except ImportError:
+            if not visible:
+                pygame.display.iconify()
+            return
+        window = Window.from_display_module()
+        if visible:
+            window.show()
+        else:
+            window.hide()
+
     def setup_opengl(self):
         glEnable(GL_DEPTH_TEST)
         glClearColor(0.2, 0.2, 0.2, 1.0)
@@ -71,15 +158,21 @@ class AvatarEngine:
 
     def load_model(self, model_path):
         try:
-            from pywavefront import Wavefront
-            self.model_data = Wavefront(model_path, collect_faces=True)
+            self.model_data = load_mesh(model_path)
         except Exception as e:
             print(f"Error loading model: {e}")
             self.model_data = None
-
-    def process_pose(self, frame):
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.pose.process(frame_rgb)
+        if self.model_mesh is not None:
+            self.model_mesh.release()
+        self.model_mesh = None
+        self.model_skin = None
+        if self.model_data:
+            # Uploaded on first draw, once there is a GL context
+            self.model_mesh = GPUMesh(self.model_data, dynamic=True)
+            self.model_skin = AvatarSkin(self.model_data)
+
+    def process_pose(self, results):
+        self.pose_results = results
 
         if results.pose_landmarks:
             self.landmarks = results.pose_landmarks.landmark
@@ -88,17 +181,88 @@ class AvatarEngine:
             self.landmarks = None
             return False
 
+    def run_model(self, name, processor, frame_rgb):
+        start = time.perf_counter()
+        results = processor.process(frame_rgb)
+        return name, results, time.perf_counter() - start
+
+    def infer(self, frame_rgb):
+        """
+        Pose and hands results for one RGB frame. With a worker pool both models
+        run at once and this waits for both, so a frame costs the slower model,
+        not the sum; results always belong to the frame passed in.
+        """
+        jobs = (('pose', self.pose), ('hands', self.hands))
+        if self.inference_pool is not None:
+            futures = [self.inference_pool.submit(self.run_model, name, processor, frame_rgb)
+                       for name, processor in jobs]
+            outputs = [future.result() for future in futures]
+        else:
+            outputs = [self.run_model(name, processor, frame_rgb) for name, processor in jobs]
+
+        results = {}
+        for name, result, elapsed in outputs:
+            results[name] = result
+            self.inference_times[name] += elapsed
+        return results
+
+    def process_frame(self, frame, timestamp=None):
+        """Run pose and hand tracking on one camera frame. Returns False once the exit gesture is held."""
+        if timestamp is None:
+            timestamp = self.frames_processed
+        self.frames_processed += 1
+
+        start = time.perf_counter()
+        frame = cv2.flip(frame, 1)
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        self.tracking_timing.mark('convert')
+        results = self.infer(frame_rgb)
+        self.tracking_timing.mark('inference')
+        self.inference_times['frame'] += time.perf_counter() - start
+        self.inference_frames += 1
+
+        if 'pose' in results:
+            self.process_pose(results['pose'])
+        hands_results = results.get('hands')
+        self.hand_landmarks = []
+        if hands_results is not None and hands_results.multi_hand_landmarks:
+            self.hand_landmarks = hands_results.multi_hand_landmarks
+        self.results_timestamp = timestamp
+        self.update_points()
+
+        if self.recorder:
+            self.recorder.record(hands_results=hands_results, pose_results=self.pose_results)
+
+        exit_gesture = self.detect_exit_gesture()
+        self.tracking_timing.mark('landmarks')
+        if exit_gesture:
+            print("Exit gesture detected - returning to DJ mode")
+            return False
+        return True
+
+    def update_points(self):
+        self.pose_points = pose_scene_points(self.landmarks) if self.landmarks else None
+        self.pose_visibility = landmark_visibility(self.landmarks) if self.landmarks else None
+        self.hand_points = []
+        if self.pose_points is not None and self.hand_landmarks:
+            self.hand_points = hand_scene_points(self.hand_landmarks, self.pose_points)
+
+    def inference_stats(self):
+        """Mean milliseconds per frame for each model and for the whole flip, convert and inference step."""
+        frames = max(1, self.inference_frames)
+        return {name: total * 1000.0 / frames for name, total in self.inference_times.items()}
+
     def detect_exit_gesture(self):
         if not self.landmarks:
             self.exit_gesture_counter = 0
             return False
 
-        left_wrist = self.landmarks[self.mp_pose.PoseLandmark.LEFT_WRIST.value]
-        right_wrist = self.landmarks[self.mp_pose.PoseLandmark.RIGHT_WRIST.value]
-        left_shoulder = self.landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-        right_shoulder = self.landmarks[self.mp_pose.PoseLandmark.RIGHT_SHOULDER.value]
-        left_elbow = self.landmarks[self.mp_pose.PoseLandmark.LEFT_ELBOW.value]
-        right_elbow = self.landmarks[self.mp_pose.PoseLandmark.RIGHT_ELBOW.value]
+        left_wrist = self.landmarks[LEFT_WRIST]
+        right_wrist = self.landmarks[RIGHT_WRIST]
+        left_shoulder = self.landmarks[LEFT_SHOULDER]
+        right_shoulder = self.landmarks[RIGHT_SHOULDER]
+        left_elbow = self.landmarks[LEFT_ELBOW]
+        right_elbow = self.landmarks[RIGHT_ELBOW]
 
         # Check if arms are horizontally extended (T-pose)
         # Wrists should be at similar Y level as shoulders
@@ -126,369 +290,195 @@ class AvatarEngine:
 
         return False
 
-    def get_joint_rotation(self, landmark_a, landmark_b):
-        dx = landmark_b.x - landmark_a.x
-        dy = landmark_b.y - landmark_a.y
-        dz = landmark_b.z - landmark_a.z
-
-        angle_y = np.degrees(np.arctan2(dx, dz))
-        angle_x = np.degrees(np.arctan2(dy, np.sqrt(dx ** 2 + dz ** 2)))
+    def show(self, pose_points, visibility=None, hand_points=()):
+        self.shown_pose = pose_points
+        self.shown_visibility = visibility
+        self.shown_hands = hand_points
 
-        return angle_x, angle_y
-
-    def draw_skeleton(self):
-        if not self.landmarks:
+    def render_model(self):
+        if not self.model_mesh or self.shown_pose is None:
             return
-
+        if self.model_skin is not None:
+            self.model_mesh.update(*self.model_skin.pose(self.shown_pose, self.shown_visibility))
+        self.model_mesh.draw()
+
+    def update_audio(self):
+        """
+        Advance the audio pulses to now and restyle the skeleton from them. The
+        analysis already ran on the audio threads; this only reads snapshots.
+        """
+        now = time.perf_counter()
+        dt = min(now - self.last_render_time, 0.1) if self.last_render_time is not None else 0.0
+        self.last_render_time = now
+        previous_beat = self.audio_pulses.beat
+        feeds = [engine.feed for engine in (self.audio_engine_left, self.audio_engine_right) if engine is not None]
+        pulses = self.audio_pulses.update(dt, feeds)
+        if pulses.beat > previous_beat:
+            angle = self.shake_random.uniform(0.0, 2.0 * np.pi)
+            self.shake_direction = np.array([np.cos(angle), np.sin(angle)])
+
+        self.skeleton.set_style(glow=1.0 + 1.5 * pulses.beat + pulses.energy,
+                                width_scale=1.0 + 0.5 * pulses.beat + 0.3 * pulses.onset,
+                                tint=0.6 * pulses.onset + 0.3 * pulses.bass)
+        return self.shake_direction * (self.shake * pulses.beat)
+
+    def draw_hud(self):
+        """Timing summaries in the top left corner. The text is rasterised again only when it changes."""
+        rows = self.render_timing.hud_rows() + [("",)] + self.tracking_timing.hud_rows()
+        if rows != self.hud_text:
+            self.hud_text = rows
+            if self.hud_font is None:
+                self.hud_font = pygame.font.SysFont("monospace", 15)
+            font = self.hud_font
+            line_height = font.get_linesize()
+            name_width = font.size("inference ")[0]
+            cell_width = font.size("0000.00")[0] + 8
+            surface = pygame.Surface((name_width + 4 * cell_width + 12, line_height * len(rows) + 8), pygame.SRCALPHA)
+            surface.fill((0, 0, 0, 160))
+            for row, cells in enumerate(rows):
+                y = 4 + row * line_height
+                surface.blit(font.render(cells[0], True, (0, 255, 0)), (6, y))
+                for column, cell in enumerate(cells[1:]):
+                    text = font.render(cell, True, (0, 255, 0))
+                    # Statistics are right-aligned in fixed columns; a lone message starts at the first column
+                    x = 6 + name_width + (column + 1) * cell_width - text.get_width() if len(cells) > 2 else \
+                        6 + name_width
+                    surface.blit(text, (x, y))
+            self.hud_pixels = (surface.get_width(), surface.get_height(), pygame.image.tostring(surface, "RGBA", True))
+
+        width, height, pixels = self.hud_pixels
+        glDisable(GL_DEPTH_TEST)
         glDisable(GL_LIGHTING)
         glEnable(GL_BLEND)
         glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-
-        # Body connections
-        body_connections = [
-            (11, 12),  # Shoulders
-            (11, 23), (12, 24),  # Shoulder to hip
-            (23, 24),  # Hips
-            (11, 13), (13, 15),  # Left arm
-            (12, 14), (14, 16),  # Right arm
-            (23, 25), (25, 27), (27, 29), (29, 31),  # Left leg
-            (24, 26), (26, 28), (28, 30), (30, 32),  # Right leg
-        ]
-
-        # Face connections
-        face_connections = [
-            (0, 1), (1, 2), (2, 3),  # Left eye area
-            (0, 4), (4, 5), (5, 6),  # Right eye area
-            (9, 10),  # Mouth
-            (0, 7), (0, 8),  # Ears
-        ]
-
-        # Hand connections (wrist to fingers)
-        left_hand_connections = [
-            (15, 17), (15, 19), (15, 21),  # Left wrist to hand landmarks
-        ]
-
-        right_hand_connections = [
-            (16, 18), (16, 20), (16, 22),  # Right wrist to hand landmarks
-        ]
-
-        # Draw body (cyan - thick)
-        self.draw_limb_group(body_connections, (0.0, 1.0, 1.0), 12)
-
-        # Draw face (yellow - medium)
-        self.draw_limb_group(face_connections, (1.0, 1.0, 0.0), 8)
-
-        # Draw hands (magenta - thin)
-        self.draw_limb_group(left_hand_connections, (1.0, 0.0, 1.0), 6)
-        self.draw_limb_group(right_hand_connections, (1.0, 0.0, 1.0), 6)
-
-        # Draw small points at all landmarks to see tracking
-        glPointSize(6)
-        glBegin(GL_POINTS)
-        for i, landmark in enumerate(self.landmarks):
-            x = (landmark.x - 0.5) * 10
-            y = -(landmark.y - 0.5) * 10
-            z = -landmark.z * 5 - 10
-
-            # Color code different body parts
-            if i <= 10:  # Face
-                glColor4f(1.0, 1.0, 0.0, 1.0)  # Yellow
-            elif i <= 16:  # Upper body
-                glColor4f(0.0, 1.0, 1.0, 1.0)  # Cyan
-            elif i <= 22:  # Hands
-                glColor4f(1.0, 0.0, 1.0, 1.0)  # Magenta
-            else:  # Legs/feet
-                glColor4f(0.2, 0.5, 1.0, 1.0)  # Blue
-
-            glVertex3f(x, y, z)
-        glEnd()
-
+        glWindowPos2i(10, self.screen_height - 10 - height)
+        glDrawPixels(width, height, GL_RGBA, GL_UNSIGNED_BYTE, pixels)
         glDisable(GL_BLEND)
         glEnable(GL_LIGHTING)
-
-    def draw_limb_group(self, connections, color, line_width):
-        # Outer glow
-        glLineWidth(line_width + 4)
-        glBegin(GL_LINES)
-        for connection in connections:
-            if connection[0] >= len(self.landmarks) or connection[1] >= len(self.landmarks):
-                continue
-
-            start = self.landmarks[connection[0]]
-            end = self.landmarks[connection[1]]
-
-            start_x = (start.x - 0.5) * 10
-            start_y = -(start.y - 0.5) * 10
-            start_z = -start.z * 5 - 10
-
-            end_x = (end.x - 0.5) * 10
-            end_y = -(end.y - 0.5) * 10
-            end_z = -end.z * 5 - 10
-
-            glColor4f(color[0], color[1], color[2], 0.3)
-            glVertex3f(start_x, start_y, start_z)
-            glVertex3f(end_x, end_y, end_z)
-        glEnd()
-
-        # Main line
-        glLineWidth(line_width)
-        glBegin(GL_LINES)
-        for connection in connections:
-            if connection[0] >= len(self.landmarks) or connection[1] >= len(self.landmarks):
-                continue
-
-            start = self.landmarks[connection[0]]
-            end = self.landmarks[connection[1]]
-
-            start_x = (start.x - 0.5) * 10
-            start_y = -(start.y - 0.5) * 10
-            start_z = -start.z * 5 - 10
-
-            end_x = (end.x - 0.5) * 10
-            end_y = -(end.y - 0.5) * 10
-            end_z = -end.z * 5 - 10
-
-            glColor4f(color[0], color[1], color[2], 1.0)
-            glVertex3f(start_x, start_y, start_z)
-            glVertex3f(end_x, end_y, end_z)
-        glEnd()
-
-        # Bright core
-        glLineWidth(max(2, line_width - 6))
-        glBegin(GL_LINES)
-        for connection in connections:
-            if connection[0] >= len(self.landmarks) or connection[1] >= len(self.landmarks):
-                continue
-
-            start = self.landmarks[connection[0]]
-            end = self.landmarks[connection[1]]
-
-            start_x = (start.x - 0.5) * 10
-            start_y = -(start.y - 0.5) * 10
-            start_z = -start.z * 5 - 10
-
-            end_x = (end.x - 0.5) * 10
-            end_y = -(end.y - 0.5) * 10
-            end_z = -end.z * 5 - 10
-
-            glColor4f(1.0, 1.0, 1.0, 1.0)
-            glVertex3f(start_x, start_y, start_z)
-            glVertex3f(end_x, end_y, end_z)
-        glEnd()
-
-    def draw_hands(self):
-        if not self.hand_landmarks or not self.landmarks:
-            return
-
-        # Get wrist positions from pose
-        left_wrist_pose = self.landmarks[15]  # Left wrist from pose
-        right_wrist_pose = self.landmarks[16]  # Right wrist from pose
-
-        glDisable(GL_LIGHTING)
-
-        hand_scale = 0.6  # Adjust this value (0.5 = half size, 0.3 = smaller, etc.)
-
-        for hand_idx, hand_lms in enumerate(self.hand_landmarks):
-            # Determine which wrist to attach to (left or right)
-            hand_wrist = hand_lms.landmark[0]
-
-            # Check if hand is on left or right side of screen
-            if hand_wrist.x < 0.5:  # Left side
-                wrist_pose = right_wrist_pose  # Flipped because camera mirrors
-            else:  # Right side
-                wrist_pose = left_wrist_pose
-
-            # Calculate pose wrist position
-            wrist_pose_x = (wrist_pose.x - 0.5) * 10
-            wrist_pose_y = -(wrist_pose.y - 0.5) * 10
-            wrist_pose_z = -wrist_pose.z * 5 - 10
-
-            # Finger connections
-            finger_connections = [
-                # Thumb
-                (0, 1), (1, 2), (2, 3), (3, 4),
-                # Index
-                (0, 5), (5, 6), (6, 7), (7, 8),
-                # Middle
-                (0, 9), (9, 10), (10, 11), (11, 12),
-                # Ring
-                (0, 13), (13, 14), (14, 15), (15, 16),
-                # Pinky
-                (0, 17), (17, 18), (18, 19), (19, 20),
-            ]
-
-            # Draw glow
-            glLineWidth(6)
-            glBegin(GL_LINES)
-            glColor4f(1.0, 0.0, 1.0, 0.4)  # Magenta glow
-
-            for connection in finger_connections:
-                start = hand_lms.landmark[connection[0]]
-                end = hand_lms.landmark[connection[1]]
-
-                # Get hand wrist as origin
-                hand_wrist_landmark = hand_lms.landmark[0]
-
-                # Calculate relative positions from wrist
-                start_rel_x = (start.x - hand_wrist_landmark.x) * hand_scale
-                start_rel_y = (start.y - hand_wrist_landmark.y) * hand_scale
-                start_rel_z = (start.z - hand_wrist_landmark.z) * hand_scale
-
-                end_rel_x = (end.x - hand_wrist_landmark.x) * hand_scale
-                end_rel_y = (end.y - hand_wrist_landmark.y) * hand_scale
-                end_rel_z = (end.z - hand_wrist_landmark.z) * hand_scale
-
-                # Apply to pose wrist position
-                start_x = start_rel_x * 10 + wrist_pose_x
-                start_y = -start_rel_y * 10 + wrist_pose_y
-                start_z = -start_rel_z * 5 + wrist_pose_z
-
-                end_x = end_rel_x * 10 + wrist_pose_x
-                end_y = -end_rel_y * 10 + wrist_pose_y
-                end_z = -end_rel_z * 5 + wrist_pose_z
-
-                glVertex3f(start_x, start_y, start_z)
-                glVertex3f(end_x, end_y, end_z)
-            glEnd()
-
-            # Draw main lines
-            glLineWidth(4)
-            glBegin(GL_LINES)
-            glColor3f(1.0, 0.0, 1.0)  # Magenta
-
-            for connection in finger_connections:
-                start = hand_lms.landmark[connection[0]]
-                end = hand_lms.landmark[connection[1]]
-
-                # Get hand wrist as origin
-                hand_wrist_landmark = hand_lms.landmark[0]
-
-                # Calculate relative positions from wrist
-                start_rel_x = (start.x - hand_wrist_landmark.x) * hand_scale
-                start_rel_y = (start.y - hand_wrist_landmark.y) * hand_scale
-                start_rel_z = (start.z - hand_wrist_landmark.z) * hand_scale
-
-                end_rel_x = (end.x - hand_wrist_landmark.x) * hand_scale
-                end_rel_y = (end.y - hand_wrist_landmark.y) * hand_scale
-                end_rel_z = (end.z - hand_wrist_landmark.z) * hand_scale
-
-                # Apply to pose wrist position
-                start_x = start_rel_x * 10 + wrist_pose_x
-                start_y = -start_rel_y * 10 + wrist_pose_y
-                start_z = -start_rel_z * 5 + wrist_pose_z
-
-                end_x = end_rel_x * 10 + wrist_pose_x
-                end_y = -end_rel_y * 10 + wrist_pose_y
-                end_z = -end_rel_z * 5 + wrist_pose_z
-
-                glVertex3f(start_x, start_y, start_z)
-                glVertex3f(end_x, end_y, end_z)
-            glEnd()
-
-        glEnable(GL_LIGHTING)
-
-    def render_model(self):
-        if not self.model_data or not self.landmarks:
-            return
-
-        glPushMatrix()
-
-        # Get torso center (same calculation as skeleton)
-        left_shoulder = self.landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-        right_shoulder = self.landmarks[self.mp_pose.PoseLandmark.RIGHT_SHOULDER.value]
-        left_hip = self.landmarks[self.mp_pose.PoseLandmark.LEFT_HIP.value]
-        right_hip = self.landmarks[self.mp_pose.PoseLandmark.RIGHT_HIP.value]
-
-        torso_center_x = (left_shoulder.x + right_shoulder.x + left_hip.x + right_hip.x) / 4
-        torso_center_y = (left_shoulder.y + right_shoulder.y + left_hip.y + right_hip.y) / 4
-        torso_center_z = (left_shoulder.z + right_shoulder.z + left_hip.z + right_hip.z) / 4
-
-        # Use same coordinate transformation as skeleton
-        screen_x = (torso_center_x - 0.5) * 10
-        screen_y = -(torso_center_y - 0.5) * 10
-        screen_z = -torso_center_z * 5 - 10
-
-        # Body rotation
-        shoulder_dx = right_shoulder.x - left_shoulder.x
-        shoulder_dy = right_shoulder.y - left_shoulder.y
-        body_rotation = np.degrees(np.arctan2(shoulder_dy, shoulder_dx))
-
-        glTranslatef(screen_x, screen_y, screen_z)
-        glRotatef(body_rotation, 0, 0, 1)
-
-        glRotatef(180, 0, 1, 0)  # Flip front/back
-        glRotatef(90, 0, 0, 1)  # Adjust if upside down
-        glRotatef(90, 0, 0, 1)  # Adjust if sideways
-
-        # Adjust scale - try values: 0.5, 1.0, 2.0, 5.0, 10.0
-        glScale(1.0, 1.0, 1.0)
-
-        glColor3f(0.8, 0.8, 1.0)
-
-        for mesh in self.model_data.mesh_list:
-            glBegin(GL_TRIANGLES)
-            for face in mesh.faces:
-                for vertex_i in face:
-                    glVertex3fv(self.model_data.vertices[vertex_i])
-            glEnd()
-
-        glPopMatrix()
+        glEnable(GL_DEPTH_TEST)
 
     def render(self):
+        timing = self.render_timing
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
         glLoadIdentity()
-
-        # if self.model_data:
-            # self.render_model()
-        self.draw_skeleton()
-        self.draw_hands()
+        shake_x, shake_y = self.update_audio()
+        if shake_x or shake_y:
+            glTranslatef(shake_x, shake_y, 0.0)
+        timing.mark('audio')
+
+        if self.model_mesh:
+            self.render_model()
+        timing.mark('model')
+        self.skeleton.update(self.shown_pose, self.shown_hands)
+        self.skeleton.draw()
+        timing.mark('skeleton')
+        if self.timing_hud:
+            self.draw_hud()
+            timing.mark('hud')
 
         pygame.display.flip()
+        timing.mark('flip')
 
-    def run(self):
-        self.cap = cv2.VideoCapture(0)
+    def enter(self):
+        """Start avatar mode: open the source unless one is shared, and show the window."""
+        if self.cap is None:
+            self.cap = open_frame_source(self.source_spec, fps=self.source_fps, size=self.source_size)
         if not self.cap.isOpened():
             print("ERROR: Cannot open camera for avatar mode")
-            return
+            return False
 
         self.setup_window()
         self.running = True
+        self.exit_gesture_counter = 0
+        return True
 
-        clock = pygame.time.Clock()
-
-        while self.running:
-            for event in pygame.event.get():
-                if event.type == QUIT:
+    def handle_events(self):
+        for event in pygame.event.get():
+            if event.type == QUIT:
+                self.running = False
+            elif event.type == KEYDOWN:
+                if event.key == K_ESCAPE:
                     self.running = False
-                elif event.type == KEYDOWN:
-                    if event.key == K_ESCAPE:
-                        self.running = False
-
-            ret, frame = self.cap.read()
-            if not ret:
-                print("ERROR: Cannot read frame")
-                continue
-
-            frame = cv2.flip(frame, 1)
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                elif event.key == K_TAB:
+                    self.timing_hud = not self.timing_hud
+
+    def step(self):
+        """Handle window events, then track and render one frame in lockstep. False once avatar mode should end."""
+        self.handle_events()
+
+        self.tracking_timing.begin_frame()
+        ret, frame = self.cap.read()
+        if not ret:
+            print("ERROR: Cannot read frame")
+            return self.running
+        self.tracking_timing.mark('capture')
+
+        if not self.process_frame(frame, self.cap.timestamp):
+            self.running = False
+        self.tracking_timing.end_frame()
+
+        self.render_timing.begin_frame()
+        self.show(self.pose_points, self.pose_visibility, self.hand_points)
+        self.render()
+        self.render_timing.end_frame()
+        return self.running
+
+    def leave(self):
+        """End avatar mode. The window is hidden, not closed, and a shared source keeps running."""
+        self.set_window_visible(False)
+        if self.owns_cap and self.cap is not None:
+            self.cap.release()
+            self.cap = None
 
-            self.process_pose(frame)
-
-            hands_results = self.hands.process(frame_rgb)
-            self.hand_landmarks = []
-            if hands_results.multi_hand_landmarks:
-                self.hand_landmarks = hands_results.multi_hand_landmarks
+    def run(self):
+        """
+        Avatar mode until the exit gesture or ESC. Tracking runs on a PoseTracker
+        thread at camera rate; this loop renders at refresh_rate, showing the
+        tracked pose interpolated to the display time.
+        """
+        if not self.enter():
+            return
 
-            if self.detect_exit_gesture():
-                print("Exit gesture detected - returning to DJ mode")
+        timeline = PoseTimeline()
+        self.tracker = PoseTracker(self, timeline)
+        self.tracker.start()
+        clock = pygame.time.Clock()
+        timing = self.render_timing
+        while self.running:
+            timing.begin_frame()
+            self.handle_events()
+            if self.tracker.exit_requested:
                 self.running = False
+                break
+            timing.mark('events')
 
+            sample = timeline.sample(time.perf_counter() - timeline.display_delay(self.interpolation_frames))
+            if sample is not None:
+                self.show(*sample)
+            timing.mark('sample')
             self.render()
-
-            clock.tick(60)
-
-        self.cleanup()
-
-    def cleanup(self):
-        self.cap.release()
-        pygame.quit()
+            clock.tick(self.refresh_rate)
+            timing.mark('wait')
+            timing.end_frame()
+
+        self.tracker.stop()
+        if self.tracker.failed_reads:
+            print(f"Avatar tracking: {self.tracker.frames} frames, {self.tracker.failed_reads} failed reads")
+        self.tracker = None
+        self.leave()
+
+    def close(self):
+        self.render_timing.close()
+        self.tracking_timing.close()
+        if self.inference_pool is not None:
+            self.inference_pool.shutdown()
+            self.inference_pool = None
+        if self.owns_cap and self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        if self.display is not None:
+            self.skeleton.release()
+            if self.model_mesh is not None:
+                self.model_mesh.release()
+            pygame.quit()
+            self.display = None
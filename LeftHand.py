@@ -1,9 +1,7 @@
-import mediapipe as mp
 import numpy as np
 
 class LeftHand:
     def __init__(self):
-        self.mp_hands = mp.solutions.hands
         self.hands = None
         self.landmarks = None
         self.gestures = {
@@ -1,14 +1,12 @@
-import mediapipe as mp
 import numpy as np
 
 
 class RightHand:
     def __init__(self):
-        self.mp_hands = mp.solutions.hands
         self.hands = None
         self.landmarks = None
         self.gestures = {
-            # gestures
+            'pinch_middle_thumb': self.is_pinch_middle_thumb,
         }
         self.is_currently_pinching = False
 
@@ -60,6 +58,10 @@ class RightHand:
         """Detect pinch between thumb and index finger."""
         return self._is_pinch(4, 8, threshold=0.07)
 
+    def is_pinch_middle_thumb(self):
+        """Detect pinch between thumb and middle finger."""
+        return self._is_pinch(4, 12, threshold=0.07)
+
     def detect_gestures(self):
         detected = []
         if self.landmarks:
@@ -1,7 +1,14 @@
+import time
+
 import cv2
 import numpy as np
 
-from ui_helpers import draw_play_button, draw_deck, draw_scrollable_list, draw_master_slider
+from audio_feed import AudioFeed, PulseFollower
+from label_cache import LabelSpriteCache
+from ui_helpers import draw_scrollable_list, draw_deck_panel, draw_current_song, draw_single_play_button, \
+    draw_slider_track, draw_slider_knob, draw_waveform, draw_level_meter, draw_spectrum_bars, draw_jump_rail, put_text
+from virtual_list import VirtualList
+from widget_registry import WidgetRegistry
 
 
 class UIEngine:
@@ -18,7 +25,14 @@ class UIEngine:
         self.scrollbar_color = (100, 100, 100)
         self.scrollbar_handle_color = (200, 200, 200)
         self.playing_color = (0, 200, 120)
+        self.waveform_bg_color = (30, 30, 30)
+        self.waveform_color = (230, 160, 40)
+        self.waveform_rms_color = (255, 215, 140)
+        self.playhead_color = (255, 255, 255)
+        self.meter_peak_color = (255, 255, 255)
         self.font = cv2.FONT_HERSHEY_SIMPLEX
+        self.line_type = cv2.LINE_AA
+        self.label_cache = LabelSpriteCache()
 
         self.margin = 20
         self.deck_width = int(width * 0.3)
@@ -26,16 +40,52 @@ class UIEngine:
         self.center_width = int(width * 0.35)
         self.list_item_height = 30
         self.scrollbar_width = 15
+        self.jump_rail_width = 40
 
         self.deck1_rect = (self.margin, self.margin, self.deck_width, self.deck_height)
         self.deck2_rect = (width - self.deck_width - self.margin, self.margin, self.deck_width, self.deck_height)
         self.center_decks_rect = (self.deck1_rect[0] + self.deck_width + self.margin,
                                   self.margin, self.center_width, self.deck_height)
 
-        self.deck1_songs = []
-        self.deck2_songs = []
-        self.deck1_scroll = 0
-        self.deck2_scroll = 0
+        self.list_offset = 100
+        self.controls_y = 400
+        self.play_button_radius = 40
+        self.play_button_left_center = (width // 4 - 100, self.controls_y)
+        self.play_button_right_center = (width // 2 + 400, self.controls_y)
+        self.slider_center = (width // 2, self.controls_y)
+        self.slider_half_width = 150
+        self.slider_knob_radius = 25
+        # Seconds of audio across the zoomed waveform
+        self.waveform_span = 6.0
+        self.search_box_rect = (width // 2 - 400, 545, 800, 36)
+        self.keyboard_rect = (width // 2 - 400, 590, 800, 100)
+        self.keyboard_keys = (tuple("ABCDEFGHIJKLMNO"), tuple("PQRSTUVWXYZ") + ("SPACE", "DEL", "CLEAR"))
+        self.keyboard_hover = None
+        self.search_query = ""
+        self.search_count = None
+        # Meter range and how fast displayed levels fall, per second
+        self.meter_floor_db = -48.0
+        self.meter_release = 6.0
+
+        visible_rows = max(1, (self.deck_height - self.list_offset) // self.list_item_height)
+        self.deck_lists = {1: VirtualList(visible_rows=visible_rows), 2: VirtualList(visible_rows=visible_rows)}
+        self.jump_previews = {1: None, 2: None}
+        self.waveforms = {1: None, 2: None}
+        self.overview_columns = {1: None, 2: None}
+        self.playheads = {1: 0.0, 2: 0.0}
+        self.audio_feeds = {1: None, 2: None}
+        feed_layout = AudioFeed()
+        meter_size = 4 + feed_layout.bands
+        self.meter_snapshots = {1: np.zeros(feed_layout.size, dtype=np.float32),
+                                2: np.zeros(feed_layout.size, dtype=np.float32)}
+        self.meter_levels = {1: np.zeros(meter_size, dtype=np.float32), 2: np.zeros(meter_size, dtype=np.float32),
+                             'master': np.zeros(4, dtype=np.float32)}
+        # Beat pulses per deck, drawn as a ring around the play buttons
+        self.deck_pulses = {1: PulseFollower(), 2: PulseFollower()}
+        self.pulse_ring_width = 6
+        # Time source for kinetic scrolling and meter ballistics; a replay drives it from recorded frame times
+        self.clock = time.perf_counter
+        self.last_draw_time = None
 
         self.selected_song_deck1 = None
         self.selected_song_deck2 = None
@@ -45,83 +95,479 @@ class UIEngine:
         self.dragging_position = (0, 0)
         self.master_slider_position = 0.0
 
-    def set_song_list(self, deck, songs):
+        self.library = None
+        self.song_list_versions = {1: 0, 2: 0}
+        self.static_layer = None
+        self.base = None
+        self.frame = None
+        self.widget_states = {}
+        self.overlay_rect = None
+        self.dirty_rects = []
+        self.redrawn_widgets = []
+        self.version = 0
+
+        self.widgets = WidgetRegistry(width, height)
+        self.layout()
+
+    @property
+    def deck1_songs(self):
+        return self.deck_lists[1].items
+
+    @property
+    def deck2_songs(self):
+        return self.deck_lists[2].items
+
+    @property
+    def deck1_scroll(self):
+        return self.deck_lists[1].scroll
+
+    @property
+    def deck2_scroll(self):
+        return self.deck_lists[2].scroll
+
+    def list_rect(self, deck):
+        x, y, w, h = self.deck1_rect if deck == 1 else self.deck2_rect
+        return x, y + self.list_offset, w, max(0, h - self.list_offset)
+
+    def jump_rail_rect(self, deck):
+        x, y, w, h = self.list_rect(deck)
+        return x + w - self.jump_rail_width, y, self.jump_rail_width, h
+
+    def waveform_rects(self, deck):
+        """The (overview, zoomed) waveform rectangles of a deck inside the center panel."""
+        x, y, w, h = self.center_decks_rect
+        top = y + (115 if deck == 1 else 205)
+        return (x + 10, top, w - 20, 20), (x + 10, top + 25, w - 20, 55)
+
+    def meter_rect(self, deck):
+        cx, cy = self.play_button_left_center if deck == 1 else self.play_button_right_center
+        return cx - 60, cy + self.play_button_radius + 10, 121, 76
+
+    def master_meter_rect(self):
+        cx, cy = self.slider_center
+        return cx - self.slider_half_width, cy + self.slider_knob_radius + 10, 2 * self.slider_half_width + 1, 22
+
+    def slider_knob_center(self):
+        position = max(-1.0, min(1.0, self.master_slider_position))
+        return int(self.slider_center[0] + position * self.slider_half_width), self.slider_center[1]
+
+    def layout(self):
+        """Publish the interactive widgets to the hit-test registry, in priority order."""
+        self.widgets.set_circle('play_left', self.play_button_left_center, self.play_button_radius)
+        self.widgets.set_circle('play_right', self.play_button_right_center, self.play_button_radius)
+        self.widgets.set_circle('master_slider', self.slider_knob_center(), self.slider_knob_radius)
+        self.widgets.set_rect('deck1_jump', self.jump_rail_rect(1))
+        self.widgets.set_rect('deck2_jump', self.jump_rail_rect(2))
+        self.widgets.set_rect('deck1_list', self.list_rect(1), self.list_item_height)
+        self.widgets.set_rect('deck2_list', self.list_rect(2), self.list_item_height)
+        self.widgets.set_rect('center_decks', self.center_decks_rect)
+        self.widgets.set_rect('keyboard', self.keyboard_rect, self.keyboard_rect[3] // len(self.keyboard_keys))
+        self.invalidate()
+
+    def set_master_slider_position(self, position):
+        self.master_slider_position = position
+        self.widgets.set_circle('master_slider', self.slider_knob_center(), self.slider_knob_radius)
+
+    def set_effects(self, enabled):
+        """Toggle costly drawing effects; currently anti-aliased text and outlines."""
+        line_type = cv2.LINE_AA if enabled else cv2.LINE_8
+        if line_type != self.line_type:
+            self.line_type = line_type
+            self.invalidate()
+
+    def set_library(self, library):
+        """The MusicLibrary that resolves the track ids in the deck lists to labels."""
+        self.library = library
+        for deck in self.song_list_versions:
+            self.song_list_versions[deck] += 1
+
+    def label_of(self, track_id):
+        return self.library.label(track_id) if self.library is not None else str(track_id)
+
+    def set_song_list(self, deck, songs, keep_scroll=False, sorted_labels=True):
+        """
+        Show a list or numpy array of track ids on a deck. The ids are kept as
+        given, not copied. Only lists sorted by label (sorted_labels) get a letter jump index.
+        """
+        if deck in self.song_list_versions:
+            self.song_list_versions[deck] += 1
+        if deck in self.deck_lists:
+            self.deck_lists[deck].set_items(songs, self.label_of, keep_scroll, sorted_labels)
+            self.jump_previews[deck] = None
         if deck == 1:
-            self.deck1_songs = songs
-            self.deck1_scroll = 0
             self.selected_song_deck1 = None
         elif deck == 2:
-            self.deck2_songs = songs
-            self.deck2_scroll = 0
             self.selected_song_deck2 = None
 
-    def draw_center_decks(self, img, rect, deck1_current=None, deck2_current=None):
+    def set_waveform(self, deck, pyramid):
+        """Show a track's waveform pyramid on a deck; the overview columns are computed once here."""
+        self.waveforms[deck] = pyramid
+        self.playheads[deck] = 0.0
+        if pyramid is None:
+            self.overview_columns[deck] = None
+            return
+        width = self.waveform_rects(deck)[0][2]
+        self.overview_columns[deck] = pyramid.columns(0, pyramid.length / width, width)
+
+    def set_playhead(self, deck, position):
+        """Playhead of a deck, in samples."""
+        self.playheads[deck] = position
+
+    def key_rect(self, row, column):
+        x, y, w, h = self.keyboard_rect
+        key_w = w // max(len(keys) for keys in self.keyboard_keys)
+        key_h = h // len(self.keyboard_keys)
+        return x + column * key_w, y + row * key_h, key_w, key_h
+
+    def key_at(self, position):
+        """The on-screen keyboard key under a normalised (x, y) position, or None."""
+        if position is None:
+            return None
+        x, y, w, h = self.keyboard_rect
+        px, py = position[0] * self.width - x, position[1] * self.height - y
+        if not (0 <= px < w and 0 <= py < h):
+            return None
+        keys = self.keyboard_keys[int(py // (h // len(self.keyboard_keys)))]
+        column = int(px // (w // max(len(row) for row in self.keyboard_keys)))
+        return keys[column] if column < len(keys) else None
+
+    def set_search(self, query, count=None):
+        """Show the search query and how many tracks it matches; count None hides the count."""
+        self.search_query = query
+        self.search_count = count
+
+    def set_audio_feed(self, deck, feed):
+        self.audio_feeds[deck] = feed
+
+    def meter_fraction(self, linear):
+        db = 20.0 * np.log10(np.maximum(linear, 1e-6))
+        return np.clip(1.0 - db / self.meter_floor_db, 0.0, 1.0)
+
+    def update_meters(self, dt):
+        """
+        Read every deck's audio feed snapshot and apply meter ballistics: levels
+        rise immediately and fall exponentially at meter_release per second.
+        The master meter sums the decks' peaks and RMS power. The same
+        snapshots drive each deck's beat pulse.
+        """
+        release = np.float32(np.exp(-self.meter_release * dt))
+        master_peak = np.zeros(2, dtype=np.float32)
+        master_power = np.zeros(2, dtype=np.float32)
+        for deck in (1, 2):
+            snapshot = self.meter_snapshots[deck]
+            feed = self.audio_feeds[deck]
+            if feed is None:
+                snapshot.fill(0.0)
+            else:
+                feed.read(snapshot)
+            self.deck_pulses[deck].follow(dt, [] if feed is None else [(id(feed), snapshot)])
+            master_peak += snapshot[0:2]
+            master_power += snapshot[2:4] ** 2
+
+            target = snapshot.copy()
+            target[0:4] = self.meter_fraction(snapshot[0:4])
+            levels = self.meter_levels[deck]
+            np.maximum(target[:len(levels)], levels * release, out=levels)
+
+        master_target = self.meter_fraction(np.concatenate((master_peak, np.sqrt(master_power))))
+        master = self.meter_levels['master']
+        np.maximum(master_target, master * release, out=master)
+
+    def render_static(self):
+        """Render everything that only changes with layout or effects, and reset the retained widgets."""
+        static = np.full((self.height, self.width, 3), self.bg_color, dtype=np.uint8)
+        draw_deck_panel(static, self.deck1_rect, "Deck 1", self.deck_bg_color, self.font, self.text_color,
+                        line_type=self.line_type)
+        draw_deck_panel(static, self.deck2_rect, "Deck 2", self.deck_bg_color, self.font, self.text_color,
+                        line_type=self.line_type)
+
+        x, y, w, h = self.center_decks_rect
+        cv2.rectangle(static, (x, y), (x + w, y + h), (45, 45, 45), -1)
+        cv2.putText(static, "Deck Controls Area", (x + 10, y + 30), self.font, 0.8, self.text_color, 1,
+                    self.line_type)
+
+        for deck in (1, 2):
+            for wx, wy, ww, wh in self.waveform_rects(deck):
+                cv2.rectangle(static, (wx, wy), (wx + ww - 1, wy + wh - 1), self.waveform_bg_color, -1)
+
+        draw_slider_track(static, self.slider_center, self.slider_half_width)
+
+        self.static_layer = static
+        self.base = static.copy()
+        self.frame = static.copy()
+        self.widget_states = {}
+        self.overlay_rect = None
+
+    def invalidate(self):
+        self.static_layer = None
+
+    def update_widget(self, name, rect, state, draw_fn, *args):
+        """
+        Redraw one retained widget if its state changed. The widget's region is
+        restored from the static layer and draw_fn draws into a view of it, in
+        region-relative coordinates, so drawing is clipped to the region.
+        """
+        if self.widget_states.get(name) == state:
+            return
+        self.widget_states[name] = state
+
         x, y, w, h = rect
-        cv2.rectangle(img, (x, y), (x + w, y + h), (45, 45, 45), -1)
-        cv2.putText(img, "Deck Controls Area", (x + 10, y + 30), self.font, 0.8, self.text_color, 1, cv2.LINE_AA)
+        x0, y0 = max(0, x), max(0, y)
+        x1, y1 = min(self.width, x + w), min(self.height, y + h)
+        view = self.base[y0:y1, x0:x1]
+        view[:] = self.static_layer[y0:y1, x0:x1]
+        draw_fn(view, x - x0, y - y0, *args)
+        self.dirty_rects.append((x0, y0, x1, y1))
+        self.redrawn_widgets.append(name)
+
+    def draw_current_song_widget(self, view, ox, oy, current_song, line_type):
+        draw_current_song(view, (ox + 5, oy + 35), self.font, self.highlight_color, current_song, line_type=line_type,
+                          label_cache=self.label_cache)
 
+    def draw_song_list_widget(self, view, ox, oy, songs, scroll, selected, playing, letters, jump_letter, line_type):
+        # The rows stop short of the jump rail, which gets its own strip of letters on the right
+        h, w = view.shape[:2]
+        rail = self.jump_rail_width
+        draw_scrollable_list(view, (ox, oy, w - 1 - rail, h - 1), songs, scroll, self.deck_bg_color,
+                             self.list_item_height, self.scrollbar_width, self.playing_color,
+                             self.selection_color, self.scrollbar_color, self.scrollbar_handle_color,
+                             self.font, self.text_color, selected, playing_index=playing, line_type=line_type,
+                             label_cache=self.label_cache, label_of=self.label_of)
+        draw_jump_rail(view, (ox + w - rail, oy, rail, h), letters, self.font, self.scrollbar_handle_color,
+                       self.highlight_color, active_letter=jump_letter, line_type=line_type,
+                       label_cache=self.label_cache)
+        if jump_letter:
+            # Letter bubble beside the jump rail while a pointer is on it
+            bx = ox + w - 1 - rail - 60
+            by = oy + (h - 50) // 2
+            cv2.rectangle(view, (bx, by), (bx + 50, by + 50), self.selection_color, -1)
+            put_text(view, jump_letter, (bx + 12, by + 37), self.font, 1.0, self.text_color, 2, line_type,
+                     self.label_cache)
+
+    def draw_center_decks(self, view, ox, oy, deck1_current=None, deck2_current=None, line_type=cv2.LINE_AA):
         if deck1_current:
-            cv2.putText(img, f"Deck 1: {deck1_current}", (x+5, y+70), self.font, 0.7, self.highlight_color, 2, cv2.LINE_AA)
+            put_text(view, f"Deck 1: {deck1_current}", (ox + 5, oy + 30), self.font, 0.7, self.highlight_color,
+                     2, line_type, self.label_cache)
         if deck2_current:
-            cv2.putText(img, f"Deck 2: {deck2_current}", (x+5, y+100), self.font, 0.7, self.highlight_color, 2, cv2.LINE_AA)
+            put_text(view, f"Deck 2: {deck2_current}", (ox + 5, oy + 60), self.font, 0.7, self.highlight_color,
+                     2, line_type, self.label_cache)
+
+    def draw_overview_widget(self, view, ox, oy, deck, playhead_x):
+        if self.waveforms[deck] is None:
+            return
+        h, w = view.shape[:2]
+        draw_waveform(view, (ox, oy, w, h), *self.overview_columns[deck], self.waveform_color,
+                      self.waveform_rms_color)
+        cv2.line(view, (ox + playhead_x, oy), (ox + playhead_x, oy + h - 1), self.playhead_color, 1)
+
+    def draw_zoom_widget(self, view, ox, oy, deck, start, samples_per_pixel):
+        if self.waveforms[deck] is None:
+            return
+        h, w = view.shape[:2]
+        columns = self.waveforms[deck].columns(start, samples_per_pixel, w)
+        draw_waveform(view, (ox, oy, w, h), *columns, self.waveform_color, self.waveform_rms_color)
+        cv2.line(view, (ox + w // 2, oy), (ox + w // 2, oy + h - 1), self.playhead_color, 1)
+
+    def draw_meter_widget(self, view, ox, oy, deck):
+        levels = self.meter_levels[deck]
+        h, w = view.shape[:2]
+        for row in (0, 1):
+            draw_level_meter(view, (ox, oy + row * 10, w, 8), levels[2 + row], levels[row], self.playing_color,
+                             self.meter_peak_color)
+        draw_spectrum_bars(view, (ox, oy + 24, w, h - 24), levels[4:], self.highlight_color)
+
+    def draw_master_meter_widget(self, view, ox, oy):
+        levels = self.meter_levels['master']
+        w = view.shape[1]
+        for row in (0, 1):
+            draw_level_meter(view, (ox, oy + row * 12, w, 10), levels[2 + row], levels[row], self.playing_color,
+                             self.meter_peak_color)
+
+    def draw_search_box_widget(self, view, ox, oy, query, count, line_type):
+        h, w = view.shape[:2]
+        cv2.rectangle(view, (ox, oy), (ox + w - 1, oy + h - 1), self.deck_bg_color, -1)
+        text = f"Search: {query}_" if query else "Search: type or use the keys below"
+        put_text(view, text, (ox + 10, oy + 25), self.font, 0.6, self.text_color if query else (150, 150, 150), 1,
+                 line_type, self.label_cache)
+        if count is not None:
+            put_text(view, f"{count} tracks", (ox + w - 130, oy + 25), self.font, 0.6, self.highlight_color, 1,
+                     line_type, self.label_cache)
+
+    def draw_keyboard_widget(self, view, ox, oy, hover, line_type):
+        x0, y0 = self.keyboard_rect[:2]
+        for row, keys in enumerate(self.keyboard_keys):
+            for column, key in enumerate(keys):
+                x, y, w, h = self.key_rect(row, column)
+                x, y = x - x0 + ox, y - y0 + oy
+                color = self.selection_color if key == hover else self.deck_bg_color
+                cv2.rectangle(view, (x + 2, y + 2), (x + w - 3, y + h - 3), color, -1)
+                scale = 0.7 if len(key) == 1 else 0.4
+                put_text(view, key, (x + 8 if len(key) > 1 else x + w // 2 - 8, y + h // 2 + 7), self.font, scale,
+                         self.text_color, 1, line_type, self.label_cache)
+
+    def draw_play_button_widget(self, view, ox, oy, is_playing, pulse):
+        pad = self.play_button_radius + 3 + self.pulse_ring_width
+        center = (ox + pad, oy + pad)
+        if pulse:
+            # Beat ring: brighter and wider the stronger the pulse, fading into the panel
+            fraction = pulse / 8
+            color = tuple(int(bg + (hi - bg) * fraction) for bg, hi in zip(self.bg_color, self.highlight_color))
+            cv2.circle(view, center, self.play_button_radius + 5, color, 1 + pulse * (self.pulse_ring_width - 2) // 8,
+                       self.line_type)
+        draw_single_play_button(view, center, self.deck_bg_color, self.highlight_color, self.play_button_radius,
+                                is_playing)
+
+    def draw_slider_knob_widget(self, view, ox, oy, knob_x):
+        pad = self.slider_knob_radius + 1
+        center = (ox + pad + self.slider_half_width, oy + pad)
+        draw_slider_knob(view, center, (knob_x - self.slider_center[0]) / self.slider_half_width,
+                         self.slider_half_width, self.slider_knob_radius)
+
+    def drag_overlay_rect(self):
+        pos = self.dragging_position
+        (text_w, text_h), baseline = cv2.getTextSize(self.label_of(self.dragging_song), self.font, 0.8, 2)
+        x0 = pos[0] - 18
+        y0 = min(pos[1] - text_h - 4, pos[1] - 18)
+        x1 = max(pos[0] + text_w + 4, pos[0] + 19)
+        y1 = max(pos[1] + baseline + 4, pos[1] + 19)
+        return max(0, x0), max(0, y0), min(self.width, x1), min(self.height, y1)
 
     def draw(self, deck1_song_list, deck2_song_list, deck1_current=None, deck2_current=None, is_playing_left=False,
              is_playing_right=False):
-        img = np.full((self.height, self.width, 3), self.bg_color, dtype=np.uint8)
-
-        try:
-            playing_idx1 = deck1_song_list.index(deck1_current) if deck1_current in deck1_song_list else None
-        except Exception:
-            playing_idx1 = None
-        try:
-            playing_idx2 = deck2_song_list.index(deck2_current) if deck2_current in deck2_song_list else None
-        except Exception:
-            playing_idx2 = None
-
-        draw_deck(img, self.deck1_rect, "Deck 1", self.deck_bg_color, self.font, self.text_color, self.highlight_color,
-                  deck1_current)
-        draw_deck(img, self.deck2_rect, "Deck 2", self.deck_bg_color, self.font, self.text_color, self.highlight_color,
-                  deck2_current)
-
-        list_offset = 100
-        d1x, d1y, d1w, d1h = self.deck1_rect
-        d2x, d2y, d2w, d2h = self.deck2_rect
-        list_rect1 = (d1x, d1y + list_offset, d1w, max(0, d1h - list_offset))
-        list_rect2 = (d2x, d2y + list_offset, d2w, max(0, d2h - list_offset))
-
-        self.deck1_scroll = draw_scrollable_list(img, list_rect1, deck1_song_list, self.deck1_scroll,
-                                                 self.deck_bg_color,
-                                                 self.list_item_height, self.scrollbar_width, self.playing_color,
-                                                 self.selection_color, self.scrollbar_color,
-                                                 self.scrollbar_handle_color,
-                                                 self.font, self.text_color, self.selected_song_deck1,
-                                                 playing_index=playing_idx1)
-        self.deck2_scroll = draw_scrollable_list(img, list_rect2, deck2_song_list, self.deck2_scroll,
-                                                 self.deck_bg_color,
-                                                 self.list_item_height, self.scrollbar_width, self.playing_color,
-                                                 self.selection_color, self.scrollbar_color,
-                                                 self.scrollbar_handle_color,
-                                                 self.font, self.text_color, self.selected_song_deck2,
-                                                 playing_index=playing_idx2)
-
-        self.draw_center_decks(img, self.center_decks_rect, deck1_current, deck2_current)
-        draw_play_button(img, 640, 500, self.deck_bg_color, self.highlight_color, radius=40,
-                         is_playing_left=is_playing_left, is_playing_right=is_playing_right)
-        draw_master_slider(img, 640, 500, self.master_slider_position)
-
-        if self.dragging_song:
+        """
+        Retained-mode draw of track id lists and the loaded track ids. Static parts are rendered once; each widget is redrawn
+        into the base layer only when its state changed, and only changed regions
+        are copied to the output frame. The drag label is an overlay drawn on top.
+        version increases whenever the returned image changed. Presenting the
+        image is left to the caller.
+        """
+        if self.static_layer is None:
+            self.render_static()
+            self.dirty_rects = [(0, 0, self.width, self.height)]
+        else:
+            self.dirty_rects = []
+        self.redrawn_widgets = []
+
+        now = self.clock()
+        dt = min(now - self.last_draw_time, 0.1) if self.last_draw_time is not None else 0.0
+        self.last_draw_time = now
+        for deck_list in self.deck_lists.values():
+            deck_list.step(dt)
+        self.update_meters(dt)
+
+        # Playing rows come from each list's precomputed row lookup, never a search of the list
+        playing_idx1 = self.deck_lists[1].row_of(deck1_current)
+        playing_idx2 = self.deck_lists[2].row_of(deck2_current)
+        line_type = self.line_type
+        deck1_label = self.label_of(deck1_current) if deck1_current is not None else None
+        deck2_label = self.label_of(deck2_current) if deck2_current is not None else None
+
+        for deck, current in ((1, deck1_label), (2, deck2_label)):
+            x, y, w, h = self.deck1_rect if deck == 1 else self.deck2_rect
+            self.update_widget(f'deck{deck}_song', (x + 10, y + 40, w - 20, 51), (current,),
+                               self.draw_current_song_widget, current, line_type)
+
+        for deck, songs, scroll, selected, playing in (
+                (1, deck1_song_list, self.deck1_scroll, self.selected_song_deck1, playing_idx1),
+                (2, deck2_song_list, self.deck2_scroll, self.selected_song_deck2, playing_idx2)):
+            x, y, w, h = self.list_rect(deck)
+            jump_letter = self.jump_previews[deck]
+            state = (id(songs), len(songs), self.song_list_versions[deck], scroll, selected, playing, jump_letter)
+            self.update_widget(f'deck{deck}_list', (x, y, w + 1, h + 1), state,
+                               self.draw_song_list_widget, songs, scroll, selected, playing,
+                               self.deck_lists[deck].letters, jump_letter, line_type)
+
+        x, y, w, h = self.center_decks_rect
+        self.update_widget('center_decks', (x, y + 40, w + 1, 71), (deck1_label, deck2_label),
+                           self.draw_center_decks, deck1_label, deck2_label, line_type)
+
+        for deck in (1, 2):
+            pyramid = self.waveforms[deck]
+            overview_rect, zoom_rect = self.waveform_rects(deck)
+            if pyramid is None:
+                # A None state restores the empty background once a track is unloaded
+                self.update_widget(f'deck{deck}_overview', overview_rect, None, self.draw_overview_widget, deck, 0)
+                self.update_widget(f'deck{deck}_zoom', zoom_rect, None, self.draw_zoom_widget, deck, 0, 1)
+                continue
+            position = self.playheads[deck]
+            playhead_x = min(overview_rect[2] - 1, int(position * overview_rect[2] / max(1, pyramid.length)))
+            self.update_widget(f'deck{deck}_overview', overview_rect, (id(pyramid), playhead_x),
+                               self.draw_overview_widget, deck, playhead_x)
+
+            # The zoomed view scrolls in whole pixels so it is only redrawn when it moves
+            samples_per_pixel = self.waveform_span * pyramid.samplerate / zoom_rect[2]
+            start_column = int(position / samples_per_pixel) - zoom_rect[2] // 2
+            self.update_widget(f'deck{deck}_zoom', zoom_rect, (id(pyramid), start_column),
+                               self.draw_zoom_widget, deck, start_column * samples_per_pixel, samples_per_pixel)
+
+        # Pulses are quantised to eighths, so the ring redraws a few times per beat and not at all when quiet
+        pad = self.play_button_radius + 3 + self.pulse_ring_width
+        for deck, name, center, is_playing in ((1, 'play_left', self.play_button_left_center, is_playing_left),
+                                               (2, 'play_right', self.play_button_right_center, is_playing_right)):
+            pulse = int(self.deck_pulses[deck].beat * 8)
+            self.update_widget(name, (center[0] - pad, center[1] - pad, 2 * pad + 1, 2 * pad + 1),
+                               (is_playing, pulse), self.draw_play_button_widget, is_playing, pulse)
+
+        self.update_widget('search_box', self.search_box_rect, (self.search_query, self.search_count),
+                           self.draw_search_box_widget, self.search_query, self.search_count, line_type)
+        self.update_widget('keyboard', self.keyboard_rect, (self.keyboard_hover,), self.draw_keyboard_widget,
+                           self.keyboard_hover, line_type)
+
+        # Meter states are quantised to 1/64 steps so idle meters cost nothing
+        for deck in (1, 2):
+            state = tuple((self.meter_levels[deck] * 64).astype(np.int32).tolist())
+            self.update_widget(f'deck{deck}_meter', self.meter_rect(deck), state, self.draw_meter_widget, deck)
+        state = tuple((self.meter_levels['master'] * 64).astype(np.int32).tolist())
+        self.update_widget('master_meter', self.master_meter_rect(), state, self.draw_master_meter_widget)
+
+        knob_x = self.slider_knob_center()[0]
+        pad = self.slider_knob_radius + 1
+        cx, cy = self.slider_center
+        self.update_widget('master_slider',
+                           (cx - self.slider_half_width - pad, cy - pad, 2 * (self.slider_half_width + pad) + 1,
+                            2 * pad + 1),
+                           (knob_x,), self.draw_slider_knob_widget, knob_x)
+
+        if self.overlay_rect:
+            self.dirty_rects.append(self.overlay_rect)
+        self.overlay_rect = self.drag_overlay_rect() if self.dragging_song is not None else None
+        if self.overlay_rect:
+            self.dirty_rects.append(self.overlay_rect)
+
+        for x0, y0, x1, y1 in self.dirty_rects:
+            self.frame[y0:y1, x0:x1] = self.base[y0:y1, x0:x1]
+
+        img = self.frame
+        if self.dragging_song is not None:
             pos = self.dragging_position
-            cv2.putText(img, self.dragging_song, (pos[0], pos[1]), self.font, 0.8, self.highlight_color, 2, cv2.LINE_AA)
+            put_text(img, self.label_of(self.dragging_song), (pos[0], pos[1]), self.font, 0.8, self.highlight_color, 2, line_type,
+                     self.label_cache)
             cv2.circle(img, pos, 15, self.highlight_color, 2)
 
-        cv2.imshow(self.window_name, img)
+        if self.dirty_rects:
+            self.version += 1
         return img
 
     def scroll_list(self, deck, direction):
-        if deck == 1:
-            self.deck1_scroll = max(0, self.deck1_scroll + direction)
-        elif deck == 2:
-            self.deck2_scroll = max(0, self.deck2_scroll + direction)
+        if deck in self.deck_lists:
+            self.deck_lists[deck].scroll_by(direction)
+
+    def fling_list(self, deck, velocity):
+        """Start kinetic scrolling at velocity rows per second; draw() decays it with friction."""
+        if deck in self.deck_lists:
+            self.deck_lists[deck].fling(velocity)
+
+    def letter_at(self, deck, y):
+        """The jump-index letter under normalised height y on a deck's jump rail."""
+        _, list_y, _, list_h = self.list_rect(deck)
+        if list_h <= 0:
+            return None
+        return self.deck_lists[deck].letter_at((y * self.height - list_y) / list_h)
+
+    def jump_to_letter(self, deck, letter):
+        if deck in self.deck_lists:
+            return self.deck_lists[deck].jump_to_letter(letter)
+        return None
 
     def select_song(self, deck, index):
         if deck == 1 and 0 <= index < len(self.deck1_songs):
@@ -131,12 +577,12 @@ class UIEngine:
 
     def drag_song(self, deck, index, cursor_pos):
         if deck == 1 and 0 <= index < len(self.deck1_songs):
-            self.dragging_song = self.deck1_songs[index]
+            self.dragging_song = int(self.deck1_songs[index])
             self.dragging_from_deck = 1
             self.dragging_position = cursor_pos
             self.selected_song_deck1 = index
         elif deck == 2 and 0 <= index < len(self.deck2_songs):
-            self.dragging_song = self.deck2_songs[index]
+            self.dragging_song = int(self.deck2_songs[index])
             self.dragging_from_deck = 2
             self.dragging_position = cursor_pos
             self.selected_song_deck2 = index
@@ -1,31 +1,74 @@
+import time
+
 import cv2
-import mediapipe as mp
 
 from AudioEngine import AudioEngine
+from compositor import FrameCompositor
+from frame_sources import WebcamSource
+from frame_timing import FrameTimer, timing_export_path
+from inference_scheduler import HandInferenceScheduler
+from model_pool import ModelPool
+from present_thread import PresentThread
+from quality_controller import QualityController
+from search import SearchIndex, SearchSession
 from LeftHand import LeftHand
 from RightHand import RightHand
-from vision_helpers import is_position_over_song, is_position_over_play_button, is_position_over_master_slider
+from vision_helpers import resolve_pointers, draw_hand_landmarks
+from waveform import load_waveform
+
+
+# Pointer slots resolved against the UI widgets once per frame
+LEFT_INDEX_TIP = 0
+RIGHT_INDEX_TIP = 1
+LEFT_PINCH = 2
+RIGHT_PINCH = 3
+
+LIST_WIDGETS = {'deck1_list': 1, 'deck2_list': 2}
+JUMP_RAILS = {'deck1_jump': 1, 'deck2_jump': 2}
 
 
 class VisionEngine:
-    def __init__(self, audio_engine_left, audio_engine_right, ui, song_list):
-        self.cap = cv2.VideoCapture(0)
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.mp_hands = mp.solutions.hands
-        self.hands_processor = self.mp_hands.Hands(
-            max_num_hands=2,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.5,
-        )
+    def __init__(self, audio_engine_left, audio_engine_right, ui, library, cap=None, hands_processor=None,
+                 display=True, schedule_inference=True, target_fps=30.0, adaptive_quality=True,
+                 threaded_present=True, refresh_rate=60.0, model_pool=None, timing_hud=False, timing_export=None):
+        self.cap = cap if cap is not None else WebcamSource(0)
+        # Only a processor from the pool can be swapped for one at a different model complexity
+        self.model_pool = None
+        if hands_processor is None:
+            self.model_pool = model_pool if model_pool is not None else ModelPool()
+            hands_processor = self.model_pool.get('hands')
+        self.hands_processor = hands_processor
+        self.model_complexity = 1
+        self.inference_scheduler = None
+        if schedule_inference:
+            # Hand crops need their own static-mode graph, which only the pool can provide
+            roi_processor = self.model_pool.get('hands_roi') if self.model_pool is not None else None
+            self.inference_scheduler = HandInferenceScheduler(hands_processor, roi_processor)
+        self.display = display
+        self.recorder = None
+
+        self.quality = QualityController(target_fps) if adaptive_quality else None
+        self.inference_scale = 1.0
+        self.draw_landmarks = True
+        self.compositor = FrameCompositor(ui.window_name)
+        self.threaded_present = threaded_present
+        self.refresh_rate = refresh_rate
+        self.presenter = None
+        self.timing = FrameTimer('vision', ('capture', 'convert', 'inference', 'gestures', 'ui', 'compose', 'present'),
+                                 export_path=timing_export_path(timing_export, 'vision') if timing_export else None)
+        self.timing_hud = timing_hud
         self.left_hand = LeftHand()
         self.right_hand = RightHand()
         self.audio_engine_left = audio_engine_left
         self.audio_engine_right = audio_engine_right
         # self.running = True
         self.ui = ui
-        self.song_list = song_list
-        self.deck1_current_song = None
-        self.deck2_current_song = None
+        self.library = library
+        self.search = SearchSession(SearchIndex(library))
+        self.library_watcher = None
+        self.prev_keyboard_pinch = {'left': False, 'right': False}
+        self.deck1_current_id = None
+        self.deck2_current_id = None
         self.deck1_current_path = None
         self.deck2_current_path = None
 
@@ -33,8 +76,8 @@ class VisionEngine:
         self.right_drag_active = False
         self.left_drag_song_index = None
         self.right_drag_song_index = None
-        self.left_drag_song_name = None
-        self.right_drag_song_name = None
+        self.left_drag_song_id = None
+        self.right_drag_song_id = None
 
         self.prev_left_pinch = False
         self.prev_right_pinch = False
@@ -48,16 +91,105 @@ class VisionEngine:
         self.prev_left_pinch_for_slider = False
         self.prev_right_pinch_for_slider = False
 
+        # A middle-thumb pinch over a deck list grabs it for kinetic scrolling
+        self.list_grabs = {'left': None, 'right': None}
+        # Time source for gesture velocities; a replay drives it from recorded frame times
+        self.clock = time.perf_counter
+
         self.avatar_mode = False
+        self.pointer_hits = [(None, None)] * 4
+
+    def resolve_pointer_hits(self):
+        left = self.left_hand if self.left_hand.landmarks else None
+        right = self.right_hand if self.right_hand.landmarks else None
+        self.pointer_hits = resolve_pointers(self.ui, [
+            left.get_index_tip_position() if left else None,
+            right.get_index_tip_position() if right else None,
+            left.get_pinch_position() if left else None,
+            right.get_pinch_position() if right else None,
+        ])
+
+    def apply_quality_level(self, level):
+        self.inference_scale = level['inference_scale']
+        self.draw_landmarks = level['draw_landmarks']
+        self.ui.set_effects(level['ui_effects'])
+
+        if self.model_pool is not None and level['model_complexity'] != self.model_complexity:
+            # The previous processor stays warm in the pool for when quality steps back
+            self.hands_processor = self.model_pool.get('hands', level['model_complexity'])
+            self.model_complexity = level['model_complexity']
+            if self.inference_scheduler:
+                self.inference_scheduler.hands_processor = self.hands_processor
+                self.inference_scheduler.roi_processor = self.model_pool.get('hands_roi', level['model_complexity'])
+
+    def prepare_inference_frame(self, frame_rgb):
+        """Downscale the RGB frame to the current inference resolution; landmarks are normalised so nothing maps back."""
+        if self.inference_scale >= 1.0:
+            return frame_rgb
+        frame_height, frame_width = frame_rgb.shape[:2]
+        size = (max(1, int(frame_width * self.inference_scale)), max(1, int(frame_height * self.inference_scale)))
+        return self.compositor.resize('inference', frame_rgb, size)
+
+    def start_presenter(self):
+        if self.presenter is None:
+            self.presenter = PresentThread(self.ui.window_name, self.refresh_rate)
+            self.presenter.start()
+
+    def stop_presenter(self):
+        """Stop the render thread, closing its window. process() starts a new one when needed."""
+        if self.presenter is not None:
+            self.presenter.stop()
+            self.presenter = None
+
+    def compose(self, frame, ui_img, output='output'):
+        final = self.compositor.compose(frame, ui_img, self.ui.version, output=output)
+        if self.timing_hud:
+            self.timing.draw_hud(final)
+        self.timing.mark('compose')
+        return final
+
+    def present(self, frame, ui_img):
+        """Compose and present the frame; returns the keys pressed since the last frame."""
+        if not self.display:
+            self.compose(frame, ui_img)
+            return []
+
+        if not self.threaded_present:
+            return [self.compositor.present(self.compose(frame, ui_img))]
+
+        self.start_presenter()
+        slot = self.presenter.free_slot()
+        self.presenter.submit(self.compose(frame, ui_img, output=f'output{slot}'), slot)
+        return self.presenter.poll_keys()
 
     def process(self):
+        if self.library_watcher:
+            update = self.library_watcher.poll()
+            if update:
+                self.apply_library_update(update)
+
+        self.compositor.begin_frame()
+        timing = self.timing
+        timing.begin_frame()
         ret, frame = self.cap.read()
         if not ret:
             return False
+        timing.mark('capture')
+
+        frame = self.compositor.mirror(frame)
+        frame_rgb = self.compositor.to_rgb(frame)
+        inference_rgb = self.prepare_inference_frame(frame_rgb)
+        timing.mark('convert')
+        stale = False
+        if self.inference_scheduler:
+            results = self.inference_scheduler.process(inference_rgb)
+            stale = self.inference_scheduler.stale
+        else:
+            results = self.hands_processor.process(inference_rgb)
+        timing.mark('inference')
 
-        frame = cv2.flip(frame, 1)
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.hands_processor.process(frame_rgb)
+        if self.recorder:
+            self.recorder.record(hands_results=results)
 
         self.left_hand.set_landmarks(None)
         self.right_hand.set_landmarks(None)
@@ -71,92 +203,172 @@ class VisionEngine:
                 elif hand_label == 'Right':
                     self.right_hand.set_landmarks(hand_lms.landmark)
 
-        if not self.avatar_mode:
+        # Reused results were already acted on; handling them again would repeat holds and damp flings
+        if not self.avatar_mode and not stale:
             self.left_hand.detect_gestures()
             self.right_hand.detect_gestures()
+            self.resolve_pointer_hits()
             self.handle_avatar_activation()
             self.handle_play_pause()
             self.handle_left_hover()
             self.handle_right_hover()
             self.handle_master_slider()
+            self.handle_list_scroll(self.left_hand, 'left')
+            self.handle_list_scroll(self.right_hand, 'right')
+            self.handle_letter_jump()
+            self.handle_gesture_keyboard()
             self.handle_drag_drop(self.left_hand, 1, 'left')
             self.handle_drag_drop(self.right_hand, 2, 'right')
 
-        if results.multi_hand_landmarks:
+        if self.draw_landmarks and results.multi_hand_landmarks:
             for hand_lms in results.multi_hand_landmarks:
-                self.mp_drawing.draw_landmarks(frame, hand_lms, self.mp_hands.HAND_CONNECTIONS)
+                draw_hand_landmarks(frame, hand_lms.landmark)
+        timing.mark('gestures')
 
         if self.audio_engine_left:
             self.is_playing_left = not self.audio_engine_left.is_paused
+            self.ui.set_playhead(1, self.audio_engine_left.position)
         else:
             self.is_playing_left = False
 
         if self.audio_engine_right:
             self.is_playing_right = not self.audio_engine_right.is_paused
+            self.ui.set_playhead(2, self.audio_engine_right.position)
         else:
             self.is_playing_right = False
 
         img = self.ui.draw(
             self.ui.deck1_songs,
             self.ui.deck2_songs,
-            self.deck1_current_song,
-            self.deck2_current_song,
+            self.deck1_current_id,
+            self.deck2_current_id,
             self.is_playing_left,
             self.is_playing_right
         )
-        frame_height, frame_width = frame.shape[:2]
-        ui_resized = cv2.resize(img, (frame_width, frame_height))
+        timing.mark('ui')
+
+        keys = self.present(frame, img)
+        timing.mark('present')
+        timing.end_frame()
+
+        if self.quality and self.quality.update(timing.last):
+            self.apply_quality_level(self.quality.level)
 
-        final = cv2.addWeighted(frame, 0.4, ui_resized, 0.6, 0)
-        cv2.imshow("Stiwi Pro", final)
-        key = cv2.waitKey(1) & 0xFF
-        if key == 27:
+        if self.handle_keys(keys):
             return False
 
         return True
 
+    def apply_library_update(self, update):
+        """
+        Swap in a library rebuilt by the watcher. Loaded tracks keep playing, and
+        the search query is re-run so the deck lists show the new tracks.
+        """
+        self.library = update['library']
+        self.ui.set_library(self.library)
+        query = self.search.query
+        self.search = SearchSession(update['search_index'])
+        self.search.set_query(query)
+        self.apply_search(keep_scroll=True)
+        stats = update['stats']
+        print(f"Library updated: {stats['added']} added, {stats['removed']} removed, {stats['updated']} changed")
+
+    def apply_search(self, keep_scroll=False):
+        """
+        Show the current search results in both deck lists, passing the result id
+        array through uncopied. Results are in match order, not by name, so the
+        letter jump is off while a query is active.
+        """
+        results = self.search.results
+        self.ui.set_song_list(1, results, keep_scroll, sorted_labels=not self.search.active)
+        self.ui.set_song_list(2, results, keep_scroll, sorted_labels=not self.search.active)
+        self.ui.set_search(self.search.query, len(results) if self.search.active else None)
+
+    def type_search(self, key):
+        """Apply one typed character or an on-screen keyboard key to the search query."""
+        if key == 'DEL':
+            self.search.backspace()
+        elif key == 'CLEAR':
+            self.search.clear()
+        elif key == 'SPACE':
+            self.search.type(' ')
+        else:
+            self.search.type(key)
+        self.apply_search()
+
+    def handle_keys(self, keys):
+        """
+        Route window key presses to the search query; Tab toggles the timing HUD.
+        Returns True when ESC asks to quit.
+        """
+        for key in keys:
+            if key == 9:
+                self.timing_hud = not self.timing_hud
+            elif key == 27:
+                if not self.search.active:
+                    return True
+                self.type_search('CLEAR')
+            elif key in (8, 127):
+                self.type_search('DEL')
+            elif 32 <= key < 127:
+                self.type_search(chr(key))
+        return False
+
+    def handle_gesture_keyboard(self):
+        """The index tip highlights on-screen keys; a pinch starting over a key types it."""
+        hover = None
+        for hand, hand_name, tip, pinch in ((self.left_hand, 'left', LEFT_INDEX_TIP, LEFT_PINCH),
+                                            (self.right_hand, 'right', RIGHT_INDEX_TIP, RIGHT_PINCH)):
+            if hand.landmarks is None:
+                self.prev_keyboard_pinch[hand_name] = False
+                continue
+            if self.pointer_hits[tip][0] == 'keyboard':
+                hover = self.ui.key_at(hand.get_index_tip_position())
+
+            is_pinching = hand.is_currently_pinching
+            pinch_started = is_pinching and not self.prev_keyboard_pinch[hand_name]
+            self.prev_keyboard_pinch[hand_name] = is_pinching
+            if pinch_started and self.pointer_hits[pinch][0] == 'keyboard':
+                key = self.ui.key_at(hand.get_pinch_position())
+                if key:
+                    self.type_search(key)
+        self.ui.keyboard_hover = hover
+
     def load_song_to_audio(self, song_path, deck=1):
         if deck == 1:
             if self.audio_engine_left:
                 self.audio_engine_left.stop()
             self.audio_engine_left = AudioEngine(song_path)
             self.audio_engine_left.start()
+            engine = self.audio_engine_left
         else:
             if self.audio_engine_right:
                 self.audio_engine_right.stop()
             self.audio_engine_right = AudioEngine(song_path)
             self.audio_engine_right.start()
+            engine = self.audio_engine_right
+        self.ui.set_waveform(deck, load_waveform(song_path, engine.data, engine.samplerate))
+        self.ui.set_audio_feed(deck, engine.feed)
 
     def handle_left_hover(self):
         if self.left_hand.landmarks is None:
             return
 
-        hover_pos = self.left_hand.get_index_tip_position()
-        if hover_pos is None:
-            return
-
-        song_idx = is_position_over_song(hover_pos, self.ui, deck_num=1)
+        widget, song_idx = self.pointer_hits[LEFT_INDEX_TIP]
 
-        if song_idx is not None and song_idx < len(self.ui.deck1_songs):
+        if widget == 'deck1_list' and song_idx is not None:
             self.ui.selected_song_deck1 = song_idx
 
     def handle_right_hover(self):
         if self.right_hand.landmarks is None:
             return
 
-        hover_pos = self.right_hand.get_index_tip_position()
-        if hover_pos is None:
-            return
-
-        song_idx = is_position_over_song(hover_pos, self.ui, deck_num=2)
+        widget, song_idx = self.pointer_hits[RIGHT_INDEX_TIP]
 
-        if song_idx is not None and song_idx < len(self.ui.deck2_songs):
+        if widget == 'deck2_list' and song_idx is not None:
             self.ui.selected_song_deck2 = song_idx
 
     def handle_play_pause(self):
-        right_pinch_pos = self.right_hand.get_pinch_position() if self.right_hand.landmarks else None
-        left_pinch_pos = self.left_hand.get_pinch_position() if self.left_hand.landmarks else None
-
         is_pinching_right = self.right_hand.is_currently_pinching if self.right_hand.landmarks else False
         is_pinching_left = self.left_hand.is_currently_pinching if self.left_hand.landmarks else False
 
@@ -166,8 +378,9 @@ class VisionEngine:
         self.prev_right_pinch_for_play = is_pinching_right
         self.prev_left_pinch_for_play = is_pinching_left
 
-        button_right = is_position_over_play_button(right_pinch_pos, self.ui)
-        button_left = is_position_over_play_button(left_pinch_pos, self.ui)
+        buttons = {'play_left': 'left', 'play_right': 'right'}
+        button_right = buttons.get(self.pointer_hits[RIGHT_PINCH][0])
+        button_left = buttons.get(self.pointer_hits[LEFT_PINCH][0])
 
         if pinch_started_right and not self.right_drag_active:
             if button_right == 'left' and self.audio_engine_left:
@@ -188,12 +401,12 @@ class VisionEngine:
     def handle_drag_drop(self, hand, deck_num, hand_name):
         if hand_name == 'left':
             drag_active = self.left_drag_active
-            drag_song_name = self.left_drag_song_name
+            drag_song_id = self.left_drag_song_id
             drag_song_index = self.left_drag_song_index
             prev_pinch = self.prev_left_pinch
         else:
             drag_active = self.right_drag_active
-            drag_song_name = self.right_drag_song_name
+            drag_song_id = self.right_drag_song_id
             drag_song_index = self.right_drag_song_index
             prev_pinch = self.prev_right_pinch
 
@@ -202,12 +415,12 @@ class VisionEngine:
                 self.prev_left_pinch = False
                 self.left_drag_active = False
                 self.left_drag_song_index = None
-                self.left_drag_song_name = None
+                self.left_drag_song_id = None
             else:
                 self.prev_right_pinch = False
                 self.right_drag_active = False
                 self.right_drag_song_index = None
-                self.right_drag_song_name = None
+                self.right_drag_song_id = None
             self.ui.dragging_song = None
             self.ui.dragging_from_deck = None
             return
@@ -223,23 +436,22 @@ class VisionEngine:
         else:
             self.prev_right_pinch = is_pinching
 
-        if pinch_started:
-            over_play_button = is_position_over_play_button(hand_pos, self.ui)
-            if over_play_button:
+        if pinch_started and self.list_grabs[hand_name] is None:
+            widget, song_idx = self.pointer_hits[LEFT_PINCH if hand_name == 'left' else RIGHT_PINCH]
+            if widget in ('play_left', 'play_right'):
                 return
 
-            song_idx = is_position_over_song(hand_pos, self.ui, deck_num=deck_num)
             songs = self.ui.deck1_songs if deck_num == 1 else self.ui.deck2_songs
-            if song_idx is not None and song_idx < len(songs):
+            if widget == f'deck{deck_num}_list' and song_idx is not None:
                 if hand_name == 'left':
                     self.left_drag_active = True
                     self.left_drag_song_index = song_idx
-                    self.left_drag_song_name = songs[song_idx]
+                    self.left_drag_song_id = int(songs[song_idx])
                     self.ui.selected_song_deck1 = song_idx
                 else:
                     self.right_drag_active = True
                     self.right_drag_song_index = song_idx
-                    self.right_drag_song_name = songs[song_idx]
+                    self.right_drag_song_id = int(songs[song_idx])
                     self.ui.selected_song_deck2 = song_idx
 
                 if hand_pos:
@@ -252,44 +464,94 @@ class VisionEngine:
                 screen_x = int(hand_pos[0] * self.ui.width)
                 screen_y = int(hand_pos[1] * self.ui.height)
                 self.ui.update_drag((screen_x, screen_y))
-                if not self.ui.dragging_song:
-                    drag_name = self.left_drag_song_name if hand_name == 'left' else self.right_drag_song_name
-                    if drag_name:
-                        self.ui.dragging_song = drag_name
+                if self.ui.dragging_song is None:
+                    drag_id = self.left_drag_song_id if hand_name == 'left' else self.right_drag_song_id
+                    if drag_id is not None:
+                        self.ui.dragging_song = drag_id
 
         if pinch_released and drag_active:
-            if drag_song_name:
+            if drag_song_id is not None:
                 cx, cy, cw, ch = self.ui.center_decks_rect
                 drop_x, drop_y = self.ui.dragging_position
 
                 in_center = (cx <= drop_x <= cx + cw) and (cy <= drop_y <= cy + ch)
 
                 if in_center:
-                    song_info = next(
-                        (s for s in self.song_list if s['name'] == drag_song_name),
-                        None
-                    )
-                    if song_info:
-                        self.load_song_to_audio(song_info['path'], deck=deck_num)
+                    song_path = self.library.path(drag_song_id)
+                    if song_path:
+                        self.load_song_to_audio(song_path, deck=deck_num)
                         if deck_num == 1:
-                            self.deck1_current_song = drag_song_name
-                            self.deck1_current_path = song_info['path']
+                            self.deck1_current_id = drag_song_id
+                            self.deck1_current_path = song_path
                         else:
-                            self.deck2_current_song = drag_song_name
-                            self.deck2_current_path = song_info['path']
+                            self.deck2_current_id = drag_song_id
+                            self.deck2_current_path = song_path
 
             if hand_name == 'left':
                 self.left_drag_active = False
                 self.left_drag_song_index = None
-                self.left_drag_song_name = None
+                self.left_drag_song_id = None
             else:
                 self.right_drag_active = False
                 self.right_drag_song_index = None
-                self.right_drag_song_name = None
+                self.right_drag_song_id = None
             self.ui.dragging_song = None
             self.ui.dragging_from_deck = None
             self.ui.dragging_position = (0, 0)
 
+    def handle_list_scroll(self, hand, hand_name):
+        """
+        A middle-thumb pinch with the index finger over a deck list grabs it.
+        Vertical hand motion then drags the list and releasing the pinch flings
+        it with the smoothed drag velocity.
+        """
+        grab = self.list_grabs[hand_name]
+        grabbing = hand.landmarks is not None and hand.is_pinch_middle_thumb()
+        if not grabbing:
+            if grab is not None:
+                self.ui.fling_list(grab['deck'], grab['velocity'])
+                self.list_grabs[hand_name] = None
+            return
+
+        wrist_y = hand.landmarks[0].y * self.ui.height
+        now = self.clock()
+        if grab is None:
+            widget = self.pointer_hits[LEFT_INDEX_TIP if hand_name == 'left' else RIGHT_INDEX_TIP][0]
+            if widget in LIST_WIDGETS and not hand.is_currently_pinching:
+                self.list_grabs[hand_name] = {'deck': LIST_WIDGETS[widget], 'y': wrist_y, 'time': now,
+                                              'velocity': 0.0}
+            return
+
+        # Moving the hand up moves the rows up, like dragging a touch list
+        rows = (grab['y'] - wrist_y) / self.ui.list_item_height
+        self.ui.scroll_list(grab['deck'], rows)
+        dt = now - grab['time']
+        if dt > 0:
+            grab['velocity'] += (rows / dt - grab['velocity']) * 0.5
+        grab['y'] = wrist_y
+        grab['time'] = now
+
+    def handle_letter_jump(self):
+        """
+        A pinch pointer on a deck's jump rail previews the letter under it; pinching
+        jumps to that letter. The jump repeats every frame the pinch is held, so
+        sliding a held pinch along the rail scrubs through the letters. The rail
+        does nothing while search results are shown.
+        """
+        previews = {1: None, 2: None}
+        if self.search.active:
+            self.ui.jump_previews.update(previews)
+            return
+        for hand, pointer in ((self.left_hand, LEFT_PINCH), (self.right_hand, RIGHT_PINCH)):
+            deck = JUMP_RAILS.get(self.pointer_hits[pointer][0])
+            if deck is None or hand.landmarks is None:
+                continue
+            letter = self.ui.letter_at(deck, hand.get_pinch_position()[1])
+            previews[deck] = letter
+            if hand.is_currently_pinching:
+                self.ui.jump_to_letter(deck, letter)
+        self.ui.jump_previews.update(previews)
+
     def handle_master_slider(self):
         right_pinch_pos = self.right_hand.get_pinch_position() if self.right_hand.landmarks else None
         left_pinch_pos = self.left_hand.get_pinch_position() if self.left_hand.landmarks else None
@@ -305,18 +567,18 @@ class VisionEngine:
         self.prev_left_pinch_for_slider = is_pinching_left
 
         if pinch_started_right or pinch_started_left:
-            check_pos = right_pinch_pos if pinch_started_right else left_pinch_pos
-            if is_position_over_master_slider(check_pos, self.ui, self.slider_position):
+            check_widget = self.pointer_hits[RIGHT_PINCH if pinch_started_right else LEFT_PINCH][0]
+            if check_widget == 'master_slider':
                 self.slider_dragging = True
 
         if self.slider_dragging and (is_pinching_right or is_pinching_left):
             active_hand_pos = right_pinch_pos if is_pinching_right else left_pinch_pos
             if active_hand_pos:
-                center_x = 640
+                center_x = self.ui.slider_center[0]
                 hand_pixel_x = active_hand_pos[0] * self.ui.width
-                new_slider_pos = (hand_pixel_x - center_x) / 150.0
+                new_slider_pos = (hand_pixel_x - center_x) / float(self.ui.slider_half_width)
                 self.slider_position = max(-1.0, min(1.0, new_slider_pos))
-                self.ui.master_slider_position = new_slider_pos
+                self.ui.set_master_slider_position(new_slider_pos)
 
         if pinch_released:
             self.slider_dragging = False
@@ -0,0 +1,207 @@
+import numpy as np
+
+PEAK = slice(0, 2)
+RMS = slice(2, 4)
+BANDS = slice(4, -3)
+# Onset and beat counters and the current novelty, stored after the bands
+PULSES = slice(-3, None)
+ONSETS = -3
+BEATS = -2
+NOVELTY = -1
+
+
+class AudioFeed:
+    """
+    Block levels published from the audio callback to the UI without locks.
+
+    Each snapshot is one float32 array: left/right peak, left/right RMS and
+    `bands` spectrum band levels in 0..1, then the onset and beat counts and
+    the current novelty. The callback is the only writer: it
+    fills the slot the readers are not on and then bumps sequence, which
+    selects the slot. read() copies the current slot and retries if sequence
+    moved meanwhile, seqlock style, so a reader never sees a half-written
+    block and the callback never waits.
+
+    Onsets are found by spectral flux: the summed rise of the band levels
+    since the previous block, against an adaptive threshold of its running
+    mean plus `sensitivity` deviations. Beats are the same test on the
+    lowest `beat_bands` bands. Both have a refractory time so one hit counts
+    once. The counters only ever increase, so readers see every pulse by
+    comparing counts, however seldom they read. Novelty is how far the
+    flux is above its mean, in deviations scaled to 0..1.
+    """
+
+    def __init__(self, bands=8, decimation=2, floor_db=-60.0, samplerate=44100, sensitivity=1.5, beat_bands=2,
+                 onset_refractory=0.1, beat_refractory=0.25, adaptation=0.05):
+        self.bands = bands
+        self.decimation = decimation
+        self.floor_db = floor_db
+        self.size = 4 + bands + 3
+        self.slots = [np.zeros(self.size, dtype=np.float32) for _ in range(2)]
+        self.sequence = 0
+        self.band_plans = {}
+
+        self.samplerate = samplerate
+        self.sensitivity = sensitivity
+        self.beat_bands = beat_bands
+        self.onset_refractory = onset_refractory
+        self.beat_refractory = beat_refractory
+        self.adaptation = adaptation
+        self.previous_bands = np.zeros(bands, dtype=np.float32)
+        self.rise = np.zeros(bands, dtype=np.float32)
+        # Running (mean, variance) of the full and low band flux
+        self.flux_stats = np.zeros((2, 2))
+        self.clock = 0.0
+        self.last_pulse = [-1.0, -1.0]
+        self.onsets = 0
+        self.beats = 0
+        self.novelty = 0.0
+
+    def band_plan(self, frames):
+        """Window and log-spaced FFT bin edges for one block size, computed once per size."""
+        plan = self.band_plans.get(frames)
+        if plan is None:
+            n = max(2, frames // self.decimation)
+            window = np.hanning(n).astype(np.float32)
+            bins = n // 2 + 1
+            edges = np.unique(np.geomspace(1, bins, self.bands + 1).astype(np.int64))[:-1]
+            plan = (window, edges, 2.0 / window.sum())
+            self.band_plans[frames] = plan
+        return plan
+
+    def publish(self, chunk):
+        """Analyse one output block, shape (frames, 2), and publish it. Runs on the audio thread."""
+        slot = self.slots[(self.sequence + 1) % 2]
+        np.abs(chunk).max(axis=0, out=slot[PEAK])
+        np.sqrt(np.einsum('ij,ij->j', chunk, chunk) / max(1, len(chunk)), out=slot[RMS])
+
+        window, edges, scale = self.band_plan(len(chunk))
+        mono = chunk[::self.decimation, 0] + chunk[::self.decimation, 1]
+        spectrum = np.abs(np.fft.rfft(mono[:len(window)] * window * 0.5)) * scale
+        levels = np.maximum.reduceat(spectrum, edges)
+        db = 20.0 * np.log10(levels + 1e-9)
+        bands = slot[BANDS]
+        bands[:] = 0.0
+        bands[:len(db)] = np.clip(1.0 - db / self.floor_db, 0.0, 1.0)
+        self.detect_pulses(bands, len(chunk) / self.samplerate)
+        slot[ONSETS] = self.onsets
+        slot[BEATS] = self.beats
+        slot[NOVELTY] = self.novelty
+        self.sequence += 1
+
+    def detect_pulses(self, bands, duration):
+        """Update the onset and beat counters from one block's band levels."""
+        np.subtract(bands, self.previous_bands, out=self.rise)
+        np.maximum(self.rise, 0.0, out=self.rise)
+        self.previous_bands[:] = bands
+        flux = (self.rise.sum(), self.rise[:self.beat_bands].sum())
+        self.clock += duration
+
+        self.novelty = 0.0
+        for kind, (value, refractory) in enumerate(zip(flux, (self.onset_refractory, self.beat_refractory))):
+            stats = self.flux_stats[kind]
+            deviation = np.sqrt(stats[1])
+            excess = value - stats[0]
+            if kind == 0:
+                self.novelty = min(1.0, max(0.0, excess / (4.0 * deviation + 1e-3)))
+            # A small floor keeps silence and steady tones from triggering on noise
+            if excess > self.sensitivity * deviation + 0.05 and self.clock - self.last_pulse[kind] >= refractory:
+                self.last_pulse[kind] = self.clock
+                if kind == 0:
+                    self.onsets += 1
+                else:
+                    self.beats += 1
+            stats[0] += self.adaptation * excess
+            stats[1] += self.adaptation * (excess * excess - stats[1])
+
+    def publish_silence(self):
+        current = self.slots[self.sequence % 2]
+        if current[:ONSETS].any() or current[NOVELTY]:
+            slot = self.slots[(self.sequence + 1) % 2]
+            slot.fill(0.0)
+            # Counters carry on through silence so readers never see them go back
+            slot[ONSETS] = self.onsets
+            slot[BEATS] = self.beats
+            self.previous_bands.fill(0.0)
+            self.sequence += 1
+
+    def read(self, out=None, retries=4):
+        """Copy the latest snapshot into out (allocated if None) and return it."""
+        if out is None:
+            out = np.zeros(self.size, dtype=np.float32)
+        for _ in range(retries):
+            sequence = self.sequence
+            out[:] = self.slots[sequence % 2]
+            if self.sequence == sequence:
+                break
+        return out
+
+
+class PulseFollower:
+    """
+    Turns audio feed snapshots into visual drivers on the reader's side, so
+    the only work on a render thread is a copy and a few multiplies.
+
+    energy and bass follow the mean of all and of the low band levels,
+    smoothed at `smoothing` per second. onset and beat jump to 1 (onset to
+    at least the novelty) whenever a feed's counter has moved since the last
+    update, and fall back at `decay` per second. Several feeds, one per deck,
+    combine by taking the strongest. A feed seen for the first time, or whose
+    counters went back, only sets the reference counts.
+    """
+
+    def __init__(self, decay=6.0, smoothing=12.0, beat_bands=2):
+        self.decay = decay
+        self.smoothing = smoothing
+        self.beat_bands = beat_bands
+        self.counts = {}
+        self.snapshots = {}
+        self.energy = 0.0
+        self.bass = 0.0
+        self.onset = 0.0
+        self.beat = 0.0
+
+    def update(self, dt, feeds):
+        """Read every feed (None entries are skipped) and advance the pulses by dt seconds."""
+        sources = []
+        for feed in feeds:
+            if feed is None:
+                continue
+            snapshot = self.snapshots.get(id(feed))
+            if snapshot is None or len(snapshot) != feed.size:
+                snapshot = self.snapshots[id(feed)] = np.zeros(feed.size, dtype=np.float32)
+            sources.append((id(feed), feed.read(snapshot)))
+        keys = {key for key, _ in sources}
+        for key in [key for key in self.snapshots if key not in keys]:
+            del self.snapshots[key]
+        return self.follow(dt, sources)
+
+    def follow(self, dt, sources):
+        """Advance the pulses from already read snapshots, given as (source key, snapshot) pairs."""
+        fall = float(np.exp(-self.decay * dt))
+        onset = self.onset * fall
+        beat = self.beat * fall
+        energy = 0.0
+        bass = 0.0
+        for key, snapshot in sources:
+            counts = (snapshot[ONSETS], snapshot[BEATS])
+            previous = self.counts.get(key)
+            if previous is not None and counts[0] >= previous[0] and counts[1] >= previous[1]:
+                if counts[0] > previous[0]:
+                    onset = max(onset, 0.5 + 0.5 * float(snapshot[NOVELTY]))
+                if counts[1] > previous[1]:
+                    beat = 1.0
+            self.counts[key] = counts
+            bands = snapshot[BANDS]
+            energy = max(energy, float(bands.mean()))
+            bass = max(bass, float(bands[:self.beat_bands].mean()))
+        keys = {key for key, _ in sources}
+        for key in [key for key in self.counts if key not in keys]:
+            del self.counts[key]
+
+        follow = 1.0 - float(np.exp(-self.smoothing * dt))
+        self.energy += (energy - self.energy) * follow
+        self.bass += (bass - self.bass) * follow
+        self.onset = onset
+        self.beat = beat
+        return self
@@ -0,0 +1,226 @@
+import ctypes
+import glob
+import hashlib
+import json
+import os
+import struct
+
+import numpy as np
+from OpenGL.GL import *
+
+MESH_CACHE_DIR = os.path.join(".stiwi_cache", "meshes")
+MESH_CACHE_MAGIC = b"STWM"
+MESH_CACHE_VERSION = 1
+MESH_CACHE_PREFIX = struct.Struct("<4sI")
+MESH_ARRAYS = ('positions', 'normals', 'indices')
+
+
+def compute_normals(positions, indices):
+    """Smooth per-vertex normals: the area-weighted sum of the normals of the triangles around each vertex."""
+    triangles = positions[indices.reshape(-1, 3)]
+    face_normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    normals = np.zeros_like(positions)
+    for corner in range(3):
+        np.add.at(normals, indices.reshape(-1, 3)[:, corner], face_normals)
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    return (normals / np.maximum(lengths, 1e-12)).astype(np.float32)
+
+
+class MeshData:
+    """
+    A triangle mesh as flat arrays: float32 positions and normals (n, 3),
+    uint32 triangle indices, and groups of (material name, diffuse RGBA,
+    first index, index count), one per material.
+    """
+
+    def __init__(self, positions, normals, indices, groups, key=None):
+        self.positions = positions
+        self.normals = normals
+        self.indices = indices
+        self.groups = groups
+        # The cache key when the mesh came through load_mesh, for caches derived from it
+        self.key = key
+
+    @classmethod
+    def from_obj(cls, path):
+        """Parse an OBJ file through pywavefront, triangulated, with normals computed from the faces."""
+        from pywavefront import Wavefront
+
+        scene = Wavefront(path, collect_faces=True)
+        positions = np.array(scene.vertices, dtype=np.float32).reshape(-1, 3)
+        index_lists = []
+        groups = []
+        first = 0
+        for mesh in scene.mesh_list:
+            if not mesh.faces:
+                continue
+            faces = np.array(mesh.faces, dtype=np.uint32).ravel()
+            # pywavefront collects faces per mesh, so each mesh is drawn with its first material
+            material = mesh.materials[0] if mesh.materials else None
+            name = material.name if material else "default"
+            diffuse = tuple(material.diffuse) if material else (0.8, 0.8, 0.8, 1.0)
+            groups.append((name, diffuse, first, len(faces)))
+            index_lists.append(faces)
+            first += len(faces)
+
+        indices = np.concatenate(index_lists) if index_lists else np.empty(0, dtype=np.uint32)
+        return cls(positions, compute_normals(positions, indices), indices, groups)
+
+    @property
+    def bounds(self):
+        return self.positions.min(axis=0), self.positions.max(axis=0)
+
+
+def aligned(size, alignment=16):
+    return -(-size // alignment) * alignment
+
+
+def mesh_cache_key(path):
+    """
+    Hash of the OBJ and every .mtl next to it, by path, mtime and size. The
+    materials count too, so editing a material also invalidates the cache.
+    """
+    sources = [path] + sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(path)), "*.mtl")))
+    parts = []
+    for source in sources:
+        stat = os.stat(source)
+        parts.append(f"{os.path.abspath(source)}|{stat.st_mtime_ns}|{stat.st_size}")
+    return hashlib.sha1("\n".join(parts).encode('utf-8')).hexdigest()
+
+
+def save_mesh_cache(mesh, cache_path):
+    """
+    Write a mesh as one flat file: magic and header length, a JSON header
+    with the groups and each array's dtype, shape and offset, then the raw
+    arrays at 16-byte aligned offsets.
+    """
+    arrays = [np.ascontiguousarray(getattr(mesh, name)) for name in MESH_ARRAYS]
+    layout = {}
+    offset = 0
+    for name, array in zip(MESH_ARRAYS, arrays):
+        layout[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset += aligned(array.nbytes)
+    header = json.dumps({'version': MESH_CACHE_VERSION, 'groups': [list(group) for group in mesh.groups],
+                         'arrays': layout}).encode('utf-8')
+    data_start = aligned(MESH_CACHE_PREFIX.size + len(header))
+
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MESH_CACHE_PREFIX.pack(MESH_CACHE_MAGIC, len(header)))
+        f.write(header)
+        for name, array in zip(MESH_ARRAYS, arrays):
+            f.seek(data_start + layout[name]['offset'])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, cache_path)
+
+
+def read_mesh_cache(cache_path):
+    """Memory-map a mesh written by save_mesh_cache; the arrays are read-only views of the file."""
+    with open(cache_path, 'rb') as f:
+        magic, header_length = MESH_CACHE_PREFIX.unpack(f.read(MESH_CACHE_PREFIX.size))
+        if magic != MESH_CACHE_MAGIC:
+            raise ValueError("not a mesh cache file")
+        header = json.loads(f.read(header_length))
+    if header.get('version') != MESH_CACHE_VERSION:
+        raise ValueError(f"mesh cache version {header.get('version')}")
+
+    data_start = aligned(MESH_CACHE_PREFIX.size + header_length)
+    arrays = []
+    for name in MESH_ARRAYS:
+        info = header['arrays'][name]
+        arrays.append(np.memmap(cache_path, dtype=np.dtype(info['dtype']), mode='r',
+                                offset=data_start + info['offset'], shape=tuple(info['shape'])))
+    groups = [(name, tuple(diffuse), first, count) for name, diffuse, first, count in header['groups']]
+    return MeshData(*arrays, groups)
+
+
+def load_mesh(path, cache_dir=MESH_CACHE_DIR):
+    """
+    The mesh for an OBJ file, memory-mapped from the cache when the OBJ and its
+    materials are unchanged, otherwise parsed from the OBJ and cached.
+    """
+    key = mesh_cache_key(path)
+    cache_path = os.path.join(cache_dir, key + ".mesh")
+    if os.path.exists(cache_path):
+        try:
+            mesh = read_mesh_cache(cache_path)
+            mesh.key = key
+            return mesh
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error reading mesh cache for '{path}': {e}")
+
+    mesh = MeshData.from_obj(path)
+    mesh.key = key
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        save_mesh_cache(mesh, cache_path)
+    except OSError as e:
+        print(f"Error writing mesh cache for '{path}': {e}")
+    return mesh
+
+
+class GPUMesh:
+    """
+    A MeshData uploaded once into an interleaved position and normal vertex
+    buffer plus an index buffer. draw() sets each group's colour and issues one
+    glDrawElements per material; nothing is sent per vertex after upload.
+    A dynamic mesh takes new positions and normals each frame through
+    update(), as one glBufferSubData of the vertex buffer.
+    """
+
+    def __init__(self, mesh, dynamic=False):
+        self.mesh = mesh
+        self.dynamic = dynamic
+        self.vertex_buffer = None
+        self.index_buffer = None
+        self.vertices = np.empty((len(mesh.positions), 6), dtype=np.float32)
+        self.vertices[:, :3] = mesh.positions
+        self.vertices[:, 3:] = mesh.normals
+        self.stale = False
+
+    def update(self, positions, normals):
+        self.vertices[:, :3] = positions
+        self.vertices[:, 3:] = normals
+        self.stale = True
+
+    def upload(self):
+        indices = np.ascontiguousarray(self.mesh.indices, dtype=np.uint32)
+
+        self.vertex_buffer, self.index_buffer = glGenBuffers(2)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        glBufferData(GL_ARRAY_BUFFER, self.vertices.nbytes, self.vertices,
+                     GL_DYNAMIC_DRAW if self.dynamic else GL_STATIC_DRAW)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        self.stale = False
+
+    def draw(self):
+        if self.vertex_buffer is None:
+            self.upload()
+
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        if self.stale:
+            glBufferSubData(GL_ARRAY_BUFFER, 0, self.vertices.nbytes, self.vertices)
+            self.stale = False
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+        glVertexPointer(3, GL_FLOAT, 24, None)
+        glNormalPointer(GL_FLOAT, 24, ctypes.c_void_p(12))
+
+        for _, diffuse, first, count in self.mesh.groups:
+            glColor4f(*diffuse)
+            glDrawElements(GL_TRIANGLES, count, GL_UNSIGNED_INT, ctypes.c_void_p(first * 4))
+
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+    def release(self):
+        if self.vertex_buffer is not None:
+            glDeleteBuffers(2, [self.vertex_buffer, self.index_buffer])
+            self.vertex_buffer = self.index_buffer = None
@@ -0,0 +1,235 @@
+import os
+
+import numpy as np
+
+from avatar_mesh import MESH_CACHE_DIR
+
+SKIN_VERSION = 1
+
+# Extra rest joints stored after the 33 pose landmarks
+HIP_CENTER = 33
+SHOULDER_CENTER = 34
+HEAD_TOP = 35
+JOINT_COUNT = 36
+
+# Rest joint positions as (fraction of half the bounding box width, fraction of its height), for a
+# model standing in an A-pose facing +z. With the camera mirrored, MediaPipe's left side lands on +x.
+REST_LAYOUT = {
+    11: (0.55, 0.80), 12: (-0.55, 0.80),  # Shoulders
+    13: (0.80, 0.64), 14: (-0.80, 0.64),  # Elbows
+    15: (0.93, 0.50), 16: (-0.93, 0.50),  # Wrists
+    23: (0.20, 0.49), 24: (-0.20, 0.49),  # Hips
+    25: (0.26, 0.28), 26: (-0.26, 0.28),  # Knees
+    27: (0.30, 0.06), 28: (-0.30, 0.06),  # Ankles
+    HEAD_TOP: (0.0, 1.0),
+}
+
+# (name, parent bone, start joint, end joint); the torso is bone 0 and every limb hangs off it
+TORSO = 0
+BONES = [
+    ('torso', None, HIP_CENTER, SHOULDER_CENTER),
+    ('left_upper_arm', 0, 11, 13), ('right_upper_arm', 0, 12, 14),
+    ('left_thigh', 0, 23, 25), ('right_thigh', 0, 24, 26),
+    ('left_forearm', 1, 13, 15), ('right_forearm', 2, 14, 16),
+    ('left_shin', 3, 25, 27), ('right_shin', 4, 26, 28),
+]
+# Bones posed together, each level after its parents
+BONE_LEVELS = [np.arange(1, 5), np.arange(5, 9)]
+# Terminal bones reach past their end joint to cover hands and feet when weighting
+TERMINAL_REACH = {5: 0.6, 6: 0.6, 7: 0.5, 8: 0.5}
+
+
+def rest_joints(positions):
+    """Estimate the model's rest skeleton from its bounding box and standard body proportions."""
+    lo = positions.min(axis=0)
+    hi = positions.max(axis=0)
+    center_x = (lo[0] + hi[0]) / 2
+    half_width = (hi[0] - lo[0]) / 2
+    height = hi[1] - lo[1]
+    chest = positions[np.abs(positions[:, 1] - (lo[1] + 0.7 * height)) < 0.1 * height]
+    depth = float(np.median(chest[:, 2])) if len(chest) else (lo[2] + hi[2]) / 2
+
+    joints = np.zeros((JOINT_COUNT, 3), dtype=np.float32)
+    for joint, (x, y) in REST_LAYOUT.items():
+        joints[joint] = (center_x + x * half_width, lo[1] + y * height, depth)
+    joints[HIP_CENTER] = (joints[23] + joints[24]) / 2
+    joints[SHOULDER_CENTER] = (joints[11] + joints[12]) / 2
+    return joints
+
+
+def segment_distances(points, starts, ends):
+    """Distance from every point to every segment, shape (points, segments)."""
+    direction = ends - starts
+    length_sq = np.maximum((direction * direction).sum(axis=1), 1e-12)
+    offset = points[:, None, :] - starts[None, :, :]
+    t = np.clip((offset * direction[None]).sum(axis=2) / length_sq, 0.0, 1.0)
+    closest = starts[None] + t[..., None] * direction[None]
+    return np.linalg.norm(points[:, None, :] - closest, axis=2)
+
+
+def compute_skin_weights(positions, joints, influences=2, power=4.0):
+    """
+    The `influences` nearest bones of every vertex and their weights,
+    inverse distance to the bone segment raised to `power`, normalised.
+    The torso segment runs up to the top of the head so the head follows it.
+    """
+    starts = []
+    ends = []
+    for bone, (_, _, start, end) in enumerate(BONES):
+        if bone == TORSO:
+            end = HEAD_TOP
+        segment_end = joints[end] + TERMINAL_REACH.get(bone, 0.0) * (joints[end] - joints[start])
+        starts.append(joints[start])
+        ends.append(segment_end)
+
+    distances = segment_distances(positions, np.array(starts), np.array(ends))
+    bones = np.argsort(distances, axis=1)[:, :influences]
+    weights = 1.0 / (np.take_along_axis(distances, bones, axis=1) ** power + 1e-6)
+    weights /= weights.sum(axis=1, keepdims=True)
+    return bones.astype(np.int32), weights.astype(np.float32)
+
+
+def load_skin_weights(mesh, joints, cache_dir=MESH_CACHE_DIR):
+    """Skin weights for a mesh, cached beside its mesh cache when the mesh came from load_mesh."""
+    key = getattr(mesh, 'key', None)
+    cache_path = os.path.join(cache_dir, f"{key}.skin{SKIN_VERSION}.npz") if key else None
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with np.load(cache_path) as cached:
+                return cached['bones'], cached['weights']
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error reading skin weight cache: {e}")
+
+    bones, weights = compute_skin_weights(np.asarray(mesh.positions), joints)
+    if cache_path:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = cache_path + ".tmp.npz"
+            np.savez(tmp_path, bones=bones, weights=weights)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"Error writing skin weight cache: {e}")
+    return bones, weights
+
+
+def rotations_between(a, b):
+    """Rotation matrices (n, 3, 3) turning each direction in a onto the matching direction in b, by Rodrigues."""
+    a = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    axis = np.cross(a, b)
+    cos = (a * b).sum(axis=1)
+
+    # Opposite directions: turn half way round any axis perpendicular to a
+    opposite = cos < -0.9999
+    if opposite.any():
+        fallback = np.cross(a[opposite], [1.0, 0.0, 0.0])
+        weak = np.linalg.norm(fallback, axis=1) < 1e-6
+        fallback[weak] = np.cross(a[opposite][weak], [0.0, 1.0, 0.0])
+        fallback /= np.linalg.norm(fallback, axis=1, keepdims=True)
+        axis[opposite] = fallback
+        cos[opposite] = -1.0
+
+    skew = np.zeros((len(a), 3, 3))
+    skew[:, 0, 1], skew[:, 0, 2] = -axis[:, 2], axis[:, 1]
+    skew[:, 1, 0], skew[:, 1, 2] = axis[:, 2], -axis[:, 0]
+    skew[:, 2, 0], skew[:, 2, 1] = -axis[:, 1], axis[:, 0]
+    squared = np.einsum('nij,njk->nik', skew, skew)
+    # I + K + K^2 / (1 + cos) for the unnormalised axis a x b, and I + 2 K^2 for a half turn about a unit axis
+    factor = np.where(opposite, 2.0, 1.0 / np.maximum(1.0 + cos, 1e-12))
+    skew[opposite] = 0.0
+    return np.eye(3)[None] + skew + squared * factor[:, None, None]
+
+
+def torso_frame(hip_center, shoulder_center, left_shoulder, right_shoulder):
+    """Orthonormal basis (columns: across, up, forward) of a torso."""
+    up = shoulder_center - hip_center
+    up = up / max(np.linalg.norm(up), 1e-12)
+    across = left_shoulder - right_shoulder
+    across = across - up * np.dot(across, up)
+    across = across / max(np.linalg.norm(across), 1e-12)
+    return np.stack((across, up, np.cross(across, up)), axis=1)
+
+
+class AvatarSkin:
+    """
+    Linear blend skinning of a mesh to MediaPipe pose landmarks.
+
+    The rest skeleton is estimated from the mesh's proportions and each vertex
+    is bound to its two nearest bones. Per frame, the bones are posed top
+    down. The torso takes the orientation of the tracked hips and shoulders,
+    and each limb bone turns from its rest direction onto the tracked one.
+    Bones stay joined end to end, and the whole skeleton is scaled to the
+    tracked torso length. pose() blends each vertex's two bone matrices and
+    transforms all vertices and normals with one einsum each. Limbs whose
+    landmarks are not visible keep their rest pose relative to their parent.
+    """
+
+    def __init__(self, mesh, cache_dir=MESH_CACHE_DIR, min_visibility=0.5):
+        self.min_visibility = min_visibility
+        self.rest_positions = np.ascontiguousarray(mesh.positions, dtype=np.float32)
+        self.rest_normals = np.ascontiguousarray(mesh.normals, dtype=np.float32)
+        self.joints = rest_joints(self.rest_positions)
+        self.bones, self.weights = load_skin_weights(mesh, self.joints, cache_dir)
+
+        self.parents = np.array([-1 if parent is None else parent for _, parent, _, _ in BONES])
+        self.starts = np.array([start for _, _, start, _ in BONES])
+        self.ends = np.array([end for _, _, _, end in BONES])
+        self.rest_directions = self.joints[self.ends] - self.joints[self.starts]
+        self.rest_torso = torso_frame(self.joints[HIP_CENTER], self.joints[SHOULDER_CENTER],
+                                      self.joints[11], self.joints[12])
+        self.rest_torso_length = float(np.linalg.norm(self.rest_directions[TORSO]))
+
+        # Bone transforms: rotation and translation so a rest point v maps to R v + t
+        self.rotations = np.tile(np.eye(3), (len(BONES), 1, 1))
+        self.translations = np.zeros((len(BONES), 3))
+        self.positions = self.rest_positions.copy()
+        self.normals = self.rest_normals.copy()
+
+    def pose_bones(self, points, visibility=None):
+        """Bone rotations and translations for one frame of pose points in scene coordinates."""
+        joints = np.empty((JOINT_COUNT, 3))
+        joints[:33] = points
+        joints[HIP_CENTER] = (points[23] + points[24]) / 2
+        joints[SHOULDER_CENTER] = (points[11] + points[12]) / 2
+        visible = np.ones(JOINT_COUNT, dtype=bool)
+        if visibility is not None:
+            visible[:33] = visibility >= self.min_visibility
+
+        torso_length = np.linalg.norm(joints[SHOULDER_CENTER] - joints[HIP_CENTER])
+        scale = torso_length / self.rest_torso_length if torso_length > 1e-6 else 1.0
+        frame = torso_frame(joints[HIP_CENTER], joints[SHOULDER_CENTER], joints[11], joints[12])
+        rotations = self.rotations
+        translations = self.translations
+        rotations[TORSO] = frame @ self.rest_torso.T
+        # Scale is folded into the rotation part; translations place each bone's rest start joint
+        rotations[TORSO] *= scale
+        translations[TORSO] = joints[HIP_CENTER] - rotations[TORSO] @ self.joints[HIP_CENTER]
+
+        for level in BONE_LEVELS:
+            parents = self.parents[level]
+            # Where the parent carries this bone's start joint, and the direction it would point unturned
+            starts = np.einsum('nij,nj->ni', rotations[parents], self.joints[self.starts[level]]) \
+                + translations[parents]
+            carried = np.einsum('nij,nj->ni', rotations[parents], self.rest_directions[level])
+            tracked = joints[self.ends[level]] - joints[self.starts[level]]
+            seen = visible[self.starts[level]] & visible[self.ends[level]] \
+                & (np.linalg.norm(tracked, axis=1) > 1e-6)
+            target = np.where(seen[:, None], tracked, carried)
+            rotations[level] = np.einsum('nij,njk->nik', rotations_between(carried, target), rotations[parents])
+            translations[level] = starts - np.einsum('nij,nj->ni', rotations[level], self.joints[self.starts[level]])
+        return rotations, translations
+
+    def pose(self, points, visibility=None):
+        """Skinned vertex positions and normals for one frame. The returned arrays are reused."""
+        rotations, translations = self.pose_bones(points, visibility)
+        first, second = self.bones[:, 0], self.bones[:, 1]
+        w0 = self.weights[:, 0, None]
+        w1 = self.weights[:, 1, None]
+        blended = rotations[first] * w0[..., None] + rotations[second] * w1[..., None]
+        offsets = translations[first] * w0 + translations[second] * w1
+
+        np.add(np.einsum('nij,nj->ni', blended, self.rest_positions), offsets, out=self.positions, casting='unsafe')
+        normals = np.einsum('nij,nj->ni', blended, self.rest_normals)
+        normals /= np.maximum(np.linalg.norm(normals, axis=1, keepdims=True), 1e-12)
+        self.normals[:] = normals
+        return self.positions, self.normals
@@ -0,0 +1,581 @@
+import argparse
+import time
+
+
+def synthetic_song_names(count):
+    words = ("Night", "Drive", "Echo", "Pulse", "Sunset", "Bass", "Deep", "Motion", "Signal", "Wave")
+    return [f"{words[i % 10]} {words[(i // 10) % 10]} {i:06d}" for i in range(count)]
+
+
+def synthetic_tracks(count):
+    return [{'id': i + 1, 'path': f"music/{name}.mp3", 'name': name, 'ext': '.mp3'}
+            for i, name in enumerate(synthetic_song_names(count))]
+
+
+def bench_ui_draw(sizes=(100, 1000, 10000, 50000), frames=300):
+    """UIEngine.draw time per frame against library size: idle, hover changes, stepped scrolling and kinetic flings."""
+    from UIEngine import UIEngine
+    from music_library import MusicLibrary
+
+    print(f"{'songs':>8} {'idle ms':>9} {'hover ms':>9} {'scroll ms':>10} {'fling ms':>9}")
+    for size in sizes:
+        library = MusicLibrary(synthetic_tracks(size))
+        ui = UIEngine()
+        ui.set_library(library)
+        ui.set_song_list(1, library.order)
+        ui.set_song_list(2, library.order)
+        current = library.order[-1]
+        ui.draw(ui.deck1_songs, ui.deck2_songs, current, None)
+
+        start = time.perf_counter()
+        for _ in range(frames):
+            ui.draw(ui.deck1_songs, ui.deck2_songs, current, None)
+        idle = (time.perf_counter() - start) / frames
+
+        start = time.perf_counter()
+        for i in range(frames):
+            ui.selected_song_deck1 = i % 6
+            ui.draw(ui.deck1_songs, ui.deck2_songs, current, None)
+        hover = (time.perf_counter() - start) / frames
+
+        start = time.perf_counter()
+        for i in range(frames):
+            ui.scroll_list(1, 1 if (i // 50) % 2 == 0 else -1)
+            ui.draw(ui.deck1_songs, ui.deck2_songs, current, None)
+        scroll = (time.perf_counter() - start) / frames
+
+        start = time.perf_counter()
+        for i in range(frames):
+            if i % 50 == 0:
+                ui.fling_list(1, 400.0 if (i // 50) % 2 == 0 else -400.0)
+            ui.draw(ui.deck1_songs, ui.deck2_songs, current, None)
+        fling = (time.perf_counter() - start) / frames
+
+        print(f"{size:>8} {idle * 1000:>9.3f} {hover * 1000:>9.3f} {scroll * 1000:>10.3f} {fling * 1000:>9.3f}")
+    print(f"label cache: {ui.label_cache.stats()}")
+
+
+def bench_label_cache(frames=2000):
+    """cv2.putText against cached label sprites for a screenful of song rows."""
+    import cv2
+    import numpy as np
+
+    from label_cache import LabelSpriteCache
+
+    names = synthetic_song_names(12)
+    img = np.full((400, 400, 3), 60, dtype=np.uint8)
+    cache = LabelSpriteCache()
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        for row, name in enumerate(names):
+            cv2.putText(img, name, (10, 20 + row * 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (245, 245, 245), 1,
+                        cv2.LINE_AA)
+    put_text = (time.perf_counter() - start) / frames
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        for row, name in enumerate(names):
+            cache.blit(img, name, (10, 20 + row * 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (245, 245, 245), 1,
+                       cv2.LINE_AA)
+    cached = (time.perf_counter() - start) / frames
+
+    print(f"putText {put_text * 1000:.3f} ms/frame, sprite cache {cached * 1000:.3f} ms/frame")
+    print(f"label cache: {cache.stats()}")
+
+
+def bench_waveform(minutes=(1, 10, 60), frames=300):
+    """Waveform pyramid build time and zoomed waveform draw time per frame against track length."""
+    import numpy as np
+
+    from UIEngine import UIEngine
+    from waveform import WaveformPyramid
+
+    samplerate = 44100
+    print(f"{'minutes':>8} {'build ms':>9} {'draw ms':>9}")
+    for length in minutes:
+        t = np.arange(length * 60 * samplerate, dtype=np.float32) / samplerate
+        data = (np.sin(t * 440.0) * np.sin(t * 0.5) ** 2).astype(np.float32)
+
+        start = time.perf_counter()
+        pyramid = WaveformPyramid.build(data, samplerate)
+        build = time.perf_counter() - start
+
+        ui = UIEngine()
+        ui.set_waveform(1, pyramid)
+        ui.draw(ui.deck1_songs, ui.deck2_songs)
+        step = pyramid.length / (frames * 10)
+        start = time.perf_counter()
+        for i in range(frames):
+            ui.set_playhead(1, i * step)
+            ui.draw(ui.deck1_songs, ui.deck2_songs)
+        draw = (time.perf_counter() - start) / frames
+
+        print(f"{length:>8} {build * 1000:>9.1f} {draw * 1000:>9.3f}")
+
+
+def bench_library_index(files=100000, per_dir=100):
+    """Library index cold build, warm startup and startup after one folder changed, on a nested synthetic library."""
+    import os
+    import tempfile
+
+    from library_index import LibraryIndex
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "music")
+        names = synthetic_song_names(files)
+        for start in range(0, files, per_dir):
+            directory = os.path.join(root, f"artist{start // (per_dir * 10):04d}", f"album{start // per_dir:05d}")
+            os.makedirs(directory)
+            for name in names[start:start + per_dir]:
+                open(os.path.join(directory, name + ".mp3"), 'wb').close()
+        db_path = os.path.join(tmp, "library.sqlite")
+
+        for label in ("cold", "warm", "one folder changed"):
+            if label == "one folder changed":
+                open(os.path.join(directory, "New Track.flac"), 'wb').close()
+            start = time.perf_counter()
+            index = LibraryIndex(db_path)
+            stats = index.refresh(root)
+            tracks = index.tracks(root)
+            index.close()
+            elapsed = time.perf_counter() - start
+            print(f"{label:>18}: {elapsed * 1000:8.1f} ms, {len(tracks)} tracks, "
+                  f"{stats['rescanned']}/{stats['dirs']} dirs rescanned, {stats['added']} added")
+
+
+def bench_search(tracks=100000, repeats=50):
+    """Search index build time and query latency at library scale, for one-shot and incrementally typed queries."""
+    from music_library import MusicLibrary
+    from search import SearchIndex, SearchSession
+
+    library = MusicLibrary(synthetic_tracks(tracks))
+    start = time.perf_counter()
+    index = SearchIndex(library)
+    print(f"index build: {(time.perf_counter() - start) * 1000:.1f} ms for {tracks} tracks")
+
+    for query in ("n", "night", "night dr", "pulse echo 0001", "nigth drvie", "sunste", "000123"):
+        index.search(query)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            results = index.search(query)
+        elapsed = (time.perf_counter() - start) / repeats
+        print(f"{query!r:>20}: {elapsed * 1000:7.3f} ms, {len(results)} results")
+
+    typed = "night drive 0001"
+    start = time.perf_counter()
+    for _ in range(repeats):
+        session = SearchSession(index)
+        for char in typed:
+            session.type(char)
+    elapsed = (time.perf_counter() - start) / (repeats * len(typed))
+    print(f"incremental typing: {elapsed * 1000:.3f} ms per keystroke")
+
+    # End to end as VisionEngine.apply_search does it: query, both deck lists, and the next UI frame
+    from UIEngine import UIEngine
+    ui = UIEngine()
+    ui.set_library(library)
+    ui.set_song_list(1, index.ids)
+    ui.set_song_list(2, index.ids)
+    ui.draw(ui.deck1_songs, ui.deck2_songs)
+    session = SearchSession(index)
+    keys = list(typed) + [None] * len(typed)
+    worst = 0.0
+    start = time.perf_counter()
+    for key in keys:
+        key_start = time.perf_counter()
+        if key is None:
+            session.backspace()
+        else:
+            session.type(key)
+        ui.set_song_list(1, session.results, sorted_labels=not session.active)
+        ui.set_song_list(2, session.results, sorted_labels=not session.active)
+        ui.draw(ui.deck1_songs, ui.deck2_songs)
+        worst = max(worst, time.perf_counter() - key_start)
+    elapsed = (time.perf_counter() - start) / len(keys)
+    print(f"typing then deleting with deck lists and draw: {elapsed * 1000:.3f} ms per key, "
+          f"worst {worst * 1000:.3f} ms")
+
+
+def bench_quality_waits(target_fps=30.0, frames=600):
+    """
+    Adaptive quality against a loop paced by a camera at the target rate: the capture and present
+    waits fill the frame, but only the work counts, so light work holds full quality and heavy
+    work steps down and recovers. Raises if an idle wait lowers the level.
+    """
+    from quality_controller import QualityController
+
+    controller = QualityController(target_fps)
+    period = 1.0 / target_fps
+    print(f"{'work ms':>8} {'level':>6} {'steps down':>11} {'steps up':>9}")
+    for work in (0.008, 0.045, 0.008):
+        for _ in range(frames):
+            waits = max(0.0, period - work)
+            controller.update({'capture': waits, 'convert': work * 0.1, 'inference': work * 0.6,
+                               'gestures': work * 0.1, 'ui': work * 0.1, 'compose': work * 0.1, 'present': 0.001})
+        print(f"{work * 1000:>8.1f} {controller.level_index:>6} {controller.steps_down:>11} {controller.steps_up:>9}")
+        if work < period * controller.headroom and controller.level_index != 0:
+            raise AssertionError(f"light work at {work * 1000:.1f} ms left quality at level {controller.level_index}")
+
+
+class GLCallCounter:
+    """Counts calls to the gl* functions that modules imported, by wrapping them in the modules' namespaces."""
+
+    def __init__(self, *modules):
+        self.modules = modules
+        self.saved = []
+        self.calls = 0
+
+    def wrap(self, function):
+        def counted(*args, **kwargs):
+            self.calls += 1
+            return function(*args, **kwargs)
+        return counted
+
+    def __enter__(self):
+        for module in self.modules:
+            for name, value in list(vars(module).items()):
+                if name.startswith("gl") and callable(value):
+                    self.saved.append((module, name, value))
+                    setattr(module, name, self.wrap(value))
+        return self
+
+    def __exit__(self, *exc):
+        for module, name, value in self.saved:
+            setattr(module, name, value)
+        self.saved = []
+
+
+class StaticResults:
+    """A pose or hands processor that answers every frame with the same results."""
+
+    def __init__(self, results):
+        self.results = results
+
+    def process(self, image):
+        return self.results
+
+    def close(self):
+        pass
+
+
+def synthetic_avatar_results(seed=0):
+    """Plausible pose and two-hand landmark results, for driving AvatarEngine without MediaPipe."""
+    import numpy as np
+    from landmark_session import Handedness, HandsResult, Landmark, LandmarkList, PoseResult
+
+    rng = np.random.default_rng(seed)
+    pose = rng.uniform((0.3, 0.1, -0.2), (0.7, 0.9, 0.2), size=(33, 3))
+    hands = [rng.uniform((x - 0.1, 0.3, -0.05), (x + 0.1, 0.5, 0.05), size=(21, 3)) for x in (0.3, 0.7)]
+    pose_results = PoseResult(LandmarkList([Landmark(*map(float, point)) for point in pose]))
+    hands_results = HandsResult([LandmarkList([Landmark(*map(float, point)) for point in hand]) for hand in hands],
+                                [Handedness('Left'), Handedness('Right')])
+    return pose_results, hands_results
+
+
+def bench_avatar_render(frames=300, model_path="models/MaleTron_Lowpoly.obj"):
+    """Avatar render time and GL calls per frame for the skeleton and both hands, without and with the skinned model."""
+    import numpy as np
+    import AvatarEngine as avatar_module
+    import avatar_mesh
+    import skeleton_renderer
+
+    pose_results, hands_results = synthetic_avatar_results()
+    avatar = avatar_module.AvatarEngine(pose_processor=StaticResults(pose_results),
+                                        hands_processor=StaticResults(hands_results), parallel_inference=False)
+    avatar.setup_window()
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    avatar.process_frame(frame)
+    avatar.show(avatar.pose_points, avatar.pose_visibility, avatar.hand_points)
+
+    print(f"{'scene':>16} {'GL calls':>9} {'render ms':>10}")
+    for label in ("skeleton", "skeleton + model"):
+        if label != "skeleton":
+            avatar.load_model(model_path)
+        avatar.render()
+        with GLCallCounter(avatar_module, avatar_mesh, skeleton_renderer) as counter:
+            avatar.render()
+        start = time.perf_counter()
+        for _ in range(frames):
+            avatar.render()
+        render = (time.perf_counter() - start) / frames
+        print(f"{label:>16} {counter.calls:>9} {render * 1000:>10.3f}")
+
+    start = time.perf_counter()
+    for i in range(frames):
+        avatar.process_frame(frame, i)
+    print(f"process_frame: {(time.perf_counter() - start) / frames * 1000:.3f} ms")
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        avatar.model_skin.pose(avatar.pose_points, avatar.pose_visibility)
+    skin = (time.perf_counter() - start) / frames
+    print(f"skinning {len(avatar.model_data.positions)} vertices: {skin * 1000:.3f} ms "
+          f"({skin * 60 * 100:.1f}% of a 60 fps frame)")
+    avatar.close()
+
+
+def bench_avatar_inference(source="0", frames=200):
+    """Avatar mode pose and hands inference per frame, run in series and side by side. Needs a frame source and MediaPipe."""
+    from AvatarEngine import AvatarEngine
+    from frame_sources import open_frame_source
+    from model_pool import ModelPool
+
+    model_pool = ModelPool()
+    print(f"{'mode':>9} {'pose ms':>8} {'hands ms':>9} {'frame ms':>9}")
+    for parallel in (False, True):
+        cap = open_frame_source(source)
+        if not cap.isOpened():
+            print(f"ERROR: Cannot open source {source!r}")
+            return
+        avatar = AvatarEngine(cap=cap, model_pool=model_pool, parallel_inference=parallel)
+        for _ in range(frames):
+            ret, frame = cap.read()
+            if not ret:
+                break
+            avatar.process_frame(frame, cap.timestamp)
+        times = avatar.inference_stats()
+        label = "parallel" if parallel else "serial"
+        print(f"{label:>9} {times['pose']:>8.2f} {times['hands']:>9.2f} {times['frame']:>9.2f}")
+        avatar.close()
+        cap.release()
+    model_pool.close()
+
+
+def bench_mode_switch(source="0", switches=10, frames=10):
+    """
+    DJ/avatar mode switch latency with the shared capture source and model pool, against one frame period.
+    Needs a camera (or another frame source), MediaPipe and an OpenGL display.
+    """
+    import cv2
+    from AvatarEngine import AvatarEngine
+    from UIEngine import UIEngine
+    from VisionEngine import VisionEngine
+    from frame_sources import open_frame_source
+    from model_pool import ModelPool
+    from music_library import MusicLibrary
+
+    cap = open_frame_source(source)
+    if not cap.isOpened():
+        print(f"ERROR: Cannot open source {source!r}")
+        return
+    model_pool = ModelPool()
+    library = MusicLibrary(synthetic_tracks(100))
+    ui = UIEngine()
+    ui.set_library(library)
+    ui.set_song_list(1, library.order)
+    ui.set_song_list(2, library.order)
+    vision = VisionEngine(None, None, ui, library, cap=cap, model_pool=model_pool)
+    for _ in range(frames):
+        vision.process()
+
+    start = time.perf_counter()
+    avatar = AvatarEngine(cap=cap, model_pool=model_pool)
+    print(f"avatar engine with cold pose model: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    period = 1.0 / (cap.fps or 30.0)
+    print(f"{'switch':>8} {'to avatar ms':>13} {'first frame ms':>15} {'to DJ ms':>9} {'first frame ms':>15}")
+    for i in range(switches):
+        start = time.perf_counter()
+        vision.stop_presenter()
+        cv2.destroyAllWindows()
+        avatar.enter()
+        to_avatar = time.perf_counter() - start
+        avatar.step()
+        avatar_frame = time.perf_counter() - start - to_avatar
+        for _ in range(frames):
+            avatar.step()
+
+        start = time.perf_counter()
+        avatar.leave()
+        to_dj = time.perf_counter() - start
+        vision.process()
+        dj_frame = time.perf_counter() - start - to_dj
+        for _ in range(frames):
+            vision.process()
+
+        label = "cold" if i == 0 else str(i)
+        print(f"{label:>8} {to_avatar * 1000:>13.2f} {avatar_frame * 1000:>15.2f} {to_dj * 1000:>9.2f} "
+              f"{dj_frame * 1000:>15.2f}")
+    print(f"frame period: {period * 1000:.1f} ms")
+
+    vision.stop_presenter()
+    avatar.close()
+    cap.release()
+    model_pool.close()
+
+
+def bench_mesh_load(model_path="models/MaleTron_Lowpoly.obj", repeats=20):
+    """Avatar model load time: parsing the OBJ, a cold cache (parse and write) and a warm memory-mapped cache."""
+    import shutil
+    import tempfile
+
+    from avatar_mesh import MeshData, load_mesh
+
+    cache_dir = tempfile.mkdtemp(prefix="stiwi_mesh_")
+    try:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            mesh = MeshData.from_obj(model_path)
+        parse = (time.perf_counter() - start) / repeats
+
+        start = time.perf_counter()
+        load_mesh(model_path, cache_dir)
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            cached = load_mesh(model_path, cache_dir)
+            # Touch every page, as the upload would
+            cached.positions.sum(), cached.normals.sum(), cached.indices.sum()
+        warm = (time.perf_counter() - start) / repeats
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print(f"{len(mesh.positions)} vertices, {len(mesh.indices) // 3} triangles")
+    print(f"parse OBJ: {parse * 1000:.2f} ms, cold cache: {cold * 1000:.2f} ms, warm cache: {warm * 1000:.3f} ms "
+          f"({parse / warm:.0f}x faster)")
+
+
+def bench_pose_timeline(seconds=10.0, camera_fps=30.0, display_fps=60.0, drop_rate=0.1, seed=0):
+    """
+    Avatar motion smoothness at display rate for a simulated jittery camera that drops frames: showing
+    the latest tracked pose against sampling PoseTimeline at display time.
+    """
+    import numpy as np
+    from pose_tracker import PoseTimeline
+
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(-3.0, 3.0, size=(33, 3))
+
+    def truth(t):
+        return base + np.sin(2 * np.pi * 1.5 * t + base) * 0.8
+
+    captures = np.arange(0.0, seconds, 1.0 / camera_fps)
+    captures += rng.normal(0.0, 0.003, len(captures))
+    captures = np.sort(captures[rng.random(len(captures)) >= drop_rate])
+    ready = captures + rng.uniform(0.010, 0.025, len(captures))
+    displays = np.arange(0.5, seconds, 1.0 / display_fps)
+
+    timeline = PoseTimeline()
+    latest = None
+    pushed = 0
+    shown = {'latest': [], 'timeline': []}
+    for t in displays:
+        while pushed < len(captures) and ready[pushed] <= t:
+            latest = truth(captures[pushed])
+            timeline.push(captures[pushed], ready[pushed], latest)
+            pushed += 1
+        shown['latest'].append(latest)
+        shown['timeline'].append(timeline.sample(t - timeline.display_delay())[0])
+
+    print(f"{'display':>9} {'held %':>7} {'step cv':>8}")
+    for name, poses in shown.items():
+        steps = np.linalg.norm(np.diff(np.array(poses), axis=0), axis=2).mean(axis=1)
+        held = (steps < 1e-9).mean() * 100
+        print(f"{name:>9} {held:>7.1f} {steps.std() / steps.mean():>8.2f}")
+    print(f"timeline display delay: {timeline.display_delay() * 1000:.1f} ms")
+
+
+def synthetic_beat_track(seconds, bpm, samplerate, seed=0):
+    """A stereo test track: a decaying 60 Hz kick on every beat, a noise hat between beats, over soft hiss."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    signal = rng.normal(0.0, 0.03, int(seconds * samplerate))
+    period = 60.0 / bpm
+    kick = np.sin(2 * np.pi * 60 * np.arange(int(0.15 * samplerate)) / samplerate) \
+        * np.exp(-np.arange(int(0.15 * samplerate)) / samplerate * 25) * 0.8
+    hat = rng.normal(0.0, 0.3, int(0.03 * samplerate)) * np.exp(-np.arange(int(0.03 * samplerate)) / samplerate * 100)
+    beats = np.arange(0.0, seconds - 0.2, period)
+    for start in beats:
+        i = int(start * samplerate)
+        signal[i:i + len(kick)] += kick
+        i = int((start + period / 2) * samplerate)
+        signal[i:i + len(hat)] += hat[:len(signal) - i]
+    return np.stack((signal, signal), axis=1).astype(np.float32), len(beats)
+
+
+def bench_audio_pulses(seconds=30.0, bpm=124, samplerate=44100, blocksize=1024):
+    """Audio feed analysis cost per callback block and onset and beat detection on a synthetic beat track."""
+    import numpy as np
+    from audio_feed import AudioFeed, PulseFollower
+
+    track, beats = synthetic_beat_track(seconds, bpm, samplerate)
+    feed = AudioFeed(samplerate=samplerate)
+    pulses = PulseFollower()
+    publish = []
+    follow = []
+    for i in range(0, len(track) - blocksize + 1, blocksize):
+        start = time.perf_counter()
+        feed.publish(track[i:i + blocksize])
+        publish.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        pulses.update(blocksize / samplerate, [feed])
+        follow.append(time.perf_counter() - start)
+
+    budget = blocksize / samplerate
+    print(f"publish: {np.median(publish) * 1e6:.1f} us per {blocksize}-frame block "
+          f"({np.median(publish) / budget * 100:.2f}% of the callback period)")
+    print(f"reader update: {np.median(follow) * 1e6:.1f} us")
+    print(f"beats: {feed.beats} detected of {beats}, onsets: {feed.onsets} detected of {2 * beats} hits")
+
+
+def bench_frame_timing(frames=20000, stages=8):
+    """FrameTimer overhead per mark and per frame, and the cost of summaries and export."""
+    import os
+    import tempfile
+    from frame_timing import FrameTimer
+
+    names = [f"stage{i}" for i in range(stages)]
+    with tempfile.TemporaryDirectory() as directory:
+        for export in (None, "timing.csv", "timing.jsonl"):
+            timer = FrameTimer('bench', names, export_path=os.path.join(directory, export) if export else None)
+            start = time.perf_counter()
+            for _ in range(frames):
+                timer.begin_frame()
+                for name in names:
+                    timer.mark(name)
+                timer.end_frame()
+            timer.close()
+            elapsed = (time.perf_counter() - start) / frames
+            print(f"{export or 'no export':>13}: {elapsed * 1e6:.2f} us per frame of {stages} stages "
+                  f"({elapsed / (1 / 60) * 100:.3f}% of a 60 fps frame)")
+
+    start = time.perf_counter()
+    for _ in range(100):
+        timer.summary()
+    print(f"summary of {timer.capacity} frames: {(time.perf_counter() - start) * 10:.3f} ms")
+
+
+BENCHMARKS = {
+    'ui_draw': bench_ui_draw,
+    'label_cache': bench_label_cache,
+    'waveform': bench_waveform,
+    'library_index': bench_library_index,
+    'search': bench_search,
+    'mode_switch': bench_mode_switch,
+    'avatar_inference': bench_avatar_inference,
+    'avatar_render': bench_avatar_render,
+    'mesh_load': bench_mesh_load,
+    'pose_timeline': bench_pose_timeline,
+    'audio_pulses': bench_audio_pulses,
+    'quality_waits': bench_quality_waits,
+    'frame_timing': bench_frame_timing,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stiwi Pro performance benchmarks")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run (default: all): {', '.join(sorted(BENCHMARKS))}")
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(unknown)}")
+    for name in args.names or sorted(BENCHMARKS):
+        print(f"== {name}")
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import cv2
+import numpy as np
+
+
+class FrameCompositor:
+    """
+    Composes the camera frame and the UI overlay into preallocated buffers.
+
+    Every intermediate image (mirrored frame, RGB copy, inference frame, scaled
+    UI layer, blended output) lives in a named buffer that is only reallocated
+    when its shape changes. The scaled UI layer is cached by UI version, so it
+    is only resized again after the UI redraws. frame_allocations counts buffer
+    allocations in the current frame and should stay at zero once warmed up.
+    """
+
+    def __init__(self, window_name="Stiwi Pro", camera_weight=0.4, ui_weight=0.6):
+        self.window_name = window_name
+        self.camera_weight = camera_weight
+        self.ui_weight = ui_weight
+        self.buffers = {}
+        self.allocations = 0
+        self.frame_allocations = 0
+        self.scaled_ui_version = None
+        self.scaled_ui_source = None
+
+    def begin_frame(self):
+        self.frame_allocations = 0
+
+    def buffer(self, name, shape, dtype=np.uint8):
+        buf = self.buffers.get(name)
+        if buf is None or buf.shape != tuple(shape) or buf.dtype != dtype:
+            buf = np.empty(shape, dtype=dtype)
+            self.buffers[name] = buf
+            self.allocations += 1
+            self.frame_allocations += 1
+            if name == 'ui_scaled':
+                self.scaled_ui_version = None
+        return buf
+
+    def mirror(self, frame):
+        return cv2.flip(frame, 1, dst=self.buffer('mirrored', frame.shape))
+
+    def to_rgb(self, frame):
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.buffer('rgb', frame.shape))
+
+    def resize(self, name, image, size):
+        """Resize into a named buffer; size is (width, height)."""
+        dst = self.buffer(name, (size[1], size[0]) + image.shape[2:], image.dtype)
+        return cv2.resize(image, size, dst=dst, interpolation=cv2.INTER_AREA)
+
+    def compose(self, frame, ui_img, ui_version, output='output'):
+        """Blend the UI over the camera frame in place into the named output buffer."""
+        frame_height, frame_width = frame.shape[:2]
+        if ui_img.shape == frame.shape:
+            ui_layer = ui_img
+        else:
+            ui_layer = self.buffer('ui_scaled', frame.shape)
+            if ui_version != self.scaled_ui_version or ui_img is not self.scaled_ui_source:
+                cv2.resize(ui_img, (frame_width, frame_height), dst=ui_layer)
+                self.scaled_ui_version = ui_version
+                self.scaled_ui_source = ui_img
+
+        output = self.buffer(output, frame.shape)
+        cv2.addWeighted(frame, self.camera_weight, ui_layer, self.ui_weight, 0, dst=output)
+        return output
+
+    def present(self, image):
+        """Show the composed frame; the only window update of the frame. Returns the key pressed, if any."""
+        cv2.imshow(self.window_name, image)
+        return cv2.waitKey(1) & 0xFF
@@ -0,0 +1,363 @@
+import glob
+import os
+import struct
+import time
+
+import cv2
+import numpy as np
+
+
+RAW_MAGIC = b"STWF"
+RAW_HEADER_FORMAT = "<4sIIIf"
+RAW_HEADER_SIZE = 64
+
+SHM_MAGIC = b"STWR"
+SHM_HEADER_FORMAT = "<4sIIII4xQ"
+SHM_HEADER_SIZE = 64
+
+
+class FrameSource:
+    """
+    Common interface for everything the vision loop can read frames from.
+
+    read() returns (ret, frame) like cv2.VideoCapture; after a successful read,
+    timestamp holds the frame time in seconds on the source's own clock and
+    frame_index counts delivered frames. fps paces delivery to a fixed input
+    rate and size resizes frames to a fixed (width, height).
+    """
+
+    def __init__(self, fps=None, size=None):
+        self.fps = fps
+        self.size = size
+        self.timestamp = 0.0
+        self.frame_index = -1
+        self.next_deadline = None
+        self.resized = None
+
+    @property
+    def width(self):
+        return self.size[0] if self.size else self.native_size()[0]
+
+    @property
+    def height(self):
+        return self.size[1] if self.size else self.native_size()[1]
+
+    def native_size(self):
+        raise NotImplementedError
+
+    def _read_frame(self):
+        """Return (ret, frame, timestamp) for the next frame."""
+        raise NotImplementedError
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        ret, frame, timestamp = self._read_frame()
+        if not ret:
+            return False, None
+
+        if self.fps:
+            now = time.perf_counter()
+            if self.next_deadline is None or self.next_deadline < now:
+                self.next_deadline = now
+            else:
+                time.sleep(self.next_deadline - now)
+            self.next_deadline += 1.0 / self.fps
+
+        if self.size and (frame.shape[1], frame.shape[0]) != tuple(self.size):
+            if self.resized is None or self.resized.shape[:2] != (self.size[1], self.size[0]) \
+                    or self.resized.shape[2:] != frame.shape[2:]:
+                self.resized = np.empty((self.size[1], self.size[0]) + frame.shape[2:], dtype=frame.dtype)
+            cv2.resize(frame, tuple(self.size), dst=self.resized, interpolation=cv2.INTER_AREA)
+            frame = self.resized
+
+        self.timestamp = timestamp
+        self.frame_index += 1
+        return True, frame
+
+    def release(self):
+        pass
+
+
+class WebcamSource(FrameSource):
+    def __init__(self, index=0, fps=None, size=None):
+        super().__init__(fps=fps, size=size)
+        self.cap = cv2.VideoCapture(index)
+        if size:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, size[0])
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1])
+        self.start_time = time.perf_counter()
+
+    def native_size(self):
+        return int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def _read_frame(self):
+        ret, frame = self.cap.read()
+        return ret, frame, time.perf_counter() - self.start_time
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    """Frames from a video file; timestamps are media time, so loops keep counting up."""
+
+    def __init__(self, path, loop=False, fps=None, size=None):
+        super().__init__(fps=fps, size=size)
+        self.path = path
+        self.loop = loop
+        self.cap = cv2.VideoCapture(path)
+        self.frame_rate = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.time_offset = 0.0
+        self.last_media_time = 0.0
+
+    def native_size(self):
+        return int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def _read_frame(self):
+        ret, frame = self.cap.read()
+        if not ret and self.loop:
+            # The first frame of the next pass comes one frame after the last one, not at the same time
+            self.time_offset += self.last_media_time + 1.0 / self.frame_rate
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        if not ret:
+            return False, None, None
+
+        self.last_media_time = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        return True, frame, self.time_offset + self.last_media_time
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageSequenceSource(FrameSource):
+    """Frames from a directory or glob of still images, in name order, stamped at a nominal rate."""
+
+    def __init__(self, pattern, frame_rate=30.0, loop=False, fps=None, size=None):
+        super().__init__(fps=fps, size=size)
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "*")
+        extensions = ('.png', '.jpg', '.jpeg', '.bmp')
+        self.paths = sorted(p for p in glob.glob(pattern) if p.lower().endswith(extensions))
+        self.frame_rate = frame_rate
+        self.loop = loop
+        self.position = 0
+        self.first_frame = cv2.imread(self.paths[0]) if self.paths else None
+
+    def native_size(self):
+        if self.first_frame is None:
+            return 0, 0
+        return self.first_frame.shape[1], self.first_frame.shape[0]
+
+    def isOpened(self):
+        return bool(self.paths) and (self.loop or self.position < len(self.paths))
+
+    def _read_frame(self):
+        if not self.paths or (self.position >= len(self.paths) and not self.loop):
+            return False, None, None
+        frame = cv2.imread(self.paths[self.position % len(self.paths)])
+        timestamp = self.position / self.frame_rate
+        self.position += 1
+        return frame is not None, frame, timestamp
+
+
+def write_raw_frames(path, frames, frame_rate=30.0):
+    """Write BGR frames of equal size to a raw frame file readable by RawFrameFileSource."""
+    frames = iter(frames)
+    first = next(frames)
+    height, width = first.shape[:2]
+    channels = first.shape[2] if first.ndim == 3 else 1
+    with open(path, 'wb') as f:
+        f.write(struct.pack(RAW_HEADER_FORMAT, RAW_MAGIC, width, height, channels, frame_rate)
+                .ljust(RAW_HEADER_SIZE, b"\0"))
+        f.write(np.ascontiguousarray(first, dtype=np.uint8).tobytes())
+        for frame in frames:
+            f.write(np.ascontiguousarray(frame, dtype=np.uint8).tobytes())
+
+
+class RawFrameFileSource(FrameSource):
+    """
+    Frames from a raw uint8 frame file, memory-mapped so reads cost no decode
+    and no copy. Frames are read-only views into the map.
+    """
+
+    def __init__(self, path, loop=False, fps=None, size=None):
+        super().__init__(fps=fps, size=size)
+        with open(path, 'rb') as f:
+            header = f.read(RAW_HEADER_SIZE)
+        magic, width, height, channels, frame_rate = struct.unpack_from(RAW_HEADER_FORMAT, header)
+        if magic != RAW_MAGIC:
+            raise ValueError(f"Not a Stiwi Pro raw frame file: {path}")
+
+        frame_bytes = width * height * channels
+        frame_count = (os.path.getsize(path) - RAW_HEADER_SIZE) // frame_bytes
+        self.frames = np.memmap(path, dtype=np.uint8, mode='r', offset=RAW_HEADER_SIZE,
+                                shape=(frame_count, height, width, channels))
+        self.frame_rate = frame_rate
+        self.loop = loop
+        self.position = 0
+
+    def native_size(self):
+        return self.frames.shape[2], self.frames.shape[1]
+
+    def isOpened(self):
+        return len(self.frames) > 0 and (self.loop or self.position < len(self.frames))
+
+    def _read_frame(self):
+        if len(self.frames) == 0 or (self.position >= len(self.frames) and not self.loop):
+            return False, None, None
+        frame = self.frames[self.position % len(self.frames)]
+        timestamp = self.position / self.frame_rate
+        self.position += 1
+        return True, frame, timestamp
+
+    def release(self):
+        self.frames = np.empty((0,) + self.frames.shape[1:], dtype=np.uint8)
+
+
+class _SharedMemoryRing:
+    """
+    Shared-memory layout: a header (magic, width, height, channels, slot count,
+    latest sequence number), per-slot sequence numbers and timestamps, then the
+    slot frames. A slot's sequence number is zeroed while it is being written.
+    """
+
+    def __init__(self, shm, width, height, channels, slots):
+        self.shm = shm
+        self.width = width
+        self.height = height
+        self.channels = channels
+        self.slots = slots
+        buf = shm.buf
+        self.header = np.ndarray((1,), dtype=np.uint64, buffer=buf, offset=24)
+        self.slot_seqs = np.ndarray((slots,), dtype=np.uint64, buffer=buf, offset=SHM_HEADER_SIZE)
+        self.slot_times = np.ndarray((slots,), dtype=np.float64, buffer=buf, offset=SHM_HEADER_SIZE + 8 * slots)
+        self.frames = np.ndarray((slots, height, width, channels), dtype=np.uint8, buffer=buf,
+                                 offset=SHM_HEADER_SIZE + 16 * slots)
+
+    @staticmethod
+    def size(width, height, channels, slots):
+        return SHM_HEADER_SIZE + 16 * slots + slots * width * height * channels
+
+
+class SharedMemoryRingWriter:
+    """Producer side of a shared-memory frame ring, for use by another process."""
+
+    def __init__(self, name, width, height, channels=3, slots=4):
+        from multiprocessing import shared_memory
+
+        self.shm = shared_memory.SharedMemory(name=name, create=True,
+                                              size=_SharedMemoryRing.size(width, height, channels, slots))
+        struct.pack_into(SHM_HEADER_FORMAT, self.shm.buf, 0, SHM_MAGIC, width, height, channels, slots, 0)
+        self.ring = _SharedMemoryRing(self.shm, width, height, channels, slots)
+        self.seq = 0
+        self.start_time = time.perf_counter()
+
+    def write(self, frame, timestamp=None):
+        ring = self.ring
+        seq = self.seq + 1
+        slot = seq % ring.slots
+        ring.slot_seqs[slot] = 0
+        ring.frames[slot] = frame.reshape(ring.frames.shape[1:])
+        ring.slot_times[slot] = time.perf_counter() - self.start_time if timestamp is None else timestamp
+        ring.slot_seqs[slot] = seq
+        ring.header[0] = seq
+        self.seq = seq
+
+    def close(self, unlink=True):
+        self.ring = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def _attach_shared_memory(name):
+    """
+    Attach to a segment another process created, without tracking it: a
+    tracked segment is unlinked by this process's resource tracker on exit,
+    pulling it out from under the producer.
+    """
+    from multiprocessing import shared_memory
+
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching always registers the segment, so undo that
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == 'posix':
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+class SharedMemoryRingSource(FrameSource):
+    """
+    Consumer side of a shared-memory frame ring. Each read returns the newest
+    complete frame, waiting up to timeout seconds for one newer than the last.
+    """
+
+    def __init__(self, name, timeout=1.0, fps=None, size=None):
+        super().__init__(fps=fps, size=size)
+        self.shm = _attach_shared_memory(name)
+        magic, width, height, channels, slots, _ = struct.unpack_from(SHM_HEADER_FORMAT, self.shm.buf, 0)
+        if magic != SHM_MAGIC:
+            raise ValueError(f"Not a Stiwi Pro frame ring: {name}")
+        self.ring = _SharedMemoryRing(self.shm, width, height, channels, slots)
+        self.frame = np.empty((height, width, channels), dtype=np.uint8)
+        self.timeout = timeout
+        self.last_seq = 0
+
+    def native_size(self):
+        return self.ring.width, self.ring.height
+
+    def isOpened(self):
+        return self.ring is not None
+
+    def _read_frame(self):
+        ring = self.ring
+        deadline = time.perf_counter() + self.timeout
+        while True:
+            seq = int(ring.header[0])
+            if seq != self.last_seq:
+                slot = seq % ring.slots
+                if int(ring.slot_seqs[slot]) == seq:
+                    np.copyto(self.frame, ring.frames[slot])
+                    timestamp = float(ring.slot_times[slot])
+                    if int(ring.slot_seqs[slot]) == seq:
+                        self.last_seq = seq
+                        return True, self.frame, timestamp
+            if time.perf_counter() >= deadline:
+                return False, None, None
+            time.sleep(0.001)
+
+    def release(self):
+        if self.ring is not None:
+            self.ring = None
+            self.shm.close()
+
+
+def open_frame_source(spec=0, fps=None, size=None, loop=False):
+    """
+    Open a frame source from a spec: a camera index ("0"), "shm:NAME" for a
+    shared-memory ring, a .stwf raw frame file, a directory or glob of images,
+    or any video file OpenCV can decode.
+    """
+    if isinstance(spec, int) or str(spec).isdigit():
+        return WebcamSource(int(spec), fps=fps, size=size)
+
+    spec = str(spec)
+    if spec.startswith("shm:"):
+        return SharedMemoryRingSource(spec[4:], fps=fps, size=size)
+    if spec.lower().endswith(".stwf"):
+        return RawFrameFileSource(spec, loop=loop, fps=fps, size=size)
+    if os.path.isdir(spec) or any(c in spec for c in "*?["):
+        return ImageSequenceSource(spec, loop=loop, fps=fps, size=size)
+    return VideoFileSource(spec, loop=loop, fps=fps, size=size)
@@ -0,0 +1,191 @@
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+
+
+def timing_export_path(path, name):
+    """The export file for one timer of a session: 'timing.csv' becomes 'timing.vision.csv' for the vision timer."""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{name}{ext or '.jsonl'}"
+
+
+class FrameTimer:
+    """
+    Per-stage frame times kept in a fixed-size ring buffer.
+
+    A frame is timed with begin_frame(), then mark(stage) at the end of each
+    stage, which charges the time since the previous mark to that stage, and
+    end_frame(), which stores the frame as one row. Stages are declared up
+    front, so every row has the same columns and a mark is a dict lookup, a
+    perf_counter call and an array store. The ring holds the last `capacity`
+    frames; summary() gives the mean and p50/p95/p99 of every stage and of
+    the whole frame over them. last holds the latest frame's stage seconds.
+
+    With an export path, every frame is also written to it as CSV or JSON
+    lines, chosen by the extension. Rows are written in batches of
+    export_batch frames, and the rest on close(), so the file holds the
+    whole session without a write per frame or a long stall on any one.
+    """
+
+    def __init__(self, name, stages, capacity=600, export_path=None, export_batch=30, hud_interval=0.5):
+        self.name = name
+        self.stages = tuple(stages)
+        self.columns = {stage: column for column, stage in enumerate(self.stages)}
+        self.capacity = capacity
+        self.times = np.zeros((capacity, len(self.stages)))
+        self.starts = np.zeros(capacity)
+        self.row = np.zeros(len(self.stages))
+        self.frames = 0
+        self.origin = time.perf_counter()
+        self.frame_start = None
+        self.stage_start = None
+        self.last = dict.fromkeys(self.stages, 0.0)
+
+        self.hud_interval = hud_interval
+        self.hud_time = None
+        self.hud_cache = []
+
+        self.export_path = export_path
+        self.export_batch = min(export_batch, capacity)
+        self.export_file = None
+        self.export_csv = False
+        self.exported = 0
+        if export_path:
+            self.open_export(export_path)
+
+    def begin_frame(self):
+        self.frame_start = self.stage_start = time.perf_counter()
+        self.row.fill(0.0)
+
+    def mark(self, stage):
+        """End `stage`: charge it with the time since the previous mark or begin_frame()."""
+        now = time.perf_counter()
+        if self.stage_start is not None:
+            self.row[self.columns[stage]] += now - self.stage_start
+        self.stage_start = now
+
+    def end_frame(self):
+        if self.frame_start is None:
+            return
+        index = self.frames % self.capacity
+        self.times[index] = self.row
+        self.starts[index] = self.frame_start - self.origin
+        self.frames += 1
+        self.last = dict(zip(self.stages, self.row.tolist()))
+        self.frame_start = None
+        if self.export_file is not None and self.frames - self.exported >= self.export_batch:
+            self.flush()
+
+    def recent(self, first=None):
+        """(frame numbers, start times, stage times) of the frames still in the ring, oldest first."""
+        count = min(self.frames, self.capacity)
+        first = self.frames - count if first is None else max(first, self.frames - count)
+        numbers = np.arange(first, self.frames)
+        rows = numbers % self.capacity
+        return numbers, self.starts[rows], self.times[rows]
+
+    def summary(self):
+        """{stage or 'frame': {'mean', 'p50', 'p95', 'p99'} in ms} over the frames in the ring."""
+        _, _, times = self.recent()
+        if not len(times):
+            return {}
+        times = np.column_stack((times, times.sum(axis=1))) * 1000.0
+        means = times.mean(axis=0)
+        percentiles = np.percentile(times, PERCENTILES, axis=0)
+        summary = {}
+        for column, stage in enumerate(self.stages + ('frame',)):
+            summary[stage] = {'mean': float(means[column])}
+            for p, values in zip(PERCENTILES, percentiles):
+                summary[stage][f"p{p}"] = float(values[column])
+        return summary
+
+    def summary_rows(self):
+        """Header and one row of formatted mean, p50, p95, p99 ms per stage, slowest p95 first, the frame last."""
+        summary = self.summary()
+        if not summary:
+            return [(self.name, "no frames")]
+        frame = summary.pop('frame')
+        rows = [(self.name, 'mean', 'p50', 'p95', 'p99')]
+        for stage, stats in sorted(summary.items(), key=lambda item: -item[1]['p95']) + [('frame', frame)]:
+            rows.append((stage,) + tuple(f"{stats[key]:.2f}" for key in ('mean', 'p50', 'p95', 'p99')))
+        return rows
+
+    @staticmethod
+    def format_rows(rows):
+        return [f"{row[0]:<10}" + "".join(f"{cell:>8}" for cell in row[1:]) for row in rows]
+
+    def report(self):
+        """The summary as aligned text lines."""
+        return self.format_rows(self.summary_rows())
+
+    def hud_rows(self):
+        """summary_rows(), recomputed at most every hud_interval seconds so a HUD costs nothing per frame."""
+        now = time.perf_counter()
+        if self.hud_time is None or now - self.hud_time >= self.hud_interval:
+            self.hud_time = now
+            self.hud_cache = self.summary_rows()
+        return self.hud_cache
+
+    def hud_lines(self):
+        return self.format_rows(self.hud_rows())
+
+    def draw_hud(self, img, origin=(10, 10), scale=0.45, color=(0, 255, 0)):
+        """Draw the HUD onto a BGR image over a darkened box, one fixed-width column per statistic."""
+        rows = self.hud_rows()
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        line_height = int(22 * scale / 0.45)
+        name_width = cv2.getTextSize("inference ", font, scale, 1)[0][0]
+        cell_width = cv2.getTextSize("0000.00", font, scale, 1)[0][0] + 8
+        x, y = origin
+        box = img[y:y + line_height * len(rows) + 8, x:x + name_width + 4 * cell_width + 12]
+        box //= 3
+        for row, cells in enumerate(rows):
+            baseline = y + line_height * (row + 1)
+            cv2.putText(img, cells[0], (x + 6, baseline), font, scale, color, 1, cv2.LINE_AA)
+            if len(cells) == 2:
+                cv2.putText(img, cells[1], (x + 6 + name_width, baseline), font, scale, color, 1, cv2.LINE_AA)
+                continue
+            for column, cell in enumerate(cells[1:]):
+                # Right-aligned so the decimal points line up
+                right = x + 6 + name_width + (column + 1) * cell_width
+                left = right - cv2.getTextSize(cell, font, scale, 1)[0][0]
+                cv2.putText(img, cell, (left, baseline), font, scale, color, 1, cv2.LINE_AA)
+
+    def open_export(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.export_file = open(path, 'w', newline='')
+        self.export_csv = path.lower().endswith('.csv')
+        self.exported = self.frames
+        if self.export_csv:
+            self.export_file.write(",".join(('frame', 'time') + self.stages + ('total',)) + "\n")
+
+    def flush(self):
+        """Write the frames recorded since the last flush to the export file."""
+        if self.export_file is None or self.exported >= self.frames:
+            return
+        numbers, starts, times = self.recent(self.exported)
+        times = times * 1000.0
+        totals = times.sum(axis=1)
+        lines = []
+        for number, start, row, total in zip(numbers.tolist(), starts.tolist(), times.tolist(), totals.tolist()):
+            if self.export_csv:
+                lines.append(f"{number},{start:.6f}," + ",".join(f"{value:.3f}" for value in row) + f",{total:.3f}\n")
+            else:
+                stages = {stage: round(value, 3) for stage, value in zip(self.stages, row)}
+                lines.append(json.dumps({'timer': self.name, 'frame': number, 'time': round(start, 6),
+                                         'stages': stages, 'total': round(total, 3)}) + "\n")
+        self.export_file.writelines(lines)
+        self.exported = self.frames
+
+    def close(self):
+        if self.export_file is not None:
+            self.flush()
+            self.export_file.close()
+            self.export_file = None
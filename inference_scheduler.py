@@ -0,0 +1,128 @@
+import cv2
+import numpy as np
+
+
+class HandInferenceScheduler:
+    """
+    Decides how to run hand inference on each frame to save CPU.
+
+    Cheap frame differencing on a tiny grayscale probe detects motion. With no
+    motion the previous results are reused (up to max_skip_tracked frames while
+    hands are visible, max_skip_empty while none are) and stale is set, so
+    callers can tell a repeat from a new result. Otherwise inference runs on a
+    padded crop around the last known hands, falling back to the full frame
+    when the crop loses them. Crops go to their own roi_processor, a
+    static-mode graph, because feeding crops and full frames through one
+    tracking graph breaks its tracking; without one, crops are not used.
+    counters records how often each path was taken.
+    """
+
+    PATHS = ('full', 'roi', 'skipped', 'roi_lost')
+
+    def __init__(self, hands_processor, roi_processor=None, motion_threshold=2.0, max_skip_tracked=2, max_skip_empty=6,
+                 roi_padding=0.35, min_roi_size=0.35, probe_size=(64, 36), roi_crop=True):
+        self.hands_processor = hands_processor
+        self.roi_processor = roi_processor
+        self.motion_threshold = motion_threshold
+        self.max_skip_tracked = max_skip_tracked
+        self.max_skip_empty = max_skip_empty
+        self.roi_padding = roi_padding
+        self.min_roi_size = min_roi_size
+        self.probe_size = probe_size
+        self.roi_crop = roi_crop
+
+        self.probe = np.zeros((probe_size[1], probe_size[0], 3), dtype=np.uint8)
+        self.gray = np.zeros((probe_size[1], probe_size[0]), dtype=np.uint8)
+        self.prev_gray = None
+        self.diff = np.zeros_like(self.gray)
+
+        self.last_results = None
+        self.stale = False
+        self.roi = None
+        self.skipped_in_row = 0
+
+        self.counters = dict.fromkeys(self.PATHS, 0)
+        self.frames = 0
+        self.last_path = None
+        self.last_motion = 0.0
+
+    def measure_motion(self, frame_rgb):
+        cv2.resize(frame_rgb, self.probe_size, dst=self.probe, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self.probe, cv2.COLOR_RGB2GRAY, dst=self.gray)
+        if self.prev_gray is None:
+            self.prev_gray = self.gray.copy()
+            return float('inf')
+        cv2.absdiff(self.gray, self.prev_gray, dst=self.diff)
+        self.gray, self.prev_gray = self.prev_gray, self.gray
+        return float(cv2.mean(self.diff)[0])
+
+    def process(self, frame_rgb):
+        self.frames += 1
+        self.last_motion = self.measure_motion(frame_rgb)
+
+        has_hands = self.last_results is not None and bool(self.last_results.multi_hand_landmarks)
+        max_skip = self.max_skip_tracked if has_hands else self.max_skip_empty
+        if (self.last_results is not None and self.last_motion < self.motion_threshold
+                and self.skipped_in_row < max_skip):
+            self.skipped_in_row += 1
+            return self._finish('skipped', self.last_results)
+        self.skipped_in_row = 0
+
+        if self.roi_crop and self.roi_processor is not None and self.roi is not None:
+            results = self._process_roi(frame_rgb)
+            if results.multi_hand_landmarks:
+                return self._finish('roi', results)
+            self.counters['roi_lost'] += 1
+
+        return self._finish('full', self.hands_processor.process(frame_rgb))
+
+    def _process_roi(self, frame_rgb):
+        frame_height, frame_width = frame_rgb.shape[:2]
+        x0, y0, x1, y1 = self.roi
+        px0, py0 = int(x0 * frame_width), int(y0 * frame_height)
+        px1, py1 = int(np.ceil(x1 * frame_width)), int(np.ceil(y1 * frame_height))
+        crop = np.ascontiguousarray(frame_rgb[py0:py1, px0:px1])
+        results = self.roi_processor.process(crop)
+
+        if results.multi_hand_landmarks:
+            scale_x = (px1 - px0) / frame_width
+            scale_y = (py1 - py0) / frame_height
+            offset_x = px0 / frame_width
+            offset_y = py0 / frame_height
+            for hand_lms in results.multi_hand_landmarks:
+                for lm in hand_lms.landmark:
+                    lm.x = offset_x + lm.x * scale_x
+                    lm.y = offset_y + lm.y * scale_y
+                    lm.z = lm.z * scale_x
+        return results
+
+    def _finish(self, path, results):
+        self.counters[path] += 1
+        self.last_path = path
+        self.stale = path == 'skipped'
+        if path != 'skipped':
+            self.last_results = results
+            self.roi = self._roi_from(results)
+        return results
+
+    def _roi_from(self, results):
+        if not results.multi_hand_landmarks:
+            return None
+
+        xs = [lm.x for hand_lms in results.multi_hand_landmarks for lm in hand_lms.landmark]
+        ys = [lm.y for hand_lms in results.multi_hand_landmarks for lm in hand_lms.landmark]
+        x0, x1, y0, y1 = min(xs), max(xs), min(ys), max(ys)
+
+        w = max(self.min_roi_size, (x1 - x0) * (1 + 2 * self.roi_padding))
+        h = max(self.min_roi_size, (y1 - y0) * (1 + 2 * self.roi_padding))
+        cx = (x0 + x1) / 2
+        cy = (y0 + y1) / 2
+        roi = (max(0.0, cx - w / 2), max(0.0, cy - h / 2), min(1.0, cx + w / 2), min(1.0, cy + h / 2))
+        if roi[2] - roi[0] >= 0.9 and roi[3] - roi[1] >= 0.9:
+            return None  # Hands span the frame; cropping would save nothing
+        return roi
+
+    def summary(self):
+        """Share of frames that took each path."""
+        total = max(1, self.frames)
+        return {path: count / total for path, count in self.counters.items()}
@@ -0,0 +1,98 @@
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+class LabelSprite:
+    """A rasterised text label: premultiplied colour plus alpha, cropped to its ink, placed relative to the text origin."""
+    __slots__ = ('premultiplied', 'alpha', 'offset_x', 'offset_y', 'nbytes')
+
+    def __init__(self, premultiplied, alpha, offset_x, offset_y):
+        self.premultiplied = premultiplied
+        self.alpha = alpha
+        self.offset_x = offset_x
+        self.offset_y = offset_y
+        self.nbytes = premultiplied.nbytes + alpha.nbytes
+
+
+class LabelSpriteCache:
+    """
+    LRU cache of pre-rendered text sprites keyed by text, font, scale, colour,
+    thickness and line type. blit() composites a sprite into a frame with
+    vectorised alpha blending, giving the same result as cv2.putText without
+    rasterising the glyphs again. Least recently used sprites are evicted once
+    the cache holds more than max_bytes.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.sprites = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, text, font, scale, color, thickness=1, line_type=cv2.LINE_AA):
+        key = (text, font, scale, tuple(color), thickness, line_type)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            self.hits += 1
+            return sprite
+
+        self.misses += 1
+        sprite = self._render(text, font, scale, color, thickness, line_type)
+        self.sprites[key] = sprite
+        self.bytes += sprite.nbytes
+        while self.bytes > self.max_bytes and len(self.sprites) > 1:
+            _, evicted = self.sprites.popitem(last=False)
+            self.bytes -= evicted.nbytes
+            self.evictions += 1
+        return sprite
+
+    def _render(self, text, font, scale, color, thickness, line_type):
+        (text_w, text_h), baseline = cv2.getTextSize(text, font, scale, thickness)
+        pad = thickness + 2
+        mask = np.zeros((text_h + baseline + 2 * pad, text_w + 2 * pad), dtype=np.uint8)
+        cv2.putText(mask, text, (pad, pad + text_h), font, scale, 255, thickness, line_type)
+
+        rows = np.flatnonzero(mask.any(axis=1))
+        cols = np.flatnonzero(mask.any(axis=0))
+        if len(rows) == 0:
+            empty = np.zeros((0, 0, 1), dtype=np.uint16)
+            return LabelSprite(np.zeros((0, 0, 3), dtype=np.uint16), empty, 0, 0)
+
+        mask = mask[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+        alpha = mask[:, :, None].astype(np.uint16)
+        premultiplied = alpha * np.array(color, dtype=np.uint16)
+        return LabelSprite(premultiplied, alpha, cols[0] - pad, rows[0] - pad - text_h)
+
+    def blit(self, img, text, org, font, scale, color, thickness=1, line_type=cv2.LINE_AA):
+        """Draw text at org (bottom-left of the text, as cv2.putText) using a cached sprite."""
+        sprite = self.get(text, font, scale, color, thickness, line_type)
+        h, w = sprite.alpha.shape[:2]
+        x = org[0] + sprite.offset_x
+        y = org[1] + sprite.offset_y
+
+        img_h, img_w = img.shape[:2]
+        x0, y0 = max(0, x), max(0, y)
+        x1, y1 = min(img_w, x + w), min(img_h, y + h)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        alpha = sprite.alpha[y0 - y:y1 - y, x0 - x:x1 - x]
+        premultiplied = sprite.premultiplied[y0 - y:y1 - y, x0 - x:x1 - x]
+        roi = img[y0:y1, x0:x1]
+        roi[:] = (roi * (255 - alpha) + premultiplied + 127) // 255
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'sprites': len(self.sprites),
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
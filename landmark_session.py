@@ -0,0 +1,278 @@
+import struct
+import time
+
+import numpy as np
+
+from frame_sources import FrameSource
+
+
+SESSION_MAGIC = b"STWL"
+SESSION_VERSION = 1
+
+HEADER_FORMAT = "<4sHHH"
+FRAME_FORMAT = "<dIBB"
+HAND_LANDMARK_COUNT = 21
+POSE_LANDMARK_COUNT = 33
+
+HAND_LABELS = ('Left', 'Right')
+
+
+class Landmark:
+    """Stand-in for a MediaPipe landmark with x, y, z and visibility."""
+    __slots__ = ('x', 'y', 'z', 'visibility')
+
+    def __init__(self, x, y, z, visibility=1.0):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.visibility = visibility
+
+
+class LandmarkList:
+    def __init__(self, landmark):
+        self.landmark = landmark
+
+
+class Classification:
+    def __init__(self, label, score=1.0):
+        self.label = label
+        self.score = score
+
+
+class Handedness:
+    def __init__(self, label):
+        self.classification = [Classification(label)]
+
+
+class HandsResult:
+    """Mirrors the fields of a MediaPipe Hands result that the engines read."""
+
+    def __init__(self, multi_hand_landmarks=None, multi_handedness=None):
+        self.multi_hand_landmarks = multi_hand_landmarks
+        self.multi_handedness = multi_handedness
+
+
+class PoseResult:
+    def __init__(self, pose_landmarks=None):
+        self.pose_landmarks = pose_landmarks
+
+
+class SessionFrame:
+    """
+    One recorded frame.
+    hands is a list of (label, (21, 3) float32 array), pose is a (33, 4) float32 array or None.
+    """
+
+    def __init__(self, timestamp, index, hands, pose):
+        self.timestamp = timestamp
+        self.index = index
+        self.hands = hands
+        self.pose = pose
+
+    def hands_result(self):
+        if not self.hands:
+            return HandsResult()
+        landmarks = []
+        handedness = []
+        for label, points in self.hands:
+            landmarks.append(LandmarkList([Landmark(float(x), float(y), float(z)) for x, y, z in points]))
+            handedness.append(Handedness(label))
+        return HandsResult(landmarks, handedness)
+
+    def pose_result(self):
+        if self.pose is None:
+            return PoseResult()
+        return PoseResult(LandmarkList([Landmark(float(x), float(y), float(z), float(v)) for x, y, z, v in self.pose]))
+
+
+class SessionRecorder:
+    """
+    Writes per-frame timestamped hand and pose landmarks to a compact binary file.
+
+    Layout: a header (magic, version, frame width, frame height) followed by one
+    record per frame: timestamp, frame index, hand count, pose flag, then for each
+    hand a label byte and 21 xyz float32 triples, then 33 xyzv float32 quads if a
+    pose is present.
+    """
+
+    def __init__(self, path, width=1280, height=720):
+        self.path = path
+        self.file = open(path, 'wb')
+        self.file.write(struct.pack(HEADER_FORMAT, SESSION_MAGIC, SESSION_VERSION, width, height))
+        self.start_time = time.perf_counter()
+        self.frame_count = 0
+
+    def record(self, hands_results=None, pose_results=None, timestamp=None):
+        if timestamp is None:
+            timestamp = time.perf_counter() - self.start_time
+
+        hands = []
+        if hands_results is not None and hands_results.multi_hand_landmarks and hands_results.multi_handedness:
+            for hand_lms, hand_info in zip(hands_results.multi_hand_landmarks, hands_results.multi_handedness):
+                label = hand_info.classification[0].label
+                points = np.array([(lm.x, lm.y, lm.z) for lm in hand_lms.landmark], dtype=np.float32)
+                hands.append((HAND_LABELS.index(label) if label in HAND_LABELS else 0, points))
+
+        pose = None
+        if pose_results is not None and pose_results.pose_landmarks:
+            pose = np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in pose_results.pose_landmarks.landmark],
+                            dtype=np.float32)
+
+        self.file.write(struct.pack(FRAME_FORMAT, timestamp, self.frame_count, len(hands), pose is not None))
+        for label_code, points in hands:
+            self.file.write(struct.pack("<B", label_code))
+            self.file.write(points.tobytes())
+        if pose is not None:
+            self.file.write(pose.tobytes())
+        self.frame_count += 1
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+def read_session(path):
+    """Load a recorded session; returns (width, height, list of SessionFrame)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    header_size = struct.calcsize(HEADER_FORMAT)
+    magic, version, width, height = struct.unpack_from(HEADER_FORMAT, data, 0)
+    if magic != SESSION_MAGIC or version != SESSION_VERSION:
+        raise ValueError(f"Not a Stiwi Pro landmark session: {path}")
+
+    frame_size = struct.calcsize(FRAME_FORMAT)
+    hand_size = 1 + HAND_LANDMARK_COUNT * 3 * 4
+    pose_size = POSE_LANDMARK_COUNT * 4 * 4
+
+    frames = []
+    offset = header_size
+    while offset + frame_size <= len(data):
+        timestamp, index, hand_count, has_pose = struct.unpack_from(FRAME_FORMAT, data, offset)
+        offset += frame_size
+        if offset + hand_count * hand_size + (pose_size if has_pose else 0) > len(data):
+            break  # Truncated trailing record from an interrupted session
+
+        hands = []
+        for _ in range(hand_count):
+            label_code = data[offset]
+            points = np.frombuffer(data, dtype=np.float32, count=HAND_LANDMARK_COUNT * 3, offset=offset + 1)
+            hands.append((HAND_LABELS[label_code], points.reshape(HAND_LANDMARK_COUNT, 3)))
+            offset += hand_size
+
+        pose = None
+        if has_pose:
+            pose = np.frombuffer(data, dtype=np.float32, count=POSE_LANDMARK_COUNT * 4, offset=offset)
+            pose = pose.reshape(POSE_LANDMARK_COUNT, 4)
+            offset += pose_size
+
+        frames.append(SessionFrame(timestamp, index, hands, pose))
+
+    return width, height, frames
+
+
+class _ReplayProcessor:
+    """Answers process() with the results of the frame the replay last delivered."""
+
+    def __init__(self, replay, kind):
+        self.replay = replay
+        self.kind = kind
+
+    def process(self, image):
+        frame = self.replay.current_frame
+        if frame is None:
+            return HandsResult() if self.kind == 'hands' else PoseResult()
+        return frame.hands_result() if self.kind == 'hands' else frame.pose_result()
+
+    def close(self):
+        pass
+
+
+class SessionReplay(FrameSource):
+    """
+    Plays a recorded session back through the frame source and model interfaces
+    the engines use, so they run without a camera, MediaPipe or a display.
+    read() delivers a blank frame and advances the session; hands and pose answer
+    process() with the landmarks recorded for that frame.
+    """
+
+    def __init__(self, path, realtime=False, fps=None):
+        super().__init__(fps=fps)
+        self.session_width, self.session_height, self.frames = read_session(path)
+        self.realtime = realtime
+        self.position = 0
+        self.current_frame = None
+        self.blank = np.zeros((self.session_height, self.session_width, 3), dtype=np.uint8)
+        self.hands = _ReplayProcessor(self, 'hands')
+        self.pose = _ReplayProcessor(self, 'pose')
+        self.start_time = None
+
+    def native_size(self):
+        return self.session_width, self.session_height
+
+    def isOpened(self):
+        return self.position < len(self.frames)
+
+    def _read_frame(self):
+        if self.position >= len(self.frames):
+            self.current_frame = None
+            return False, None, None
+
+        frame = self.frames[self.position]
+        self.position += 1
+
+        if self.realtime:
+            if self.start_time is None:
+                self.start_time = time.perf_counter() - frame.timestamp
+            delay = self.start_time + frame.timestamp - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        self.current_frame = frame
+        return True, self.blank, frame.timestamp
+
+    def release(self):
+        self.position = len(self.frames)
+        self.current_frame = None
+
+
+def replay_session(path, song_list=None, avatar=False, realtime=False):
+    """
+    Run a recorded session headlessly through VisionEngine (DJ mode) or
+    AvatarEngine (avatar mode). Returns (frames processed, elapsed seconds).
+    DJ mode runs at fixed quality with UI and gesture time taken from the
+    recorded frame timestamps, so a replay does not depend on how fast it runs.
+    """
+    replay = SessionReplay(path, realtime=realtime)
+    frames = 0
+    start = time.perf_counter()
+
+    if avatar:
+        from AvatarEngine import AvatarEngine
+
+        engine = AvatarEngine(pose_processor=replay.pose, hands_processor=replay.hands)
+        while True:
+            ret, frame = replay.read()
+            if not ret:
+                break
+            frames += 1
+            if not engine.process_frame(frame, replay.timestamp):
+                break
+    else:
+        from UIEngine import UIEngine
+        from VisionEngine import VisionEngine
+        from music_library import MusicLibrary
+
+        library = MusicLibrary(song_list or [])
+        ui = UIEngine()
+        ui.set_library(library)
+        ui.set_song_list(1, library.order)
+        ui.set_song_list(2, library.order)
+        # Recorded landmarks are already in full-frame coordinates, so replay bypasses the inference scheduler
+        vision = VisionEngine(None, None, ui, library, cap=replay, hands_processor=replay.hands, display=False,
+                              schedule_inference=False, adaptive_quality=False)
+        ui.clock = vision.clock = lambda: replay.timestamp
+        while vision.process():
+            frames += 1
+
+    return frames, time.perf_counter() - start
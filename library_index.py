@@ -0,0 +1,151 @@
+import os
+import sqlite3
+
+LIBRARY_DB_PATH = os.path.join(".stiwi_cache", "library.sqlite")
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.flac', '.m4a', '.ogg')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    root TEXT NOT NULL,
+    parent TEXT,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS dirs_root ON dirs(root);
+CREATE TABLE IF NOT EXISTS tracks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT NOT NULL UNIQUE,
+    dir TEXT NOT NULL,
+    name TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tracks_dir ON tracks(dir);
+"""
+
+
+class LibraryIndex:
+    """
+    Persistent index of the audio files under one or more music folders.
+
+    Every directory is stored with its mtime. refresh() walks the known
+    directory tree stat-ing directories only; a directory is listed again
+    only when its mtime changed, which happens whenever a file or folder in
+    it is added, removed or renamed. Tracks keep their integer id for as
+    long as their path exists, so ids are stable across runs.
+    """
+
+    def __init__(self, db_path=LIBRARY_DB_PATH):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(db_path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def refresh(self, root, force=()):
+        """
+        Bring the index for root up to date. Directories in force are listed
+        again even if their mtime is unchanged, for changes to files in place.
+        Returns counts of what changed.
+        """
+        root = os.path.abspath(root)
+        force = {os.path.abspath(path) for path in force}
+        known = {}
+        children = {}
+        for path, parent, mtime_ns in self.db.execute("SELECT path, parent, mtime_ns FROM dirs WHERE root = ?",
+                                                      (root,)):
+            known[path] = mtime_ns
+            children.setdefault(parent, []).append(path)
+
+        stats = {'dirs': 0, 'rescanned': 0, 'added': 0, 'updated': 0, 'removed': 0}
+        seen = set()
+        with self.db:
+            stack = [(root, None)]
+            while stack:
+                path, parent = stack.pop()
+                try:
+                    mtime_ns = os.stat(path).st_mtime_ns
+                except OSError:
+                    continue
+                seen.add(path)
+                stats['dirs'] += 1
+
+                if known.get(path) == mtime_ns and path not in force:
+                    stack.extend((child, path) for child in children.get(path, ()))
+                    continue
+
+                stats['rescanned'] += 1
+                subdirs = self._scan_dir(path, stats)
+                stack.extend((child, path) for child in subdirs)
+                self.db.execute("INSERT OR REPLACE INTO dirs (path, root, parent, mtime_ns) VALUES (?, ?, ?, ?)",
+                                (path, root, parent, mtime_ns))
+
+            for path in known.keys() - seen:
+                stats['removed'] += self.db.execute("DELETE FROM tracks WHERE dir = ?", (path,)).rowcount
+                self.db.execute("DELETE FROM dirs WHERE path = ?", (path,))
+        return stats
+
+    def _scan_dir(self, path, stats):
+        """List one directory, syncing its tracks. Returns its subdirectories."""
+        indexed = {track_path: (size, mtime_ns) for track_path, size, mtime_ns in
+                   self.db.execute("SELECT path, size, mtime_ns FROM tracks WHERE dir = ?", (path,))}
+        subdirs = []
+        present = set()
+        try:
+            entries = list(os.scandir(path))
+        except OSError as e:
+            print(f"Error scanning '{path}': {e}")
+            entries = []
+
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                    continue
+                name, ext = os.path.splitext(entry.name)
+                if ext.lower() not in AUDIO_EXTENSIONS or not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+
+            present.add(entry.path)
+            previous = indexed.get(entry.path)
+            if previous == (stat.st_size, stat.st_mtime_ns):
+                continue
+            if previous is None:
+                self.db.execute("INSERT INTO tracks (path, dir, name, ext, size, mtime_ns) VALUES (?, ?, ?, ?, ?, ?)",
+                                (entry.path, path, name, ext.lower(), stat.st_size, stat.st_mtime_ns))
+                stats['added'] += 1
+            else:
+                self.db.execute("UPDATE tracks SET size = ?, mtime_ns = ? WHERE path = ?",
+                                (stat.st_size, stat.st_mtime_ns, entry.path))
+                stats['updated'] += 1
+
+        for gone in indexed.keys() - present:
+            self.db.execute("DELETE FROM tracks WHERE path = ?", (gone,))
+            stats['removed'] += 1
+        return subdirs
+
+    def tracks(self, root):
+        """Every indexed track under root as {'id', 'path', 'name', 'ext'} dicts, sorted by name, ignoring case."""
+        rows = self.db.execute(
+            "SELECT t.id, t.path, t.name, t.ext FROM tracks t JOIN dirs d ON t.dir = d.path "
+            "WHERE d.root = ? ORDER BY t.name COLLATE NOCASE, t.path", (os.path.abspath(root),))
+        return [{'id': track_id, 'path': path, 'name': name, 'ext': ext} for track_id, path, name, ext in rows]
+
+    def close(self):
+        self.db.close()
+
+
+def load_library(root, db_path=LIBRARY_DB_PATH):
+    """Refresh the index for root and return its tracks."""
+    index = LibraryIndex(db_path)
+    try:
+        index.refresh(root)
+        return index.tracks(root)
+    finally:
+        index.close()
@@ -0,0 +1,166 @@
+import ctypes
+import ctypes.util
+import os
+import queue
+import select
+import struct
+import threading
+import time
+
+from library_index import LIBRARY_DB_PATH, LibraryIndex
+from music_library import MusicLibrary
+from search import SearchIndex
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+              | IN_MOVE_SELF)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatch:
+    """Recursive inotify watch on a directory tree, through libc via ctypes."""
+
+    def __init__(self):
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.paths = {}
+
+    def add_tree(self, root):
+        for directory, _, _ in os.walk(root):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for '{directory}'")
+            self.paths[wd] = directory
+
+    def read(self, timeout):
+        """Events as (directory, mask, name), waiting up to timeout seconds for the first."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b'\0')
+            offset += EVENT_HEADER.size + length
+            events.append((self.paths.get(wd), mask, os.fsdecode(name)))
+            if mask & IN_IGNORED:
+                self.paths.pop(wd, None)
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class LibraryWatcher(threading.Thread):
+    """
+    Keeps the library index in step with a music folder while the app runs.
+
+    Filesystem events are collected per directory through inotify and
+    debounced: a batch is applied once no event arrived for `debounce`
+    seconds, or after max_delay during a long burst, so copying an album
+    costs one update. Without inotify the index is refreshed every
+    poll_interval seconds instead, which catches added, removed and renamed
+    files. A batch refreshes only the touched directories, then builds the
+    new MusicLibrary and SearchIndex on this thread. The main loop picks up
+    the result with poll().
+    """
+
+    def __init__(self, root, db_path=LIBRARY_DB_PATH, debounce=0.5, max_delay=3.0, poll_interval=2.0):
+        super().__init__(name="library-watcher", daemon=True)
+        self.root = os.path.abspath(root)
+        self.db_path = db_path
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.stopping = threading.Event()
+        self.updates = queue.Queue()
+        self.batches = 0
+
+    def run(self):
+        index = LibraryIndex(self.db_path)
+        try:
+            watch = InotifyWatch()
+            watch.add_tree(self.root)
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable ({e}), polling '{self.root}' every {self.poll_interval}s")
+            watch = None
+
+        try:
+            if watch is None:
+                while not self.stopping.wait(self.poll_interval):
+                    self.publish(index, index.refresh(self.root))
+            else:
+                self.watch_events(index, watch)
+        finally:
+            if watch is not None:
+                watch.close()
+            index.close()
+
+    def watch_events(self, index, watch):
+        dirty = set()
+        first_event = last_event = None
+        while not self.stopping.is_set():
+            for directory, mask, name in watch.read(timeout=self.debounce / 2):
+                if mask & IN_Q_OVERFLOW:
+                    # Events were lost; a plain refresh still finds every added or removed file
+                    dirty.add(self.root)
+                elif directory is not None:
+                    dirty.add(directory)
+                    if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                        path = os.path.join(directory, name)
+                        try:
+                            watch.add_tree(path)
+                        except OSError as e:
+                            print(f"Error watching '{path}': {e}")
+                now = time.monotonic()
+                last_event = now
+                if first_event is None:
+                    first_event = now
+
+            if not dirty:
+                continue
+            now = time.monotonic()
+            if now - last_event >= self.debounce or now - first_event >= self.max_delay:
+                self.publish(index, index.refresh(self.root, force=dirty))
+                dirty = set()
+                first_event = last_event = None
+
+    def publish(self, index, stats):
+        if not (stats['added'] or stats['removed'] or stats['updated']):
+            return
+        library = MusicLibrary(index.tracks(self.root))
+        self.updates.put({'library': library, 'search_index': SearchIndex(library), 'stats': stats})
+        self.batches += 1
+
+    def poll(self):
+        """The newest finished update, or None. Older pending updates are superseded and dropped."""
+        update = None
+        while True:
+            try:
+                update = self.updates.get_nowait()
+            except queue.Empty:
+                return update
+
+    def stop(self):
+        self.stopping.set()
+        self.join(timeout=2.0)
@@ -0,0 +1,110 @@
+import threading
+import time
+
+import numpy as np
+
+try:
+    import mediapipe as mp
+except ImportError:
+    mp = None
+
+
+def create_hands_processor(model_complexity=1, static_image_mode=False):
+    if mp is None:
+        raise RuntimeError("mediapipe is required for live hand tracking")
+    return mp.solutions.hands.Hands(
+        static_image_mode=static_image_mode,
+        max_num_hands=2,
+        model_complexity=model_complexity,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.5,
+    )
+
+
+def create_roi_hands_processor(model_complexity=1):
+    """Hands for one-off crops: static mode detects in every image and keeps no tracking state between them."""
+    return create_hands_processor(model_complexity, static_image_mode=True)
+
+
+def create_pose_processor(model_complexity=1):
+    if mp is None:
+        raise RuntimeError("mediapipe is required for live pose tracking")
+    return mp.solutions.pose.Pose(
+        model_complexity=model_complexity,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5,
+    )
+
+
+MODEL_FACTORIES = {
+    'hands': create_hands_processor,
+    'hands_roi': create_roi_hands_processor,
+    'pose': create_pose_processor,
+}
+
+
+class ModelPool:
+    """
+    MediaPipe processors shared by DJ and avatar mode for the whole run.
+
+    get() builds a processor the first time a (kind, model_complexity) is
+    asked for and hands out the same one afterwards, so switching modes or
+    quality levels never rebuilds a graph. Each new processor is run once on a
+    blank frame, since MediaPipe loads its models on the first process()
+    call. preload() does the building on a background thread; a get() for a
+    processor that is still being built waits for it.
+    """
+
+    def __init__(self, warmup_size=(320, 240)):
+        self.warmup_frame = np.zeros((warmup_size[1], warmup_size[0], 3), dtype=np.uint8)
+        self.models = {}
+        self.building = {}
+        self.lock = threading.Lock()
+        self.build_times = {}
+
+    def get(self, kind, model_complexity=1):
+        key = (kind, model_complexity)
+        while True:
+            with self.lock:
+                model = self.models.get(key)
+                if model is not None:
+                    return model
+                ready = self.building.get(key)
+                if ready is None:
+                    ready = self.building[key] = threading.Event()
+                    break
+            # Another thread is building it; if that build failed, try again here
+            ready.wait()
+
+        try:
+            start = time.perf_counter()
+            model = MODEL_FACTORIES[kind](model_complexity)
+            model.process(self.warmup_frame)
+            with self.lock:
+                self.models[key] = model
+                self.build_times[key] = time.perf_counter() - start
+            return model
+        finally:
+            with self.lock:
+                self.building.pop(key, None)
+            ready.set()
+
+    def preload(self, *kinds, model_complexity=1):
+        """Build and warm up the given kinds on a daemon thread."""
+        def build():
+            for kind in kinds:
+                try:
+                    self.get(kind, model_complexity)
+                except Exception as e:
+                    print(f"Error preloading {kind} model: {e}")
+
+        thread = threading.Thread(target=build, name="model-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        with self.lock:
+            models = list(self.models.values())
+            self.models = {}
+        for model in models:
+            model.close()
@@ -0,0 +1,66 @@
+import os
+
+
+class MusicLibrary:
+    """
+    The loaded tracks, keyed by integer track id.
+
+    UI and vision code pass track ids around; by_id resolves one to its track
+    dict in O(1) and ids_by_name maps a base name to every track that has it.
+    Tracks sharing a base name get labels that tell them apart, by format and
+    then by folder.
+    """
+
+    def __init__(self, tracks=()):
+        self.set_tracks(tracks)
+
+    def set_tracks(self, tracks):
+        """
+        Replace the tracks; each is a dict with 'path' and 'name', plus 'id' and
+        'ext' when they come from the library index. Without ids on every track,
+        tracks are numbered by position.
+        """
+        tracks = list(tracks)
+        indexed = all('id' in track for track in tracks)
+        self.by_id = {}
+        self.order = []
+        self.ids_by_name = {}
+        for position, track in enumerate(tracks):
+            track_id = track['id'] if indexed else position
+            if 'ext' not in track:
+                track = dict(track, ext=os.path.splitext(track['path'])[1].lower())
+            self.by_id[track_id] = track
+            self.order.append(track_id)
+            self.ids_by_name.setdefault(track['name'], []).append(track_id)
+
+        self.labels = {}
+        for name, ids in self.ids_by_name.items():
+            if len(ids) == 1:
+                self.labels[ids[0]] = name
+                continue
+            formats = [self.by_id[track_id]['ext'] for track_id in ids]
+            for track_id, ext in zip(ids, formats):
+                label = f"{name} ({ext.lstrip('.').upper()})"
+                if formats.count(ext) > 1:
+                    folder = os.path.basename(os.path.dirname(self.by_id[track_id]['path']))
+                    label = f"{label} - {folder}"
+                self.labels[track_id] = label
+
+    def __len__(self):
+        return len(self.order)
+
+    def __contains__(self, track_id):
+        return track_id in self.by_id
+
+    def get(self, track_id):
+        return self.by_id.get(track_id)
+
+    def path(self, track_id):
+        track = self.by_id.get(track_id)
+        return track['path'] if track else None
+
+    def label(self, track_id):
+        return self.labels.get(track_id, str(track_id))
+
+    def ids_for_name(self, name):
+        return self.ids_by_name.get(name, [])
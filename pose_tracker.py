@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class PoseTimeline:
+    """
+    The last few tracked poses, stamped with the time their frame was captured.
+
+    sample(t) gives the pose at any time t on the same clock. Between two
+    samples the pose points, visibilities and hands are interpolated
+    linearly. Past the newest sample the motion is extrapolated for at most
+    max_extrapolation seconds and then held. When a pose or the hand count
+    changes between two samples, the nearer sample is used as is. The
+    timeline also tracks an average of the capture-to-result latency and of
+    the interval between samples, which display_delay() turns into how far
+    behind real time rendering should run to stay between samples.
+    """
+
+    def __init__(self, size=4, max_extrapolation=0.1, smoothing=0.1):
+        self.samples = deque(maxlen=size)
+        self.max_extrapolation = max_extrapolation
+        self.smoothing = smoothing
+        self.lock = threading.Lock()
+        self.latency = None
+        self.interval = None
+
+    def push(self, capture_time, ready_time, pose_points, visibility=None, hand_points=()):
+        with self.lock:
+            if self.samples:
+                interval = capture_time - self.samples[-1][0]
+                if interval <= 0:
+                    return
+                self.interval = interval if self.interval is None else \
+                    self.interval + (interval - self.interval) * self.smoothing
+            latency = ready_time - capture_time
+            self.latency = latency if self.latency is None else \
+                self.latency + (latency - self.latency) * self.smoothing
+            self.samples.append((capture_time, pose_points, visibility, list(hand_points)))
+
+    def display_delay(self, frames=1.0):
+        """Latency plus `frames` sample intervals: rendering that far back keeps a newer sample on hand."""
+        with self.lock:
+            return (self.latency or 0.0) + (self.interval or 0.0) * frames
+
+    def sample(self, t):
+        """(pose points, visibility, hand points) at time t, or None before the first sample."""
+        with self.lock:
+            if not self.samples:
+                return None
+            if len(self.samples) == 1 or t <= self.samples[0][0]:
+                _, pose, visibility, hands = self.samples[0 if t <= self.samples[0][0] else -1]
+                return pose, visibility, hands
+            if t >= self.samples[-1][0]:
+                before, after = self.samples[-2], self.samples[-1]
+                t = min(t, after[0] + self.max_extrapolation)
+            else:
+                index = next(i for i in range(1, len(self.samples)) if self.samples[i][0] >= t)
+                before, after = self.samples[index - 1], self.samples[index]
+
+        fraction = (t - before[0]) / (after[0] - before[0])
+        nearer = after if fraction >= 0.5 else before
+        if before[1] is None or after[1] is None:
+            return nearer[1], nearer[2], nearer[3]
+
+        pose = before[1] + (after[1] - before[1]) * fraction
+        visibility = None
+        if before[2] is not None and after[2] is not None:
+            visibility = before[2] + (after[2] - before[2]) * min(fraction, 1.0)
+        hands = nearer[3]
+        if len(before[3]) == len(after[3]):
+            hands = [a + (b - a) * fraction for a, b in zip(before[3], after[3])]
+        return pose, visibility, hands
+
+
+class PoseTracker(threading.Thread):
+    """
+    Runs avatar tracking on its own thread, at whatever rate the camera and
+    inference manage. Every frame goes through AvatarEngine.process_frame,
+    and the result is pushed to the timeline stamped with the time the frame
+    was read. The render loop samples the timeline at display time. Failed
+    reads are counted and skipped. exit_requested is set once process_frame
+    sees the exit gesture. Each frame's stages go to the engine's
+    tracking_timing.
+    """
+
+    def __init__(self, engine, timeline, retry_delay=0.005):
+        super().__init__(name="avatar-tracker", daemon=True)
+        self.engine = engine
+        self.timeline = timeline
+        self.retry_delay = retry_delay
+        self.running = True
+        self.exit_requested = False
+        self.frames = 0
+        self.failed_reads = 0
+
+    def run(self):
+        cap = self.engine.cap
+        timing = self.engine.tracking_timing
+        while self.running:
+            timing.begin_frame()
+            ret, frame = cap.read()
+            capture_time = time.perf_counter()
+            if not ret:
+                self.failed_reads += 1
+                time.sleep(self.retry_delay)
+                continue
+            timing.mark('capture')
+
+            keep_going = self.engine.process_frame(frame, cap.timestamp)
+            self.timeline.push(capture_time, time.perf_counter(), self.engine.pose_points,
+                               self.engine.pose_visibility, self.engine.hand_points)
+            timing.mark('push')
+            timing.end_frame()
+            self.frames += 1
+            if not keep_going:
+                self.exit_requested = True
+                return
+
+    def stop(self):
+        self.running = False
+        self.join(timeout=2.0)
@@ -0,0 +1,120 @@
+import queue
+import threading
+import time
+
+import cv2
+
+from frame_timing import FrameTimer
+
+
+class PresentThread(threading.Thread):
+    """
+    Presents composed frames on its own thread, paced to a target refresh rate.
+
+    The main loop writes each frame into one of `slots` buffers chosen by
+    free_slot() and hands it over with submit(). At every refresh tick the
+    thread shows the newest submitted frame. presented counts frames shown,
+    duplicated counts ticks with no new frame, and skipped counts frames
+    replaced before they were shown. Keys from cv2.waitKey are forwarded to
+    the main loop through the keys queue. Every HighGUI call for the window
+    happens on this thread, and timing records how long imshow and waitKey
+    take on each tick.
+    """
+
+    def __init__(self, window_name, target_fps=60.0, slots=3):
+        super().__init__(name="present", daemon=True)
+        self.window_name = window_name
+        self.target_fps = target_fps
+        self.slots = slots
+        self.condition = threading.Condition()
+        self.running = True
+
+        self.latest_image = None
+        self.latest_slot = None
+        self.latest_id = 0
+        self.presenting_slot = None
+        self.presented_id = 0
+
+        self.presented = 0
+        self.duplicated = 0
+        self.skipped = 0
+        self.keys = queue.Queue()
+        self.timing = FrameTimer('present', ('show', 'keys'))
+
+    def free_slot(self):
+        """A buffer slot that is neither waiting to be shown nor being shown."""
+        with self.condition:
+            busy = (self.latest_slot, self.presenting_slot)
+        for slot in range(self.slots):
+            if slot not in busy:
+                return slot
+        return 0
+
+    def submit(self, image, slot):
+        with self.condition:
+            if self.latest_image is not None and self.latest_id != self.presented_id:
+                self.skipped += 1
+            self.latest_image = image
+            self.latest_slot = slot
+            self.latest_id += 1
+            self.condition.notify()
+
+    def poll_keys(self):
+        keys = []
+        while True:
+            try:
+                keys.append(self.keys.get_nowait())
+            except queue.Empty:
+                return keys
+
+    def run(self):
+        period = 1.0 / self.target_fps
+        next_tick = time.perf_counter()
+        while self.running:
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            next_tick += period
+            if next_tick < time.perf_counter():
+                next_tick = time.perf_counter() + period
+
+            with self.condition:
+                if self.latest_image is None:
+                    self.condition.wait(timeout=period)
+                image = self.latest_image
+                new_frame = image is not None and self.latest_id != self.presented_id
+                if new_frame:
+                    self.presenting_slot = self.latest_slot
+                    self.latest_slot = None
+                    self.presented_id = self.latest_id
+
+            if image is None:
+                continue
+
+            self.timing.begin_frame()
+            if new_frame:
+                cv2.imshow(self.window_name, image)
+                with self.condition:
+                    self.presenting_slot = None
+                self.presented += 1
+            else:
+                self.duplicated += 1
+            self.timing.mark('show')
+
+            key = cv2.waitKey(1) & 0xFF
+            if key != 255:
+                self.keys.put(key)
+            self.timing.mark('keys')
+            self.timing.end_frame()
+
+        cv2.destroyWindow(self.window_name)
+        cv2.waitKey(1)
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        self.join(timeout=1.0)
+
+    def stats(self):
+        return {'presented': self.presented, 'duplicated': self.duplicated, 'skipped': self.skipped}
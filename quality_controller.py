@@ -0,0 +1,121 @@
+QUALITY_LEVELS = (
+    {'inference_scale': 1.0, 'model_complexity': 1, 'draw_landmarks': True, 'ui_effects': True},
+    {'inference_scale': 0.75, 'model_complexity': 1, 'draw_landmarks': True, 'ui_effects': True},
+    {'inference_scale': 0.75, 'model_complexity': 0, 'draw_landmarks': True, 'ui_effects': False},
+    {'inference_scale': 0.5, 'model_complexity': 0, 'draw_landmarks': False, 'ui_effects': False},
+    {'inference_scale': 0.4, 'model_complexity': 0, 'draw_landmarks': False, 'ui_effects': False},
+)
+
+
+class QualityController:
+    """
+    Holds a target frame rate by stepping through QUALITY_LEVELS.
+
+    Per-stage frame times are smoothed with an exponential moving average. When
+    the smoothed frame time stays over budget for down_frames frames the level
+    steps down; when it stays well under budget for up_frames frames it steps
+    back up. A cooldown after every change lets the new level settle.
+
+    Stages in wait_stages are time spent blocked rather than working: the
+    wait for the next camera frame, and the present, whose waitKey waits in
+    sync mode. They are left out of the frame time, because a loop paced by
+    a 30 fps camera would otherwise always look over a 30 fps budget,
+    however light its work.
+    """
+
+    def __init__(self, target_fps=30.0, levels=QUALITY_LEVELS, smoothing=0.1, down_frames=15, up_frames=90,
+                 headroom=0.7, cooldown_frames=30, wait_stages=('capture', 'present')):
+        self.target_fps = target_fps
+        self.wait_stages = frozenset(wait_stages)
+        self.levels = levels
+        self.smoothing = smoothing
+        self.down_frames = down_frames
+        self.up_frames = up_frames
+        self.headroom = headroom
+        self.cooldown_frames = cooldown_frames
+
+        self.level_index = 0
+        self.stage_ema = {}
+        self.frame_ema = None
+        self.over_budget_frames = 0
+        self.under_budget_frames = 0
+        self.cooldown = 0
+        self.frames = 0
+        self.steps_down = 0
+        self.steps_up = 0
+        self.decisions = []
+
+    @property
+    def budget(self):
+        return 1.0 / self.target_fps
+
+    @property
+    def level(self):
+        return self.levels[self.level_index]
+
+    def update(self, stage_times):
+        """Feed one frame's stage times in seconds. Returns True when the quality level changed."""
+        self.frames += 1
+        alpha = self.smoothing
+        busy_times = {stage: seconds for stage, seconds in stage_times.items() if stage not in self.wait_stages}
+        for stage, seconds in busy_times.items():
+            previous = self.stage_ema.get(stage)
+            self.stage_ema[stage] = seconds if previous is None else previous + (seconds - previous) * alpha
+
+        frame_time = sum(busy_times.values())
+        self.frame_ema = frame_time if self.frame_ema is None else self.frame_ema + (frame_time - self.frame_ema) * alpha
+
+        if self.cooldown > 0:
+            self.cooldown -= 1
+            return False
+
+        if self.frame_ema > self.budget:
+            self.over_budget_frames += 1
+            self.under_budget_frames = 0
+        elif self.frame_ema < self.budget * self.headroom:
+            self.under_budget_frames += 1
+            self.over_budget_frames = 0
+        else:
+            self.over_budget_frames = 0
+            self.under_budget_frames = 0
+
+        if self.over_budget_frames >= self.down_frames and self.level_index < len(self.levels) - 1:
+            return self._step(1, "over budget")
+        if self.under_budget_frames >= self.up_frames and self.level_index > 0:
+            return self._step(-1, "under budget")
+        return False
+
+    def _step(self, direction, reason):
+        previous = self.level_index
+        self.level_index += direction
+        if direction > 0:
+            self.steps_down += 1
+        else:
+            self.steps_up += 1
+        self.over_budget_frames = 0
+        self.under_budget_frames = 0
+        self.cooldown = self.cooldown_frames
+        slowest = max(self.stage_ema, key=self.stage_ema.get) if self.stage_ema else None
+        self.decisions.append({
+            'frame': self.frames,
+            'from_level': previous,
+            'to_level': self.level_index,
+            'reason': reason,
+            'frame_ms': self.frame_ema * 1000.0,
+            'slowest_stage': slowest,
+        })
+        del self.decisions[:-50]
+        return True
+
+    def metrics(self):
+        return {
+            'target_fps': self.target_fps,
+            'level': self.level_index,
+            'settings': dict(self.level),
+            'frame_ms': (self.frame_ema or 0.0) * 1000.0,
+            'fps': 1.0 / self.frame_ema if self.frame_ema else 0.0,
+            'stage_ms': {stage: seconds * 1000.0 for stage, seconds in self.stage_ema.items()},
+            'steps_down': self.steps_down,
+            'steps_up': self.steps_up,
+            'last_decision': self.decisions[-1] if self.decisions else None,
+        }
@@ -0,0 +1,154 @@
+import re
+import unicodedata
+from bisect import bisect_left
+
+import numpy as np
+
+# Runs of letters and digits in any script
+WORD_PATTERN = re.compile(r"[^\W_]+")
+
+
+def normalise(text):
+    """
+    The lowercase alphanumeric words of a label or query, with accents
+    stripped, so "Beyoncé" and "beyonce" give the same word.
+    """
+    text = text.casefold()
+    if not text.isascii():
+        text = "".join(char for char in unicodedata.normalize('NFKD', text) if not unicodedata.combining(char))
+    return WORD_PATTERN.findall(text)
+
+
+def trigrams(words):
+    grams = set()
+    for word in words:
+        padded = f" {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class SearchIndex:
+    """
+    Prefix and fuzzy search over the labels of a MusicLibrary.
+
+    Prefix search works on every word of every label, kept as one sorted
+    array: a flattened trie, where the tracks under a trie node are one
+    contiguous range found with two binary searches. Fuzzy search uses a
+    trigram inverted index. The postings of the query's trigrams are counted
+    per track with np.bincount, and tracks sharing at least
+    fuzzy_threshold of the query trigrams match. Results are track ids:
+    prefix matches first, in library order, then fuzzy matches by score.
+    Fuzzy matching only runs to fill in when there are fewer than
+    fuzzy_fill prefix matches, which covers typos without paying for
+    trigram counting on queries that already match plenty.
+    """
+
+    def __init__(self, library, fuzzy_threshold=0.3, fuzzy_fill=200):
+        self.fuzzy_threshold = fuzzy_threshold
+        self.fuzzy_fill = fuzzy_fill
+        self.ids = np.array(library.order, dtype=np.int64)
+
+        words = []
+        word_rows = []
+        postings = {}
+        for row, track_id in enumerate(library.order):
+            label_words = normalise(library.label(track_id))
+            for word in set(label_words):
+                words.append(word)
+                word_rows.append(row)
+            for gram in trigrams(label_words):
+                postings.setdefault(gram, []).append(row)
+
+        order = np.argsort(np.array(words, dtype=str), kind='stable')
+        # A plain list, because bisect on it beats np.searchsorted with str keys
+        self.words = [words[i] for i in order.tolist()]
+        self.word_rows = np.array(word_rows, dtype=np.int32)[order]
+        self.postings = {gram: np.array(rows, dtype=np.int32) for gram, rows in postings.items()}
+
+    def prefix_range(self, prefix, lo=0, hi=None):
+        """The [start, end) range of indexed words starting with prefix, searched within [lo, hi)."""
+        hi = len(self.words) if hi is None else hi
+        start = bisect_left(self.words, prefix, lo, hi)
+        return start, bisect_left(self.words, prefix + '\U0010ffff', start, hi)
+
+    def prefix_rows(self, ranges):
+        """Rows whose label has a word starting with every query word, given each word's prefix range."""
+        found = None
+        for start, end in ranges:
+            matches = np.zeros(len(self.ids), dtype=bool)
+            matches[self.word_rows[start:end]] = True
+            found = matches if found is None else found & matches
+        return np.flatnonzero(found)
+
+    def fuzzy_rows(self, words, exclude=None):
+        """Rows sharing enough query trigrams, best first, leaving out the rows in exclude."""
+        # Trigrams in over half the library say almost nothing and cost the most to count
+        common = len(self.ids) // 2
+        grams = [gram for gram in trigrams(words) if len(self.postings.get(gram, ())) <= common]
+        lists = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not lists:
+            return np.empty(0, dtype=np.int32)
+
+        counts = np.bincount(np.concatenate(lists), minlength=len(self.ids))
+        if exclude is not None:
+            counts[exclude] = 0
+        needed = max(1, int(np.ceil(self.fuzzy_threshold * len(grams))))
+        rows = np.flatnonzero(counts >= needed)
+        return rows[np.lexsort((rows, -counts[rows]))]
+
+    def results(self, words, ranges, limit=None):
+        if not words:
+            return self.ids if limit is None else self.ids[:limit]
+        rows = self.prefix_rows(ranges)
+        if len(rows) < self.fuzzy_fill and sum(len(word) for word in words) >= 3:
+            rows = np.concatenate((rows, self.fuzzy_rows(words, exclude=rows)))
+        if limit is not None:
+            rows = rows[:limit]
+        return self.ids[rows]
+
+    def search(self, query, limit=None):
+        words = normalise(query)
+        return self.results(words, [self.prefix_range(word) for word in words], limit)
+
+
+class SearchSession:
+    """
+    An incremental query typed one key at a time. When a query word extends
+    the previous one, its prefix range is searched only inside the previous
+    range, so each keystroke narrows the last result.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.query = ""
+        self.words = []
+        self.ranges = []
+        self.results = index.ids
+
+    @property
+    def active(self):
+        return bool(self.query)
+
+    def set_query(self, query):
+        words = normalise(query)
+        ranges = []
+        for i, word in enumerate(words):
+            lo, hi = 0, None
+            if i < len(self.words) and word.startswith(self.words[i]):
+                lo, hi = self.ranges[i]
+            ranges.append(self.index.prefix_range(word, lo, hi))
+
+        self.query = query
+        self.words = words
+        self.ranges = ranges
+        self.results = self.index.results(words, ranges)
+        return self.results
+
+    def type(self, text):
+        return self.set_query(self.query + text)
+
+    def backspace(self):
+        return self.set_query(self.query[:-1])
+
+    def clear(self):
+        return self.set_query("")
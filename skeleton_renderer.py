@@ -0,0 +1,237 @@
+import ctypes
+
+import numpy as np
+from OpenGL.GL import *
+
+# Landmark pairs drawn as bones, grouped by colour and line width
+BODY_CONNECTIONS = [
+    (11, 12),  # Shoulders
+    (11, 23), (12, 24),  # Shoulder to hip
+    (23, 24),  # Hips
+    (11, 13), (13, 15),  # Left arm
+    (12, 14), (14, 16),  # Right arm
+    (23, 25), (25, 27), (27, 29), (29, 31),  # Left leg
+    (24, 26), (26, 28), (28, 30), (30, 32),  # Right leg
+]
+FACE_CONNECTIONS = [
+    (0, 1), (1, 2), (2, 3),  # Left eye area
+    (0, 4), (4, 5), (5, 6),  # Right eye area
+    (9, 10),  # Mouth
+    (0, 7), (0, 8),  # Ears
+]
+WRIST_CONNECTIONS = [
+    (15, 17), (15, 19), (15, 21),  # Left wrist to hand landmarks
+    (16, 18), (16, 20), (16, 22),  # Right wrist to hand landmarks
+]
+FINGER_CONNECTIONS = [
+    (0, 1), (1, 2), (2, 3), (3, 4),  # Thumb
+    (0, 5), (5, 6), (6, 7), (7, 8),  # Index
+    (0, 9), (9, 10), (10, 11), (11, 12),  # Middle
+    (0, 13), (13, 14), (14, 15), (15, 16),  # Ring
+    (0, 17), (17, 18), (18, 19), (19, 20),  # Pinky
+]
+
+# (connections, colour, line width) in draw order
+POSE_GROUPS = [
+    (BODY_CONNECTIONS, (0.0, 1.0, 1.0), 12),  # Cyan - thick
+    (FACE_CONNECTIONS, (1.0, 1.0, 0.0), 8),  # Yellow - medium
+    (WRIST_CONNECTIONS, (1.0, 0.0, 1.0), 6),  # Magenta - thin
+]
+FINGER_COLOR = (1.0, 0.0, 1.0)
+FINGER_GLOW_WIDTH = 6
+FINGER_WIDTH = 4
+POINT_SIZE = 6
+
+POSE_LANDMARKS = 33
+LEFT_WRIST = 15
+RIGHT_WRIST = 16
+HAND_LANDMARKS = 21
+MAX_HANDS = 2
+SCENE_SCALE = np.array([10.0, -10.0, -5.0], dtype=np.float32)
+SCENE_OFFSET = np.array([-5.0, 5.0, -10.0], dtype=np.float32)
+
+# Passes over every bone: glow, main line, bright core
+GLOW, MAIN, CORE = range(3)
+
+
+def landmark_array(landmarks, count):
+    """MediaPipe landmarks as an (count, 3) float32 array of normalised x, y, z."""
+    return np.array([(lm.x, lm.y, lm.z) for lm in landmarks], dtype=np.float32).reshape(count, 3)
+
+
+def landmark_visibility(landmarks):
+    return np.array([lm.visibility for lm in landmarks], dtype=np.float32)
+
+
+def pose_scene_points(landmarks):
+    """Pose landmarks in scene coordinates: x and y spread over 10 units around the origin, z pushed back by 10."""
+    return landmark_array(landmarks, POSE_LANDMARKS) * SCENE_SCALE + SCENE_OFFSET
+
+
+def hand_scene_points(hand_landmarks, pose_points, hand_scale=0.6):
+    """
+    Each tracked hand in scene coordinates, shrunk by hand_scale around its
+    wrist and attached to the matching pose wrist. The camera mirrors, so a
+    hand on the left half of the frame belongs to the right wrist.
+    """
+    hands = []
+    for hand_lms in hand_landmarks[:MAX_HANDS]:
+        points = landmark_array(hand_lms.landmark, HAND_LANDMARKS)
+        wrist = pose_points[RIGHT_WRIST] if points[0, 0] < 0.5 else pose_points[LEFT_WRIST]
+        hands.append((points - points[0]) * (SCENE_SCALE * hand_scale) + wrist)
+    return hands
+
+
+def point_color(index):
+    if index <= 10:  # Face
+        return 1.0, 1.0, 0.0, 1.0  # Yellow
+    if index <= 16:  # Upper body
+        return 0.0, 1.0, 1.0, 1.0  # Cyan
+    if index <= 22:  # Hands
+        return 1.0, 0.0, 1.0, 1.0  # Magenta
+    return 0.2, 0.5, 1.0, 1.0  # Blue
+
+
+class SkeletonRenderer:
+    """
+    Draws the pose skeleton, the landmark points and the tracked hands from
+    two vertex buffers.
+
+    Each frame the points are gathered into one float32 vertex array, laid out
+    as landmark points, pose bones, then finger bones. That array is uploaded
+    with a single glBufferSubData. Colours change rarely, so a separate buffer
+    holds a colour per vertex for each pass. A pass is drawn by pointing
+    glColorPointer at its section. Every line width is one glDrawArrays, in
+    the order the immediate-mode drawing used: glow, main and core per pose
+    group, then points, then finger glow and main.
+
+    set_style() scales the glow alpha and every line width and tints the
+    main lines toward white, for audio-reactive drawing. Glow and tint are
+    quantised to sixteenths. The colour buffer is re-uploaded only when one
+    of them changes.
+    """
+
+    def __init__(self):
+        segments = [np.array(connections, dtype=np.int32).ravel() for connections, _, _ in POSE_GROUPS]
+        self.pose_segments = np.concatenate(segments)
+        self.finger_segments = np.array(FINGER_CONNECTIONS, dtype=np.int32).ravel()
+
+        self.pose_first = POSE_LANDMARKS
+        self.finger_first = self.pose_first + len(self.pose_segments)
+        self.vertex_count = self.finger_first + MAX_HANDS * len(self.finger_segments)
+        self.vertices = np.zeros((self.vertex_count, 3), dtype=np.float32)
+
+        # (first vertex, vertex count, colour, line width) per pose group
+        self.pose_draws = []
+        first = self.pose_first
+        for segment, (_, color, width) in zip(segments, POSE_GROUPS):
+            self.pose_draws.append((first, len(segment), color, width))
+            first += len(segment)
+
+        self.glow = 1.0
+        self.tint = 0.0
+        self.width_scale = 1.0
+        self.colors = self.build_colors()
+        self.colors_stale = False
+        self.vertex_buffer = None
+        self.color_buffer = None
+        self.used = 0
+
+    def build_colors(self, glow=1.0, tint=0.0):
+        colors = np.zeros((3, self.vertex_count, 4), dtype=np.float32)
+        colors[:, :POSE_LANDMARKS] = [point_color(i) for i in range(POSE_LANDMARKS)]
+        for first, count, color, _ in self.pose_draws:
+            main = tuple(c + (1.0 - c) * tint for c in color)
+            colors[GLOW, first:first + count] = color + (min(1.0, 0.3 * glow),)
+            colors[MAIN, first:first + count] = main + (1.0,)
+            colors[CORE, first:first + count] = (1.0, 1.0, 1.0, 1.0)
+        colors[GLOW, self.finger_first:] = FINGER_COLOR + (min(1.0, 0.4 * glow),)
+        colors[MAIN, self.finger_first:] = tuple(c + (1.0 - c) * tint for c in FINGER_COLOR) + (1.0,)
+        return colors
+
+    def set_style(self, glow=1.0, width_scale=1.0, tint=0.0):
+        """Glow alpha multiplier, line width multiplier, and how far main lines are tinted toward white (0..1)."""
+        self.width_scale = width_scale
+        glow = round(glow * 16) / 16
+        tint = round(min(max(tint, 0.0), 1.0) * 16) / 16
+        if (glow, tint) != (self.glow, self.tint):
+            self.glow = glow
+            self.tint = tint
+            self.colors = self.build_colors(glow, tint)
+            self.colors_stale = True
+
+    def update(self, pose_points, hand_points=()):
+        """Gather this frame's vertices. Returns the number of vertices in use."""
+        if pose_points is None:
+            self.used = 0
+            return 0
+        self.vertices[:POSE_LANDMARKS] = pose_points
+        np.take(pose_points, self.pose_segments, axis=0, out=self.vertices[self.pose_first:self.finger_first])
+        first = self.finger_first
+        for points in hand_points[:MAX_HANDS]:
+            count = len(self.finger_segments)
+            np.take(points, self.finger_segments, axis=0, out=self.vertices[first:first + count])
+            first += count
+        self.used = first
+        return first
+
+    def create_buffers(self):
+        self.vertex_buffer, self.color_buffer = glGenBuffers(2)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        glBufferData(GL_ARRAY_BUFFER, self.vertices.nbytes, None, GL_DYNAMIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, self.color_buffer)
+        glBufferData(GL_ARRAY_BUFFER, self.colors.nbytes, self.colors, GL_DYNAMIC_DRAW)
+        self.colors_stale = False
+
+    def use_colors(self, color_pass):
+        glColorPointer(4, GL_FLOAT, 0, ctypes.c_void_p(color_pass * self.vertex_count * 16))
+
+    def draw(self):
+        if not self.used:
+            return
+        if self.vertex_buffer is None:
+            self.create_buffers()
+
+        glDisable(GL_LIGHTING)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        glBufferSubData(GL_ARRAY_BUFFER, 0, self.used * 12, self.vertices[:self.used])
+        glVertexPointer(3, GL_FLOAT, 0, None)
+        glBindBuffer(GL_ARRAY_BUFFER, self.color_buffer)
+        if self.colors_stale:
+            glBufferSubData(GL_ARRAY_BUFFER, 0, self.colors.nbytes, self.colors)
+            self.colors_stale = False
+
+        scale = self.width_scale
+        for first, count, _, width in self.pose_draws:
+            for color_pass, pass_width in ((GLOW, width + 4), (MAIN, width), (CORE, max(2, width - 6))):
+                self.use_colors(color_pass)
+                glLineWidth(pass_width * scale)
+                glDrawArrays(GL_LINES, first, count)
+
+        glPointSize(POINT_SIZE)
+        glDrawArrays(GL_POINTS, 0, POSE_LANDMARKS)
+
+        finger_count = self.used - self.finger_first
+        if finger_count:
+            self.use_colors(GLOW)
+            glLineWidth(FINGER_GLOW_WIDTH * scale)
+            glDrawArrays(GL_LINES, self.finger_first, finger_count)
+            self.use_colors(MAIN)
+            glLineWidth(FINGER_WIDTH * scale)
+            glDrawArrays(GL_LINES, self.finger_first, finger_count)
+
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glDisable(GL_BLEND)
+        glEnable(GL_LIGHTING)
+
+    def release(self):
+        if self.vertex_buffer is not None:
+            glDeleteBuffers(2, [self.vertex_buffer, self.color_buffer])
+            self.vertex_buffer = self.color_buffer = None
@@ -1,5 +1,5 @@
+import argparse
 import os
-import glob
 
 import cv2
 
@@ -7,32 +7,53 @@ from AudioEngine import AudioEngine
 from AvatarEngine import AvatarEngine
 from UIEngine import UIEngine
 from VisionEngine import VisionEngine
+from frame_sources import open_frame_source
+from landmark_session import SessionRecorder, replay_session
+from library_index import load_library
+from library_watcher import LibraryWatcher
+from model_pool import ModelPool
+from music_library import MusicLibrary
 
 
 def load_songs_from_directory(directory_path):
-    """Load all audio files from directory into a song list."""
-    supported_formats = ['*.wav', '*.mp3', '*.flac', '*.m4a', '*.ogg']
-    songs = []
-
-    for pattern in supported_formats:
-        files = glob.glob(os.path.join(directory_path, pattern)) + \
-                glob.glob(os.path.join(directory_path, pattern.upper()))
-        songs.extend(files)
-
-    valid_songs = []
-    for full_path in songs:
-        if os.path.exists(full_path):
-            filename = os.path.basename(full_path)
-            valid_songs.append({
-                'path': full_path,
-                'name': os.path.splitext(filename)[0]
-            })
-
-    return sorted(valid_songs, key=lambda x: x['name'])
+    """Load all audio files under directory, nested folders included, through the persistent library index."""
+    return load_library(directory_path)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Stiwi Pro gesture DJ")
+    parser.add_argument("--source", default="0",
+                        help="camera index, video file, image directory/glob, .stwf raw frame file or shm:NAME")
+    parser.add_argument("--fps", type=float, help="deliver input frames at a fixed rate")
+    parser.add_argument("--size", help="resize input frames to WIDTHxHEIGHT")
+    parser.add_argument("--target-fps", type=float, default=30.0, help="frame rate the adaptive quality holds")
+    parser.add_argument("--fixed-quality", action="store_true", help="disable adaptive quality")
+    parser.add_argument("--sync-present", action="store_true",
+                        help="show frames from the main loop instead of a render thread")
+    parser.add_argument("--refresh-rate", type=float, default=60.0, help="render thread presentation rate")
+    parser.add_argument("--timing-hud", action="store_true", help="show per-stage frame timing on screen (Tab toggles)")
+    parser.add_argument("--timing-export", metavar="PATH",
+                        help="write per-frame stage timings to PATH.<timer>.csv or .jsonl, by PATH's extension")
+    parser.add_argument("--no-watch", action="store_true", help="don't pick up library changes while running")
+    parser.add_argument("--record", metavar="PATH", help="record hand and pose landmarks to a session file")
+    parser.add_argument("--replay", metavar="PATH", help="replay a recorded session headlessly and report timing")
+    parser.add_argument("--replay-avatar", action="store_true", help="replay the session through avatar mode")
+    parser.add_argument("--realtime", action="store_true", help="pace the replay at the recorded frame times")
+    return parser.parse_args()
 
 
 def main():
+    args = parse_args()
     music_directory = "music"
+    source_size = tuple(int(v) for v in args.size.lower().split("x")) if args.size else None
+
+    if args.replay:
+        song_list = load_songs_from_directory(music_directory) if os.path.exists(music_directory) else []
+        frames, elapsed = replay_session(args.replay, song_list, avatar=args.replay_avatar, realtime=args.realtime)
+        fps = frames / elapsed if elapsed > 0 else 0.0
+        print(f"Replayed {frames} frames in {elapsed:.3f}s ({fps:.1f} fps)")
+        return
+
     if not os.path.exists(music_directory):
         print(f"Creating music directory: {music_directory}")
         os.makedirs(music_directory)
@@ -44,16 +65,36 @@ def main():
         print("No audio files found in music directory. Add some songs!")
         return
 
+    library = MusicLibrary(song_list)
     ui = UIEngine()
-    ui.set_song_list(1, [song['name'] for song in song_list])
-    ui.set_song_list(2, [song['name'] for song in song_list])
+    ui.set_library(library)
+    ui.set_song_list(1, library.order)
+    ui.set_song_list(2, library.order)
 
     audio_engine_left = None
     audio_engine_right = None
 
-    vision = VisionEngine(audio_engine_left, audio_engine_right, ui, song_list)
+    # One capture source and one model pool serve both modes, so switching never reopens or rebuilds them
+    cap = open_frame_source(args.source, fps=args.fps, size=source_size)
+    model_pool = ModelPool()
+    model_pool.preload('hands_roi', 'pose')
+    vision = VisionEngine(audio_engine_left, audio_engine_right, ui, library, cap=cap,
+                          target_fps=args.target_fps, adaptive_quality=not args.fixed_quality,
+                          threaded_present=not args.sync_present, refresh_rate=args.refresh_rate,
+                          model_pool=model_pool, timing_hud=args.timing_hud, timing_export=args.timing_export)
     avatar = None
 
+    watcher = None
+    if not args.no_watch:
+        watcher = LibraryWatcher(music_directory)
+        watcher.start()
+        vision.library_watcher = watcher
+
+    recorder = None
+    if args.record:
+        recorder = SessionRecorder(args.record, vision.cap.width, vision.cap.height)
+        vision.recorder = recorder
+
     running = True
     while running:
         if not vision.avatar_mode:
@@ -62,21 +103,51 @@ def main():
                 break
         else:
             if avatar is None:
-                avatar = AvatarEngine(vision.audio_engine_left, vision.audio_engine_right)
-                avatar.load_model("MaleTron_Lowpoly.obj")
+                avatar = AvatarEngine(vision.audio_engine_left, vision.audio_engine_right,
+                                      cap=vision.cap, model_pool=model_pool, timing_hud=vision.timing_hud,
+                                      timing_export=args.timing_export)
+                avatar.load_model(os.path.join("models", "MaleTron_Lowpoly.obj"))
+                avatar.recorder = recorder
             else:
                 avatar.audio_engine_left = vision.audio_engine_left
                 avatar.audio_engine_right = vision.audio_engine_right
 
-            vision.cap.release()
+            vision.stop_presenter()
             cv2.destroyAllWindows()
 
             avatar.run()
 
-            vision.cap = cv2.VideoCapture(0)
-
             vision.avatar_mode = False
 
+    if vision.presenter:
+        stats = vision.presenter.stats()
+        print(f"Presented {stats['presented']} frames, {stats['duplicated']} duplicated, {stats['skipped']} skipped")
+        print("\n".join(vision.presenter.timing.report()))
+    vision.stop_presenter()
+    print("\n".join(vision.timing.report()))
+    vision.timing.close()
+    if avatar:
+        times = avatar.inference_stats()
+        print(f"Avatar inference: pose {times['pose']:.1f} ms, hands {times['hands']:.1f} ms, "
+              f"frame {times['frame']:.1f} ms")
+        print("\n".join(avatar.render_timing.report() + avatar.tracking_timing.report()))
+        avatar.close()
+    vision.cap.release()
+    model_pool.close()
+
+    if recorder:
+        recorder.close()
+    if watcher:
+        watcher.stop()
+
+    if vision.inference_scheduler:
+        counts = vision.inference_scheduler.counters
+        print("Hand inference paths: " + ", ".join(f"{path} {count}" for path, count in counts.items()))
+    if vision.quality:
+        metrics = vision.quality.metrics()
+        print(f"Quality level {metrics['level']} at {metrics['frame_ms']:.1f} ms of work per frame "
+              f"({metrics['steps_down']} steps down, {metrics['steps_up']} up)")
+
     if vision.audio_engine_left:
         vision.audio_engine_left.stop()
     if vision.audio_engine_right:
@@ -2,6 +2,14 @@ import cv2
 import numpy as np
 
 
+def put_text(img, text, org, font, scale, color, thickness=1, line_type=cv2.LINE_AA, label_cache=None):
+    """cv2.putText, served from the label sprite cache when one is given."""
+    if label_cache is None:
+        cv2.putText(img, text, org, font, scale, color, thickness, line_type)
+    else:
+        label_cache.blit(img, text, org, font, scale, color, thickness, line_type)
+
+
 def draw_scrollable_list(
         img,
         rect,
@@ -17,7 +25,10 @@ def draw_scrollable_list(
         font,
         text_color,
         selected_index=None,
-        playing_index=None
+        playing_index=None,
+        line_type=cv2.LINE_AA,
+        label_cache=None,
+        label_of=None
 ):
     x, y, w, h = rect
     cv2.rectangle(img, (x, y), (x + w, y + h), deck_bg_color, -1)
@@ -42,8 +53,9 @@ def draw_scrollable_list(
         elif i == selected_index:
             cv2.rectangle(img, (x, item_y), (x + w - scrollbar_width, item_y + list_item_height),
                           selection_color, -1)
-        cv2.putText(img, songs[i], (text_x, item_y + list_item_height - 10), font, 0.6, text_color,
-                    1, cv2.LINE_AA)
+        label = label_of(songs[i]) if label_of else songs[i]
+        put_text(img, label, (text_x, item_y + list_item_height - 10), font, 0.6, text_color, 1, line_type,
+                 label_cache)
 
     if max_scroll > 0:
         scrollbar_x = x + w - scrollbar_width
@@ -55,93 +67,148 @@ def draw_scrollable_list(
 
     return scroll
 
-def draw_deck(img, rect, title, deck_bg_color, font, text_color, highlight_color, current_song=None):
+def draw_deck(img, rect, title, deck_bg_color, font, text_color, highlight_color, current_song=None,
+              line_type=cv2.LINE_AA):
+    draw_deck_panel(img, rect, title, deck_bg_color, font, text_color, line_type=line_type)
+    x, y, w, h = rect
+    draw_current_song(img, (x + 15, y + 75), font, highlight_color, current_song, line_type=line_type)
+
+
+def draw_deck_panel(img, rect, title, deck_bg_color, font, text_color, line_type=cv2.LINE_AA):
+    """Deck background, title and empty song box; everything on a deck that never changes."""
     x, y, w, h = rect
     cv2.rectangle(img, (x, y), (x + w, y + h), deck_bg_color, -1)
-    cv2.putText(img, title, (x + 10, y + 25), font, 0.8, text_color, 2, cv2.LINE_AA)
+    cv2.putText(img, title, (x + 10, y + 25), font, 0.8, text_color, 2, line_type)
 
     song_box_y = y + 40
     song_box_h = 50
     cv2.rectangle(img, (x + 10, song_box_y), (x + w - 10, song_box_y + song_box_h), (70, 70, 70), -1)
+
+
+def draw_current_song(img, org, font, highlight_color, current_song=None, line_type=cv2.LINE_AA, label_cache=None):
     if current_song:
-        cv2.putText(img, current_song, (x + 15, song_box_y + 35), font, 0.7, highlight_color, 2,
-                    cv2.LINE_AA)
+        put_text(img, current_song, org, font, 0.7, highlight_color, 2, line_type, label_cache)
     else:
-        cv2.putText(img, "No song loaded", (x + 15, song_box_y + 35), font, 0.7, (120, 120, 120), 1,
-                    cv2.LINE_AA)
+        put_text(img, "No song loaded", org, font, 0.7, (120, 120, 120), 1, line_type, label_cache)
 
 
-def draw_play_button(img, center_x, center_y, deck_bg_color, highlight_color, radius=30, is_playing_left=False, is_playing_right=False):
-    center_x_left = center_x // 2 - 100
-    center_x_right = center_x + 400
-    center_y_both = center_y - 100
+def draw_play_button(img, left_center, right_center, deck_bg_color, highlight_color, radius=30, is_playing_left=False, is_playing_right=False):
+    draw_single_play_button(img, left_center, deck_bg_color, highlight_color, radius, is_playing_left)
+    draw_single_play_button(img, right_center, deck_bg_color, highlight_color, radius, is_playing_right)
 
-    cv2.circle(img, (center_x_left, center_y_both), radius, deck_bg_color, -1)
-    cv2.circle(img, (center_x_left, center_y_both), radius, highlight_color, 2)
-    cv2.circle(img, (center_x_right, center_y_both), radius, deck_bg_color, -1)
-    cv2.circle(img, (center_x_right, center_y_both), radius, highlight_color, 2)
 
-    if is_playing_left:
+def draw_single_play_button(img, center, deck_bg_color, highlight_color, radius=30, is_playing=False):
+    center_x, center_y = center
+
+    cv2.circle(img, (center_x, center_y), radius, deck_bg_color, -1)
+    cv2.circle(img, (center_x, center_y), radius, highlight_color, 2)
+
+    if is_playing:
         bar_width = int(radius * 0.25)
         bar_height = int(radius * 0.8)
         bar_spacing = int(radius * 0.3)
 
-        left_x = center_x_left - bar_spacing
+        left_x = center_x - bar_spacing
         cv2.rectangle(img,
-                      (left_x - bar_width // 2, center_y_both - bar_height // 2),
-                      (left_x + bar_width // 2, center_y_both + bar_height // 2),
+                      (left_x - bar_width // 2, center_y - bar_height // 2),
+                      (left_x + bar_width // 2, center_y + bar_height // 2),
                       highlight_color, -1)
 
-        right_x = center_x_left + bar_spacing
+        right_x = center_x + bar_spacing
         cv2.rectangle(img,
-                      (right_x - bar_width // 2, center_y_both - bar_height // 2),
-                      (right_x + bar_width // 2, center_y_both + bar_height // 2),
+                      (right_x - bar_width // 2, center_y - bar_height // 2),
+                      (right_x + bar_width // 2, center_y + bar_height // 2),
                       highlight_color, -1)
     else:
         triangle_height = int(radius * 0.8)
         triangle_width = int(radius * 0.7)
         offset = int(radius * 0.1)
 
-        pt1 = (center_x_left - triangle_width // 2 + offset, center_y_both - triangle_height // 2)
-        pt2 = (center_x_left - triangle_width // 2 + offset, center_y_both + triangle_height // 2)
-        pt3 = (center_x_left + triangle_width // 2 + offset, center_y_both)
+        pt1 = (center_x - triangle_width // 2 + offset, center_y - triangle_height // 2)
+        pt2 = (center_x - triangle_width // 2 + offset, center_y + triangle_height // 2)
+        pt3 = (center_x + triangle_width // 2 + offset, center_y)
 
         triangle = np.array([pt1, pt2, pt3], np.int32)
         cv2.fillPoly(img, [triangle], highlight_color)
 
-    if is_playing_right:
-        bar_width = int(radius * 0.25)
-        bar_height = int(radius * 0.8)
-        bar_spacing = int(radius * 0.3)
 
-        left_x = center_x_right - bar_spacing
-        cv2.rectangle(img,
-                      (left_x - bar_width // 2, center_y_both - bar_height // 2),
-                      (left_x + bar_width // 2, center_y_both + bar_height // 2),
-                      highlight_color, -1)
+def draw_master_slider(img, center, slider_position=0.0, half_width=150, knob_radius=25):
+    draw_slider_track(img, center, half_width)
+    draw_slider_knob(img, center, slider_position, half_width, knob_radius)
 
-        right_x = center_x_right + bar_spacing
-        cv2.rectangle(img,
-                      (right_x - bar_width // 2, center_y_both - bar_height // 2),
-                      (right_x + bar_width // 2, center_y_both + bar_height // 2),
-                      highlight_color, -1)
-    else:
-        triangle_height = int(radius * 0.8)
-        triangle_width = int(radius * 0.7)
-        offset = int(radius * 0.1)
 
-        pt1 = (center_x_right - triangle_width // 2 + offset, center_y_both - triangle_height // 2)
-        pt2 = (center_x_right - triangle_width // 2 + offset, center_y_both + triangle_height // 2)
-        pt3 = (center_x_right + triangle_width // 2 + offset, center_y_both)
+def draw_slider_track(img, center, half_width=150):
+    center_x, center_y = center
+    cv2.rectangle(img, (center_x - half_width, center_y), (center_x + half_width, center_y), (42,42,210), thickness=30)
 
-        triangle = np.array([pt1, pt2, pt3], np.int32)
-        cv2.fillPoly(img, [triangle], highlight_color)
 
-def draw_master_slider(img, center_x, center_y, slider_position=0.0):
-    cv2.rectangle(img, (center_x - 150, center_y - 100), (center_x + 150, center_y - 100), (42,42,210), thickness=30)
-    knob_x = center_x + (slider_position * 150)
-    if knob_x <= (center_x - 150):
-        knob_x = center_x - 150
-    elif knob_x >= (center_x + 150):
-        knob_x = center_x + 150
-    cv2.circle(img, (knob_x.__int__(), center_y-100), 25, (255, 255, 255), -1)
\ No newline at end of file
+def draw_slider_knob(img, center, slider_position=0.0, half_width=150, knob_radius=25):
+    center_x, center_y = center
+    knob_x = center_x + (slider_position * half_width)
+    if knob_x <= (center_x - half_width):
+        knob_x = center_x - half_width
+    elif knob_x >= (center_x + half_width):
+        knob_x = center_x + half_width
+    cv2.circle(img, (knob_x.__int__(), center_y), knob_radius, (255, 255, 255), -1)
+
+
+def draw_waveform(img, rect, mins, maxs, rms, color, rms_color):
+    """Min/max bars with an RMS core, one per pixel column of rect, filled through column masks."""
+    x, y, w, h = rect
+    region = img[y:y + h, x:x + w]
+    h, w = region.shape[:2]
+    half = h / 2.0
+    middle = (h - 1) / 2.0
+    rows = np.arange(h, dtype=np.float32)[:, None] - middle
+    region[(rows >= -maxs[:w] * half) & (rows <= -mins[:w] * half)] = color
+    region[np.abs(rows) <= rms[:w] * half] = rms_color
+
+
+def draw_level_meter(img, rect, rms, peak, color, peak_color, track_color=(50, 50, 50), hot_color=(40, 40, 230),
+                     hot_level=0.85):
+    """Horizontal meter: an RMS bar (levels 0..1) that turns hot_color past hot_level, with a peak tick."""
+    x, y, w, h = rect
+    cv2.rectangle(img, (x, y), (x + w - 1, y + h - 1), track_color, -1)
+    rms_w = int(max(0.0, min(1.0, rms)) * (w - 1))
+    if rms_w > 0:
+        cv2.rectangle(img, (x, y), (x + rms_w, y + h - 1), hot_color if rms >= hot_level else color, -1)
+    peak_x = x + int(max(0.0, min(1.0, peak)) * (w - 1))
+    cv2.line(img, (peak_x, y), (peak_x, y + h - 1), peak_color, 2)
+
+
+def draw_spectrum_bars(img, rect, bands, color, track_color=(50, 50, 50), gap=3):
+    """One vertical bar per band level (0..1), bottom aligned in rect."""
+    x, y, w, h = rect
+    count = len(bands)
+    if count == 0:
+        return
+    bar_w = max(1, (w - gap * (count - 1)) // count)
+    for i, level in enumerate(bands):
+        bx = x + i * (bar_w + gap)
+        cv2.rectangle(img, (bx, y), (bx + bar_w - 1, y + h - 1), track_color, -1)
+        bar_h = int(max(0.0, min(1.0, level)) * h)
+        if bar_h > 0:
+            cv2.rectangle(img, (bx, y + h - bar_h), (bx + bar_w - 1, y + h - 1), color, -1)
+
+
+def draw_jump_rail(img, rect, letters, font, color, active_color, track_color=(45, 45, 45), active_letter=None,
+                   min_spacing=10, line_type=cv2.LINE_AA, label_cache=None):
+    """
+    A vertical strip of jump letters, spread evenly so each sits over the span
+    that selects it. Labels are thinned to every n-th letter when they would be
+    closer than min_spacing pixels; the active letter is always shown.
+    """
+    x, y, w, h = rect
+    cv2.rectangle(img, (x, y), (x + w - 1, y + h - 1), track_color, -1)
+    if not letters:
+        return
+    step = h / len(letters)
+    every = max(1, int(np.ceil(min_spacing / step)))
+    scale = min(0.45, max(0.3, step / 24))
+    for i, letter in enumerate(letters):
+        active = letter == active_letter
+        if i % every and not active:
+            continue
+        center_y = y + int((i + 0.5) * step)
+        put_text(img, letter, (x + w // 2 - 5, center_y + 5), font, scale, active_color if active else color,
+                 2 if active else 1, line_type, label_cache)
@@ -0,0 +1,144 @@
+import math
+
+import numpy as np
+
+
+class VirtualList:
+    """
+    Scroll state and lookup tables for one deck's song list.
+
+    Only the visible window of rows is ever touched per frame. The items are
+    kept as given, a numpy id array included, so replacing them costs nothing
+    per item. row_of() finds an item's row with one vectorised scan, cached
+    until the items change. letter_rows, the first row for each first letter
+    of the labels, is built the first time the jump index is used. It only
+    exists for lists sorted by label, which set_items() must say with
+    sorted_labels. A letter that comes back further down, such as '#' for a
+    label starting with '~' sorted after 'z', keeps the row of its first run,
+    so one odd label never costs the rest of the index. The scroll
+    offset is fractional so it can be driven kinetically: fling() sets a
+    velocity in rows per second that step() integrates and decays with
+    friction.
+    """
+
+    def __init__(self, items=(), visible_rows=1, friction=3.5, min_velocity=0.5):
+        self.visible_rows = visible_rows
+        self.friction = friction
+        self.min_velocity = min_velocity
+        self.offset = 0.0
+        self.velocity = 0.0
+        self.items = None
+        self.sorted_labels = False
+        # The jump index and the list it was built for, kept while search results are shown in between
+        self.letter_items = None
+        self.letter_index = ({}, [])
+        self.set_items(items)
+
+    def set_items(self, items, label_of=None, keep_offset=False, sorted_labels=False):
+        """
+        Replace the items; label_of maps an item to the label the jump index is
+        built from (defaults to the item itself), and sorted_labels says the
+        items are in label order, which the jump index needs. keep_offset keeps
+        the scroll position, clamped. Setting the same items object again keeps
+        its lookups.
+        """
+        if items is not self.items:
+            self.items = items
+            self.found = (None, None)
+        self.label_of = label_of
+        self.sorted_labels = sorted_labels
+        self.velocity = 0.0
+        self.offset = min(self.offset, float(self.max_scroll)) if keep_offset else 0.0
+
+    def row_of(self, item):
+        """The first row holding item, or None."""
+        if item is None:
+            return None
+        if self.found[0] != item:
+            if isinstance(self.items, np.ndarray):
+                rows = np.flatnonzero(self.items == item)
+                row = int(rows[0]) if len(rows) else None
+            else:
+                try:
+                    row = self.items.index(item)
+                except ValueError:
+                    row = None
+            self.found = (item, row)
+        return self.found[1]
+
+    def jump_index(self):
+        """(first row per letter, letters in list order), built on first use; empty unless sorted by label."""
+        if not self.sorted_labels:
+            return {}, []
+        if self.letter_items is not self.items:
+            label_of = self.label_of or (lambda item: item)
+            letter_rows = {}
+            letters = []
+            for row, item in enumerate(self.items.tolist() if isinstance(self.items, np.ndarray) else self.items):
+                letter = self.letter_of(label_of(item))
+                if letter in letter_rows:
+                    continue
+                letter_rows[letter] = row
+                letters.append(letter)
+            self.letter_index = (letter_rows, letters)
+            self.letter_items = self.items
+        return self.letter_index
+
+    @property
+    def letter_rows(self):
+        return self.jump_index()[0]
+
+    @property
+    def letters(self):
+        return self.jump_index()[1]
+
+    @staticmethod
+    def letter_of(label):
+        first = str(label)[:1].upper()
+        return first if first.isalpha() else '#'
+
+    @property
+    def max_scroll(self):
+        return max(0, len(self.items) - self.visible_rows)
+
+    @property
+    def scroll(self):
+        return int(self.offset)
+
+    @scroll.setter
+    def scroll(self, value):
+        self.offset = float(max(0, min(value, self.max_scroll)))
+
+    def scroll_by(self, rows):
+        self.velocity = 0.0
+        self.offset = max(0.0, min(self.offset + rows, float(self.max_scroll)))
+
+    def fling(self, velocity):
+        self.velocity = velocity
+
+    def step(self, dt):
+        """Advance kinetic scrolling by dt seconds. Returns True while the list is moving."""
+        if self.velocity == 0.0:
+            return False
+        self.offset += self.velocity * dt
+        self.velocity *= math.exp(-self.friction * dt)
+        if self.offset <= 0.0 or self.offset >= self.max_scroll:
+            self.offset = max(0.0, min(self.offset, float(self.max_scroll)))
+            self.velocity = 0.0
+        if abs(self.velocity) < self.min_velocity:
+            self.velocity = 0.0
+        return True
+
+    def letter_at(self, fraction):
+        """The jump-index letter at a 0..1 position along the list's height."""
+        if not self.letters:
+            return None
+        index = int(max(0.0, min(fraction, 0.999)) * len(self.letters))
+        return self.letters[index]
+
+    def jump_to_letter(self, letter):
+        row = self.letter_rows.get(letter)
+        if row is not None:
+            self.velocity = 0.0
+            self.scroll = row
+        return row
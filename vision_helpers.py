@@ -1,94 +1,83 @@
-def is_position_over_song(hand_pos, ui, deck_num=1):
-    if hand_pos is None:
-        return None
-
-    hand_x, hand_y = hand_pos
-
-    if deck_num == 1:
-        songs = ui.deck1_songs
-        deck_rect = ui.deck1_rect
-    else:
-        songs = ui.deck2_songs
-        deck_rect = ui.deck2_rect
+import cv2
+import numpy as np
+
+
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+)
+
+
+def resolve_pointers(ui, positions):
+    """
+    Resolve every pointer position (normalised (x, y) or None) against the UI
+    widget registry in a single query. Returns one (widget name, song index)
+    pair per position; song index is only set over a deck list row that holds a song.
+    """
+    points = np.array([pos if pos is not None else (np.nan, np.nan) for pos in positions],
+                      dtype=np.float32).reshape(-1, 2)
+    widget_ids, rows = ui.widgets.hit_test(points)
+
+    hits = []
+    for widget_id, row in zip(widget_ids.tolist(), rows.tolist()):
+        if widget_id < 0:
+            hits.append((None, None))
+            continue
+
+        name = ui.widgets.names[widget_id]
+        song_index = None
+        if name == 'deck1_list' and row >= 0 and ui.deck1_scroll + row < len(ui.deck1_songs):
+            song_index = ui.deck1_scroll + row
+        elif name == 'deck2_list' and row >= 0 and ui.deck2_scroll + row < len(ui.deck2_songs):
+            song_index = ui.deck2_scroll + row
+        hits.append((name, song_index))
+
+    return hits
 
-    d_x, d_y, d_w, d_h = deck_rect
-    norm_x = d_x / ui.width
-    norm_y = d_y / ui.height
-    norm_w = d_w / ui.width
-    norm_h = d_h / ui.height
 
-    list_offset_px = 100
-    list_offset = list_offset_px / ui.height
-    list_norm_y = norm_y + list_offset
-    list_norm_h = norm_h - list_offset
-
-    if not (norm_x <= hand_x <= norm_x + norm_w):
-        return None
-
-    if not (list_norm_y <= hand_y <= list_norm_y + list_norm_h):
-        return None
-
-    if list_norm_h <= 0 or len(songs) == 0:
-        return None
-
-    item_norm_h = ui.list_item_height / ui.height
-    y_offset_in_list = hand_y - list_norm_y
-    item_index = int(y_offset_in_list / item_norm_h)
-
-    visible_items = max(1, int(list_norm_h / item_norm_h))
-    if item_index < 0 or item_index >= visible_items:
+def is_position_over_song(hand_pos, ui, deck_num=1):
+    if hand_pos is None:
         return None
 
-    song_index = ui.deck1_scroll + item_index if deck_num == 1 else ui.deck2_scroll + item_index
-
-    if song_index >= len(songs):
+    name, song_index = resolve_pointers(ui, [hand_pos])[0]
+    if name != f'deck{deck_num}_list':
         return None
-
     return song_index
 
 
-def is_position_over_play_button(hand_pos, ui, width=1280, height=720, button_radius=40):
+def is_position_over_play_button(hand_pos, ui):
     if hand_pos is None:
         return None
 
-    center_x = 640
-    center_y = 500
-
-    left_button_x = center_x // 2 - 100
-    right_button_x = center_x + 400
-    button_y = center_y - 100
-
-    hand_pixel_x = hand_pos[0] * ui.width
-    hand_pixel_y = hand_pos[1] * ui.height
-
-    dist_x_left = hand_pixel_x - left_button_x
-    dist_x_right = hand_pixel_x - right_button_x
-    dist_y = hand_pixel_y - button_y
-    distance_left = (dist_x_left ** 2 + dist_y ** 2) ** 0.5
-    distance_right = (dist_x_right ** 2 + dist_y ** 2) ** 0.5
-
-    if distance_left <= button_radius:
+    name, _ = resolve_pointers(ui, [hand_pos])[0]
+    if name == 'play_left':
         return 'left'
-    elif distance_right <= button_radius:
+    elif name == 'play_right':
         return 'right'
     else:
         return None
 
-def is_position_over_master_slider(hand_pos, ui, slider_position=0.0, button_radius=25):
+
+def is_position_over_master_slider(hand_pos, ui):
     if hand_pos is None:
         return None
-    center_x = 640
-    center_y = 500
 
-    knob_x = center_x + (slider_position * 150)
-    knob_y = center_y - 100
+    name, _ = resolve_pointers(ui, [hand_pos])[0]
+    return name == 'master_slider'
 
-    hand_pixel_x = hand_pos[0] * ui.width
-    hand_pixel_y = hand_pos[1] * ui.height
 
-    dist_x = hand_pixel_x - knob_x
-    dist_y = hand_pixel_y - knob_y
+def draw_hand_landmarks(frame, landmarks, connection_color=(224, 224, 224), landmark_color=(0, 0, 255)):
+    """Draw hand landmarks and connections, matching MediaPipe's default drawing style."""
+    frame_height, frame_width = frame.shape[:2]
+    points = [(int(lm.x * frame_width), int(lm.y * frame_height)) for lm in landmarks]
 
-    distance = (dist_x ** 2 + dist_y ** 2) ** 0.5
+    for start, end in HAND_CONNECTIONS:
+        if start < len(points) and end < len(points):
+            cv2.line(frame, points[start], points[end], connection_color, 2)
 
-    return distance <= button_radius
\ No newline at end of file
+    for point in points:
+        cv2.circle(frame, point, 3, (224, 224, 224), -1)
+        cv2.circle(frame, point, 2, landmark_color, 2)
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+WAVEFORM_CACHE_DIR = os.path.join(".stiwi_cache", "waveforms")
+
+
+class WaveformPyramid:
+    """
+    Min/max/RMS summaries of a track at power-of-two zoom levels.
+
+    Level 0 summarises base_bin samples per bin and each level above it
+    halves the bin count. All levels live in one (bins, 3) float32 table, so
+    a pyramid is saved and memory-mapped as a single .npy file. columns()
+    reads the finest level with at most one bin per pixel, so its cost
+    depends on the pixel width and not on the track length.
+    """
+
+    def __init__(self, table, length, samplerate, base_bin=256):
+        self.table = table
+        self.length = length
+        self.samplerate = samplerate
+        self.base_bin = base_bin
+
+        self.levels = []
+        start = 0
+        for count in self.level_sizes(length, base_bin):
+            self.levels.append(table[start:start + count])
+            start += count
+        top = self.levels[-1]
+        self.peak = float(max(1e-6, np.abs(top[:, 0]).max(), np.abs(top[:, 1]).max()))
+
+    @staticmethod
+    def level_sizes(length, base_bin):
+        count = max(1, -(-length // base_bin))
+        sizes = [count]
+        while count > 1:
+            count = -(-count // 2)
+            sizes.append(count)
+        return sizes
+
+    @classmethod
+    def build(cls, data, samplerate, base_bin=256):
+        mono = data.mean(axis=1, dtype=np.float32) if data.ndim > 1 else data.astype(np.float32, copy=False)
+        length = len(mono)
+        count = max(1, -(-length // base_bin))
+        blocks = np.zeros(count * base_bin, dtype=np.float32)
+        blocks[:length] = mono
+        blocks = blocks.reshape(count, base_bin)
+
+        level = np.empty((count, 3), dtype=np.float32)
+        level[:, 0] = blocks.min(axis=1)
+        level[:, 1] = blocks.max(axis=1)
+        level[:, 2] = np.sqrt(np.einsum('ij,ij->i', blocks, blocks) / base_bin)
+
+        levels = [level]
+        while len(level) > 1:
+            if len(level) % 2:
+                level = np.concatenate((level, level[-1:]))
+            pairs = level.reshape(-1, 2, 3)
+            level = np.empty((len(pairs), 3), dtype=np.float32)
+            level[:, 0] = pairs[:, :, 0].min(axis=1)
+            level[:, 1] = pairs[:, :, 1].max(axis=1)
+            level[:, 2] = np.sqrt((pairs[:, :, 2] ** 2).mean(axis=1))
+            levels.append(level)
+
+        return cls(np.concatenate(levels), length, samplerate, base_bin)
+
+    def columns(self, start, samples_per_pixel, width):
+        """
+        Min, max and RMS per pixel column for width columns starting at sample
+        start, normalised to the track peak. Columns outside the track are zero.
+        """
+        ratio = max(samples_per_pixel / self.base_bin, 1.0)
+        level_index = min(int(np.log2(ratio)), len(self.levels) - 1)
+        level = self.levels[level_index]
+        bin_size = self.base_bin << level_index
+
+        edges = start + np.arange(width + 1) * samples_per_pixel
+        bins = np.clip((edges // bin_size).astype(np.int64), 0, len(level) - 1)
+        first = bins[0]
+        # Only the bins under the columns are read; the last column ends at the last edge
+        window = np.asarray(level[first:bins[-1] + 1])
+        starts = bins[:-1] - first
+        counts = np.maximum(np.diff(np.append(starts, len(window))), 1)
+
+        mins = np.minimum.reduceat(window[:, 0], starts) / self.peak
+        maxs = np.maximum.reduceat(window[:, 1], starts) / self.peak
+        rms = np.sqrt(np.add.reduceat(window[:, 2] ** 2, starts) / counts) / self.peak
+
+        outside = (edges[:-1] < 0) | (edges[:-1] >= self.length)
+        mins[outside] = 0.0
+        maxs[outside] = 0.0
+        rms[outside] = 0.0
+        return mins, maxs, rms
+
+
+def waveform_cache_key(path):
+    stat = os.stat(path)
+    key = f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def load_waveform(path, data=None, samplerate=None, cache_dir=WAVEFORM_CACHE_DIR):
+    """
+    The waveform pyramid for an audio file, memory-mapped from the cache when
+    the file is unchanged, otherwise built from data (or the file) and cached.
+    """
+    key = waveform_cache_key(path)
+    table_path = os.path.join(cache_dir, key + ".npy")
+    meta_path = os.path.join(cache_dir, key + ".json")
+
+    if os.path.exists(table_path) and os.path.exists(meta_path):
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            table = np.load(table_path, mmap_mode='r')
+            return WaveformPyramid(table, meta['length'], meta['samplerate'], meta['base_bin'])
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error reading waveform cache for '{path}': {e}")
+
+    if data is None:
+        import soundfile as sf
+        data, samplerate = sf.read(path, dtype='float32')
+    pyramid = WaveformPyramid.build(data, samplerate)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = table_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, pyramid.table)
+        os.replace(tmp_path, table_path)
+        with open(meta_path, 'w') as f:
+            json.dump({'length': pyramid.length, 'samplerate': pyramid.samplerate,
+                       'base_bin': pyramid.base_bin}, f)
+    except OSError as e:
+        print(f"Error writing waveform cache for '{path}': {e}")
+    return pyramid
@@ -0,0 +1,92 @@
+import numpy as np
+
+
+WIDGET_RECT = 0
+WIDGET_CIRCLE = 1
+
+
+class WidgetRegistry:
+    """
+    Hit-test index of the UI's interactive widgets.
+
+    Bounds are stored pre-normalised to [0, 1] so pointer positions from the
+    hand landmarks can be tested directly. Rect widgets may be split into rows
+    (the song lists); circle widgets are tested against their radius in pixels
+    so they stay round on a non-square frame. When widgets overlap, the one
+    registered first wins.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.names = []
+        self.kinds = np.zeros(0, dtype=np.int8)
+        self.bounds = np.zeros((0, 4), dtype=np.float32)
+        self.centers = np.zeros((0, 2), dtype=np.float32)
+        self.radii = np.zeros(0, dtype=np.float32)
+        self.row_heights = np.zeros(0, dtype=np.float32)
+        self.max_rows = np.zeros(0, dtype=np.int32)
+
+    def _slot(self, name):
+        if name in self.names:
+            return self.names.index(name)
+        self.names.append(name)
+        self.kinds = np.append(self.kinds, np.int8(WIDGET_RECT))
+        self.bounds = np.vstack((self.bounds, np.zeros((1, 4), dtype=np.float32)))
+        self.centers = np.vstack((self.centers, np.zeros((1, 2), dtype=np.float32)))
+        self.radii = np.append(self.radii, np.float32(0))
+        self.row_heights = np.append(self.row_heights, np.float32(0))
+        self.max_rows = np.append(self.max_rows, np.int32(0))
+        return len(self.names) - 1
+
+    def set_rect(self, name, rect, row_height=0):
+        """Register or move a rect widget given in pixels; row_height splits it into list rows."""
+        i = self._slot(name)
+        x, y, w, h = rect
+        self.kinds[i] = WIDGET_RECT
+        self.bounds[i] = (x / self.width, y / self.height, (x + w) / self.width, (y + h) / self.height)
+        self.centers[i] = (x + w / 2, y + h / 2)
+        self.radii[i] = 0
+        self.row_heights[i] = row_height / self.height
+        self.max_rows[i] = max(1, h // row_height) if row_height else 0
+
+    def set_circle(self, name, center, radius):
+        """Register or move a circular widget given in pixels."""
+        i = self._slot(name)
+        cx, cy = center
+        self.kinds[i] = WIDGET_CIRCLE
+        self.bounds[i] = ((cx - radius) / self.width, (cy - radius) / self.height,
+                          (cx + radius) / self.width, (cy + radius) / self.height)
+        self.centers[i] = (cx, cy)
+        self.radii[i] = radius
+        self.row_heights[i] = 0
+        self.max_rows[i] = 0
+
+    def hit_test(self, points):
+        """
+        Resolve normalised (x, y) points against every widget at once.
+        Missing pointers may be passed as NaN. Returns (widget indices, rows),
+        with -1 where a point hits nothing or a widget has no rows.
+        """
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+        px = points[:, 0:1]
+        py = points[:, 1:2]
+
+        x0, y0, x1, y1 = self.bounds.T
+        hits = (px >= x0) & (px <= x1) & (py >= y0) & (py <= y1)
+
+        dx = px * self.width - self.centers[:, 0]
+        dy = py * self.height - self.centers[:, 1]
+        in_circle = dx * dx + dy * dy <= self.radii * self.radii
+        hits &= np.where(self.kinds == WIDGET_CIRCLE, in_circle, True)
+
+        has_rows = self.row_heights > 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rows = np.floor((py - y0) / np.where(has_rows, self.row_heights, 1)).astype(np.int32)
+        hits &= ~has_rows | (rows < self.max_rows)
+
+        any_hit = hits.any(axis=1)
+        widget_ids = np.where(any_hit, hits.argmax(axis=1), -1)
+        picked_rows = rows[np.arange(len(points)), np.maximum(widget_ids, 0)]
+        picked_rows = np.where(any_hit & has_rows[np.maximum(widget_ids, 0)], picked_rows, -1)
+        return widget_ids, picked_rows